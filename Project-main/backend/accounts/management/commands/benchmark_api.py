@@ -0,0 +1,217 @@
+"""
+Management command benchmarking the main API endpoints in-process.
+
+It seeds ``--scale`` units of data with ``seed_data --scale`` (unless
+``--no-seed``), then calls each endpoint through the DRF test client as
+an anonymous visitor, a buyer, a seller or an admin. For each endpoint it
+reports p50/p95/p99 latency, the number of queries per request and the
+peak Python heap of one extra request measured under ``tracemalloc``.
+Everything runs inside a transaction that is rolled back.
+
+``--json`` writes the results for later comparison; ``--compare`` reads a
+previous file and flags endpoints whose p95 got slower by more than
+``--threshold`` or that now run more queries.
+"""
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from chat.models import Conversation
+from gigs.models import Category, Gig
+from orders.models import Order
+
+User = get_user_model()
+
+# (name, who is logged in, path; ``{...}`` is filled from the fixtures)
+ENDPOINTS = [
+    ('gigs.list', None, '/api/gigs/'),
+    ('gigs.search', None, '/api/gigs/?search=react'),
+    ('gigs.filtered', None, '/api/gigs/?category={category}&ordering=-average_rating'),
+    ('gigs.featured', None, '/api/gigs/featured/'),
+    ('gigs.detail', None, '/api/gigs/{gig}/'),
+    ('gigs.categories', None, '/api/gigs/categories/'),
+    ('gigs.popular_tags', None, '/api/gigs/tags/popular/'),
+    ('gigs.tag_facets', None, '/api/gigs/tags/facets/'),
+    ('gigs.mine', 'seller', '/api/gigs/my-gigs/'),
+    ('reviews.for_gig', None, '/api/reviews/?gig={gig}'),
+    ('orders.as_buyer', 'buyer', '/api/orders/?role=buyer'),
+    ('orders.as_seller', 'seller', '/api/orders/?role=seller'),
+    ('orders.detail', 'buyer', '/api/orders/{order}/'),
+    ('chat.conversations', 'buyer', '/api/chat/conversations/'),
+    ('chat.messages', 'buyer', '/api/chat/conversations/{conversation}/messages/'),
+    ('accounts.dashboard', 'seller', '/api/auth/dashboard/'),
+    ('accounts.profile', 'seller', '/api/auth/profile/'),
+    ('accounts.public_profile', None, '/api/auth/profile/{seller}/'),
+    ('accounts.freelancers', None, '/api/auth/freelancers/'),
+    ('admin.dashboard', 'admin', '/api/auth/admin/dashboard/'),
+    ('admin.orders', 'admin', '/api/auth/admin/orders/'),
+    ('admin.users', 'admin', '/api/auth/admin/users/'),
+    ('admin.metrics', 'admin', '/api/auth/admin/metrics/daily/?days=90'),
+]
+
+
+def percentile(samples, pct):
+    if len(samples) < 2:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method='inclusive')[pct - 1]
+
+
+def git_revision():
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the main API endpoints in-process (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=20, help='Units of data to seed (see seed_data --scale)')
+        parser.add_argument('--no-seed', action='store_true', help='Use the data already in the database')
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--cold', action='store_true', help='Clear the cache before every request')
+        parser.add_argument('--only', nargs='*', default=[], help='Endpoint names or prefixes to run')
+        parser.add_argument('--json', help='Write the results to this file')
+        parser.add_argument('--compare', help='Compare with results previously written by --json')
+        parser.add_argument('--threshold', type=float, default=0.2, help='Allowed p95 slowdown (0.2 = 20%%)')
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not options['no_seed']:
+                call_command('seed_data', scale=options['scale'], stdout=self.stdout)
+            fixtures, users = self.fixtures()
+            results = {}
+            self.stdout.write(
+                f'{"endpoint":<24} {"status":>6} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"queries":>8} {"peak KB":>8}'
+            )
+            for name, role, template in ENDPOINTS:
+                if options['only'] and not any(name.startswith(prefix) for prefix in options['only']):
+                    continue
+                client = APIClient()
+                if role:
+                    client.force_authenticate(users[role])
+                result = self.measure(client, template.format(**fixtures), options)
+                results[name] = result
+                self.stdout.write(
+                    f'{name:<24} {result["status"]:>6} {result["p50_ms"]:>8.2f} {result["p95_ms"]:>8.2f} '
+                    f'{result["p99_ms"]:>8.2f} {result["queries"]:>8} {result["peak_kb"]:>8.0f}'
+                )
+            transaction.set_rollback(True)
+
+        report = {
+            'meta': {
+                'revision': git_revision(),
+                'timestamp': timezone.now().isoformat(),
+                'scale': None if options['no_seed'] else options['scale'],
+                'iterations': options['iterations'],
+                'cold_cache': options['cold'],
+                'database': connection.vendor,
+            },
+            'results': results,
+        }
+        if options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f'Wrote {options["json"]}')
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            regressions = self.compare(baseline, report, options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} endpoints regressed: {", ".join(regressions)}')
+
+    def fixtures(self):
+        seller = (
+            User.objects.filter(is_freelancer=True).annotate(n=Count('gigs')).order_by('-n', 'id').first()
+        )
+        buyer = User.objects.annotate(n=Count('buyer_orders')).order_by('-n', 'id').first()
+        admin = User.objects.create(
+            username=f'bench_admin_{int(time.time())}', email='bench_admin@example.com', is_staff=True,
+        )
+        if seller is None or buyer is None:
+            raise CommandError('No data to benchmark; run without --no-seed.')
+        gig = Gig.objects.annotate(n=Count('reviews')).order_by('-n', 'id').first()
+        order = Order.objects.filter(buyer=buyer).order_by('-id').first()
+        conversation = Conversation.objects.filter(participants=buyer).order_by('-id').first()
+        fixtures = {
+            'seller': seller.id,
+            'gig': gig.id,
+            'category': Category.objects.order_by('id').values_list('id', flat=True).first(),
+            'order': order.id if order else 0,
+            'conversation': conversation.id if conversation else 0,
+        }
+        return fixtures, {'seller': seller, 'buyer': buyer, 'admin': admin}
+
+    def request(self, client, path):
+        response = client.get(path)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def measure(self, client, path, options):
+        for _ in range(options['warmup']):
+            self.request(client, path)
+        latencies, queries = [], []
+        for _ in range(options['iterations']):
+            if options['cold']:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = self.request(client, path)
+                latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+
+        if options['cold']:
+            cache.clear()
+        tracemalloc.start()
+        self.request(client, path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'path': path,
+            'status': response.status_code,
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'queries': max(queries),
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+    def compare(self, baseline, report, threshold):
+        base_rev = baseline['meta'].get('revision')
+        self.stdout.write(f'\nCompared with {base_rev or "baseline"}:')
+        regressions = []
+        for name, result in report['results'].items():
+            before = baseline['results'].get(name)
+            if not before:
+                continue
+            change = result['p95_ms'] / before['p95_ms'] - 1 if before['p95_ms'] else 0
+            slower = change > threshold
+            more_queries = result['queries'] > before['queries']
+            flag = 'REGRESSED' if slower or more_queries else ''
+            if flag:
+                regressions.append(name)
+            self.stdout.write(
+                f'{name:<24} p95 {before["p95_ms"]:>8.2f} -> {result["p95_ms"]:>8.2f} ({change:+.0%})  '
+                f'queries {before["queries"]} -> {result["queries"]}  {flag}'
+            )
+        return regressions
@@ -1,33 +1,74 @@
-"""Management command to seed the database with sample data."""
-from django.core.management.base import BaseCommand
+"""
+Management command to seed the database with sample data.
+
+Without options it creates a small hand-written demo data set. With
+``--scale N`` it bulk-generates ``N`` units of synthetic data (10 users,
+6 gigs, 20 orders, about 8 reviews and 4 conversations of 10 messages
+each per unit) for benchmarks, then fills in the order and rating totals
+of the seeded gigs and sellers and rebuilds the counters, tag links and
+search index that ``bulk_create`` skips. Existing rows keep their totals.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
 from accounts.models import Profile
+from chat.models import Conversation, Message
+from config.caching import invalidate
+from gigs.categories import refresh_category_counts
 from gigs.models import Category, Gig
+from gigs.search import rebuild_index
+from gigs.tags import rebuild_all_tags
+from metrics.counters import rebuild_counters, rebuild_daily_series
 from orders.models import Order
 from reviews.models import Review
+from reviews.ratings import rebuild_ratings
 
 User = get_user_model()
 
+CATEGORIES = [
+    {'name': 'Web Development', 'slug': 'web-development', 'icon': '💻', 'description': 'Website and web app development'},
+    {'name': 'Mobile Development', 'slug': 'mobile-development', 'icon': '📱', 'description': 'iOS and Android app development'},
+    {'name': 'Graphic Design', 'slug': 'graphic-design', 'icon': '🎨', 'description': 'Logos, banners, and visual content'},
+    {'name': 'Content Writing', 'slug': 'content-writing', 'icon': '✍️', 'description': 'Blog posts, articles, and copywriting'},
+    {'name': 'Video Editing', 'slug': 'video-editing', 'icon': '🎬', 'description': 'Video production and post-processing'},
+    {'name': 'Digital Marketing', 'slug': 'digital-marketing', 'icon': '📈', 'description': 'SEO, SEM, and social media marketing'},
+    {'name': 'Data Science', 'slug': 'data-science', 'icon': '📊', 'description': 'Data analysis, ML, and visualization'},
+    {'name': 'UI/UX Design', 'slug': 'ui-ux-design', 'icon': '🖌️', 'description': 'User interface and experience design'},
+]
+
+SCALE_WORDS = [
+    'logo', 'website', 'react', 'django', 'seo', 'video', 'mobile', 'python', 'brand', 'landing',
+    'shopify', 'wordpress', 'api', 'dashboard', 'copywriting', 'animation', 'figma', 'data', 'ml', 'ecommerce',
+]
+ORDER_STATUSES = ['pending', 'in_progress', 'delivered', 'completed', 'completed', 'completed', 'cancelled']
+
 
 class Command(BaseCommand):
     help = 'Seed database with sample data for demo/college project'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=0, help='Bulk-generate this many units of synthetic data')
+        parser.add_argument('--random-seed', type=int, default=0, help='Seed for the synthetic data generator')
+
     def handle(self, *args, **options):
+        if options['scale']:
+            self.seed_scale(options['scale'], random.Random(options['random_seed']))
+            return
+
         self.stdout.write('🌱 Seeding database...')
 
         # Create categories
-        categories_data = [
-            {'name': 'Web Development', 'slug': 'web-development', 'icon': '💻', 'description': 'Website and web app development'},
-            {'name': 'Mobile Development', 'slug': 'mobile-development', 'icon': '📱', 'description': 'iOS and Android app development'},
-            {'name': 'Graphic Design', 'slug': 'graphic-design', 'icon': '🎨', 'description': 'Logos, banners, and visual content'},
-            {'name': 'Content Writing', 'slug': 'content-writing', 'icon': '✍️', 'description': 'Blog posts, articles, and copywriting'},
-            {'name': 'Video Editing', 'slug': 'video-editing', 'icon': '🎬', 'description': 'Video production and post-processing'},
-            {'name': 'Digital Marketing', 'slug': 'digital-marketing', 'icon': '📈', 'description': 'SEO, SEM, and social media marketing'},
-            {'name': 'Data Science', 'slug': 'data-science', 'icon': '📊', 'description': 'Data analysis, ML, and visualization'},
-            {'name': 'UI/UX Design', 'slug': 'ui-ux-design', 'icon': '🖌️', 'description': 'User interface and experience design'},
-        ]
         categories = {}
-        for cat_data in categories_data:
+        for cat_data in CATEGORIES:
             cat, _ = Category.objects.get_or_create(slug=cat_data['slug'], defaults=cat_data)
             categories[cat.slug] = cat
             self.stdout.write(f'  ✅ Category: {cat.name}')
@@ -238,3 +279,116 @@ class Command(BaseCommand):
         self.stdout.write(f'  💼 {Gig.objects.count()} gigs')
         self.stdout.write(f'  📦 {Order.objects.count()} orders')
         self.stdout.write(f'  ⭐ {Review.objects.count()} reviews')
+
+    def seed_scale(self, scale, rng):
+        """Bulk-insert ``scale`` units of synthetic data and rebuild the derived tables."""
+        start = timezone.now()
+        # Continue numbering after earlier runs so usernames and emails stay unique.
+        run = User.objects.filter(username__startswith='seed').count()
+        password = make_password('password123')
+        with transaction.atomic():
+            categories = [
+                Category.objects.get_or_create(slug=data['slug'], defaults=data)[0] for data in CATEGORIES
+            ]
+            users = User.objects.bulk_create([
+                User(
+                    username=f'seed{run + i}', email=f'seed{run + i}@example.com', password=password,
+                    is_freelancer=i % 10 < 3, is_buyer=True,
+                )
+                for i in range(10 * scale)
+            ], batch_size=1000)
+            sellers = [u for u in users if u.is_freelancer]
+            buyers = [u for u in users if not u.is_freelancer]
+            Profile.objects.bulk_create([
+                Profile(
+                    user=user, full_name=f'Seed User {user.username[4:]}', hourly_rate=rng.randint(10, 80),
+                    skills=','.join(rng.sample(SCALE_WORDS, 3)), location='Remote',
+                )
+                for user in users
+            ], batch_size=1000)
+
+            gigs = Gig.objects.bulk_create([
+                Gig(
+                    seller=rng.choice(sellers), category=rng.choice(categories),
+                    title=' '.join(w.capitalize() for w in rng.sample(SCALE_WORDS, 3)),
+                    description=' '.join(rng.choices(SCALE_WORDS, k=30)),
+                    price=Decimal(rng.randint(5, 500)), delivery_days=rng.randint(1, 14),
+                    tags=','.join(rng.sample(SCALE_WORDS, 4)), is_active=rng.random() > 0.1,
+                )
+                for _ in range(6 * scale)
+            ], batch_size=1000)
+
+            orders = []
+            for _ in range(20 * scale):
+                gig, status = rng.choice(gigs), rng.choice(ORDER_STATUSES)
+                orders.append(Order(
+                    gig=gig, buyer=rng.choice(buyers), status=status, amount=gig.price,
+                    platform_fee=gig.price / 10, requirements='Synthetic order',
+                    completed_at=start - timedelta(days=rng.randint(0, 60)) if status == 'completed' else None,
+                ))
+                # Credited by rebuild_derived() below rather than by the credit job.
+                orders[-1].credited_at = orders[-1].completed_at
+            orders = Order.objects.bulk_create(orders, batch_size=1000)
+            Review.objects.bulk_create([
+                Review(order=order, gig=order.gig, reviewer=order.buyer, rating=rng.randint(1, 5), comment='Synthetic review')
+                for order in orders if order.status == 'completed' and rng.random() < 0.8
+            ], batch_size=1000)
+
+            conversations = Conversation.objects.bulk_create(
+                [Conversation(gig=rng.choice(gigs)) for _ in range(4 * scale)], batch_size=1000,
+            )
+            Participant = Conversation.participants.through
+            messages, links = [], []
+            for conversation in conversations:
+                pair = [conversation.gig.seller, rng.choice(buyers)]
+                links += [Participant(conversation=conversation, user=user) for user in pair]
+                messages += [
+                    Message(conversation=conversation, sender=pair[i % 2], text=' '.join(rng.choices(SCALE_WORDS, k=8)),
+                            is_read=i < 8)
+                    for i in range(10)
+                ]
+            Participant.objects.bulk_create(links, batch_size=1000)
+            Message.objects.bulk_create(messages, batch_size=1000)
+
+            # Everything this run created hangs off its users: seeded gigs
+            # belong to seeded sellers, whose gigs are all seeded.
+            seeded = User.objects.filter(pk__range=(users[0].pk, users[-1].pk), username__startswith='seed')
+            self.rebuild_derived(seeded)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(users)} users, {len(gigs)} gigs, {len(orders)} orders, '
+            f'{len(conversations)} conversations in {(timezone.now() - start).total_seconds():.1f}s'
+        ))
+
+    def rebuild_derived(self, seeded_users):
+        """
+        Recompute what the model signals would have maintained for rows inserted in bulk.
+
+        Order and rating totals are only recomputed for the seeded users and
+        their gigs; other rows keep their running totals, which a recount
+        from the orders table would not reproduce (credit is never taken
+        back). Tag links, category counts, the search index and platform
+        metrics are recounts of whole tables and are rebuilt in full.
+        """
+        gigs = Gig.objects.filter(seller__in=seeded_users)
+        profiles = Profile.objects.filter(user__in=seeded_users)
+        completed = Order.objects.filter(status='completed').order_by().values('gig')
+        gigs.update(total_orders=Coalesce(Subquery(
+            completed.filter(gig=OuterRef('pk')).annotate(n=Count('id')).values('n'), output_field=IntegerField(),
+        ), 0))
+        seller_orders = Order.objects.filter(status='completed', gig__seller=OuterRef('user_id')).order_by()
+        profiles.update(
+            total_orders_completed=Coalesce(Subquery(
+                seller_orders.values('gig__seller').annotate(n=Count('id')).values('n'), output_field=IntegerField(),
+            ), 0),
+            total_earnings=Coalesce(Subquery(
+                seller_orders.values('gig__seller').annotate(total=Sum('amount')).values('total'),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ), Decimal(0)),
+        )
+        rebuild_ratings(gigs, profiles)
+        rebuild_all_tags()
+        refresh_category_counts()
+        rebuild_index()
+        rebuild_counters()
+        rebuild_daily_series()
+        invalidate('gigs', 'categories', 'reviews')
@@ -12,6 +12,12 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pages of the admin user list, newest first.
+            models.Index(fields=['date_joined', 'id'], name='accounts_user_joined_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -36,6 +42,8 @@ class Profile(models.Model):
     total_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     total_orders_completed = models.PositiveIntegerField(default=0)
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    rating_sum = models.PositiveIntegerField(default=0, help_text='Sum of ratings across all gigs')
+    rating_count = models.PositiveIntegerField(default=0, help_text='Number of reviews across all gigs')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
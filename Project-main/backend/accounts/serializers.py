@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from images.fields import ImageDerivativesField
 from .models import Profile
 
 User = get_user_model()
@@ -60,13 +61,35 @@ class PublicProfileSerializer(serializers.ModelSerializer):
     email = serializers.EmailField(source='user.email', read_only=True)
     is_freelancer = serializers.BooleanField(source='user.is_freelancer', read_only=True)
     member_since = serializers.DateTimeField(source='user.date_joined', read_only=True)
+    avatar_variants = ImageDerivativesField(source='avatar')
 
     class Meta:
         model = Profile
         fields = [
             'id', 'username', 'email', 'is_freelancer', 'member_since',
-            'full_name', 'bio', 'avatar', 'skills', 'skills_list',
+            'full_name', 'bio', 'avatar', 'avatar_variants', 'skills', 'skills_list',
             'hourly_rate', 'portfolio_url', 'location', 'tagline',
             'languages', 'education', 'experience_years',
             'total_orders_completed', 'average_rating',
         ]
+
+
+class AdminUserSerializer(serializers.ModelSerializer):
+    """User row for the admin panel; expects ``profile`` to be select_related."""
+    total_earnings = serializers.SerializerMethodField()
+    total_orders_completed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = [
+            'id', 'username', 'email', 'is_freelancer', 'is_buyer', 'is_staff', 'is_active',
+            'date_joined', 'total_earnings', 'total_orders_completed',
+        ]
+
+    def get_total_earnings(self, obj):
+        profile = getattr(obj, 'profile', None)
+        return float(profile.total_earnings) if profile else 0
+
+    def get_total_orders_completed(self, obj):
+        profile = getattr(obj, 'profile', None)
+        return profile.total_orders_completed if profile else 0
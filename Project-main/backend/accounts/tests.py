@@ -0,0 +1,236 @@
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from config.instrumentation import QueryRecorder, fingerprint
+from gigs.models import Gig
+from orders.models import Order
+from reviews.ratings import find_rating_drift
+from .models import User, Profile
+
+
+class DashboardStatsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='me', email='me@example.com', password='pass12345')
+        self.other = User.objects.create_user(username='you', email='you@example.com', password='pass12345')
+        Profile.objects.create(user=self.user)
+        self.my_gig = Gig.objects.create(seller=self.user, title='Mine', description='desc', price=10)
+        Gig.objects.create(seller=self.user, title='Paused', description='desc', price=10, is_active=False)
+        self.their_gig = Gig.objects.create(seller=self.other, title='Theirs', description='desc', price=25)
+        self.client.force_authenticate(self.user)
+
+    def add_orders(self, gig, buyer, statuses):
+        for status in statuses:
+            Order.objects.create(gig=gig, buyer=buyer, status=status, amount=gig.price)
+
+    def test_counts_and_total_spent(self):
+        self.add_orders(self.my_gig, self.other, ['pending', 'pending', 'in_progress', 'completed', 'cancelled'])
+        self.add_orders(self.their_gig, self.user, ['completed', 'completed', 'delivered', 'payment_pending'])
+        response = self.client.get('/api/auth/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['active_gigs'], 1)
+        self.assertEqual(response.data['total_gigs'], 2)
+        self.assertEqual(response.data['pending_orders'], 2)
+        self.assertEqual(response.data['active_orders'], 1)
+        self.assertEqual(response.data['completed_orders'], 1)
+        self.assertEqual(response.data['my_purchases'], 4)
+        self.assertEqual(response.data['buyer_active_orders'], 1)
+        self.assertEqual(response.data['total_spent'], 50.0)
+
+    def test_empty_dashboard(self):
+        response = self.client.get('/api/auth/dashboard/')
+        self.assertEqual(response.data['total_spent'], 0.0)
+        self.assertEqual(response.data['my_purchases'], 0)
+
+    def test_query_budget_does_not_grow_with_orders(self):
+        self.add_orders(self.their_gig, self.user, ['completed'] * 50)
+        self.add_orders(self.my_gig, self.other, ['pending'] * 50)
+        # Profile, gig counts, seller order counts, buyer order counts.
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/auth/dashboard/')
+        self.assertEqual(response.data['total_spent'], 1250.0)
+
+
+class AdminListTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', is_staff=True,
+        )
+        self.seller = User.objects.create_user(
+            username='seller', email='seller@example.com', password='pass12345', is_freelancer=True,
+        )
+        Profile.objects.create(user=self.seller, total_earnings=120)
+        self.gig = Gig.objects.create(seller=self.seller, title='Logo design', description='desc', price=30)
+        self.buyers = []
+        for i in range(5):
+            buyer = User.objects.create_user(username=f'buyer{i}', email=f'buyer{i}@example.com', password='pass12345')
+            Profile.objects.create(user=buyer)
+            self.buyers.append(buyer)
+            Order.objects.create(
+                gig=self.gig, buyer=buyer, amount=30, status='completed' if i % 2 else 'pending',
+            )
+        self.client.force_authenticate(self.admin)
+
+    def walk(self, url, params):
+        rows, data = [], dict(params, page_size=2)
+        while url:
+            response = self.client.get(url, data)
+            self.assertEqual(response.status_code, 200)
+            rows += response.data['results']
+            url, data = response.data['next'], None
+        return rows
+
+    def test_orders_are_keyset_paginated_and_filtered(self):
+        rows = self.walk('/api/auth/admin/orders/', {})
+        expected = Order.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        self.assertEqual([r['id'] for r in rows], list(expected))
+        completed = self.walk('/api/auth/admin/orders/', {'status': 'completed'})
+        self.assertEqual(len(completed), 2)
+        found = self.client.get('/api/auth/admin/orders/', {'search': 'buyer3'}).data['results']
+        self.assertEqual([r['buyer'] for r in found], [self.buyers[3].id])
+
+    def test_rows_created_in_the_same_millisecond_are_all_listed(self):
+        base = timezone.now().replace(microsecond=0)
+        for i, order in enumerate(Order.objects.order_by('id')):
+            Order.objects.filter(pk=order.pk).update(created_at=base + timedelta(microseconds=100 * i))
+        for i, user in enumerate(User.objects.order_by('id')):
+            User.objects.filter(pk=user.pk).update(date_joined=base + timedelta(microseconds=100 * i))
+        orders = [r['id'] for r in self.walk('/api/auth/admin/orders/', {})]
+        self.assertEqual(orders, list(Order.objects.order_by('-id').values_list('id', flat=True)))
+        users = [r['id'] for r in self.walk('/api/auth/admin/users/', {})]
+        self.assertEqual(users, list(User.objects.order_by('-id').values_list('id', flat=True)))
+
+    def test_order_page_query_count_is_flat(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/auth/admin/orders/', {'page_size': 2})
+        with CaptureQueriesContext(connection) as large:
+            self.client.get('/api/auth/admin/orders/', {'page_size': 5})
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_users_page_does_not_query_profiles_per_row(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/auth/admin/users/', {'page_size': 10})
+        seller = next(u for u in response.data['results'] if u['id'] == self.seller.id)
+        self.assertEqual(seller['total_earnings'], 120.0)
+        self.assertEqual(len(self.walk('/api/auth/admin/users/', {'is_freelancer': 'true'})), 1)
+
+    def test_streaming_exports(self):
+        response = self.client.get('/api/auth/admin/orders/', {'export': 'csv', 'status': 'pending'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('id,status,amount'))
+        self.assertEqual(len(lines), 4)
+
+        response = self.client.get('/api/auth/admin/users/', {'export': 'ndjson'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), User.objects.count())
+        self.assertIn('profile__total_earnings', rows[0])
+
+    def test_csv_export_neutralizes_formulas(self):
+        Gig.objects.filter(pk__in=Order.objects.values('gig')).update(title='=HYPERLINK("http://evil")')
+        User.objects.filter(pk=self.seller.pk).update(username='@SUM(A1)')
+        response = self.client.get('/api/auth/admin/orders/', {'export': 'csv'})
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        header = rows[0]
+        for row in rows[1:]:
+            self.assertEqual(row[header.index('gig__title')], '\'=HYPERLINK("http://evil")')
+            self.assertEqual(row[header.index('gig__seller__username')], "'@SUM(A1)")
+            self.assertFalse(row[header.index('amount')].startswith("'"))
+
+    def test_invalid_export_format(self):
+        response = self.client.get('/api/auth/admin/orders/', {'export': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(self.seller)
+        self.assertEqual(self.client.get('/api/auth/admin/users/').status_code, 403)
+
+
+@override_settings(INSTRUMENTATION_FLUSH_SECONDS=0)
+class RequestInstrumentationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', is_staff=True,
+        )
+        seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        Profile.objects.create(user=seller)
+        self.gig = Gig.objects.create(seller=seller, title='Logo design', description='desc', price=30)
+
+    def test_server_timing_header(self):
+        response = self.client.get(f'/api/gigs/{self.gig.id}/')
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries, 0 repeated", app;dur=[\d.]+, total;dur=[\d.]+$')
+
+    def test_per_route_stats_are_admin_only(self):
+        for _ in range(3):
+            self.client.get(f'/api/gigs/{self.gig.id}/')
+        self.client.get('/api/gigs/999999/')
+        self.assertEqual(self.client.get('/api/auth/admin/requests/').status_code, 401)
+        self.client.force_authenticate(self.admin)
+        stats = self.client.get('/api/auth/admin/requests/').data
+        detail = stats['GET /api/gigs/<int:pk>/']
+        self.assertEqual(detail['requests'], 4)
+        self.assertEqual(detail['errors'], 0)
+        self.assertEqual(sum(detail['latency_ms']['histogram'].values()), 4)
+        self.assertEqual(sum(detail['queries']['histogram'].values()), 4)
+
+        self.assertEqual(self.client.delete('/api/auth/admin/requests/').status_code, 204)
+        self.assertNotIn('GET /api/gigs/<int:pk>/', self.client.get('/api/auth/admin/requests/').data)
+
+    def test_repeated_statements_are_fingerprinted(self):
+        self.assertEqual(
+            fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s, %s) LIMIT 21'),
+            fingerprint('SELECT 1 FROM t WHERE id IN (%s) LIMIT 1'),
+        )
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for user in User.objects.all():
+                list(Gig.objects.filter(seller=user))
+        self.assertEqual(list(recorder.duplicates().values()), [2])
+
+    @override_settings(INSTRUMENTATION_SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged_with_their_sql(self):
+        with self.assertLogs('config.instrumentation', 'WARNING') as logs:
+            self.client.get(f'/api/gigs/{self.gig.id}/')
+        self.assertIn('Slow request GET /api/gigs/', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    @override_settings(INSTRUMENTATION_SLOW_REQUEST_MS=0)
+    def test_slow_request_log_redacts_credentials(self):
+        with self.assertLogs('config.instrumentation', 'WARNING') as logs:
+            self.client.get(f'/api/gigs/{self.gig.id}/', {'token': 'secret', 'ticket': 'secret', 'page': '2'})
+        self.assertNotIn('secret', logs.output[0])
+        self.assertIn('token=REDACTED', logs.output[0])
+        self.assertIn('page=2', logs.output[0])
+
+
+class SeedDataTests(APITestCase):
+    def test_scaled_seed_keeps_derived_data_consistent(self):
+        call_command('seed_data', scale=1, random_seed=1, stdout=StringIO())
+        self.assertEqual(User.objects.count(), 10)
+        self.assertEqual(Gig.objects.count(), 6)
+        self.assertEqual(Order.objects.count(), 20)
+        self.assertEqual(find_rating_drift(), [])
+        for gig in Gig.objects.all():
+            self.assertEqual(gig.total_orders, gig.orders.filter(status='completed').count())
+
+    def test_scaled_seed_leaves_existing_totals_alone(self):
+        seller = User.objects.create_user(username='real', email='real@example.com', password='pass12345')
+        Profile.objects.create(user=seller)
+        gig = Gig.objects.create(seller=seller, title='Live gig', description='desc', price=10)
+        Gig.objects.filter(pk=gig.pk).update(total_orders=7, rating_sum=9, rating_count=2)
+        Profile.objects.filter(user=seller).update(total_orders_completed=7, total_earnings=70)
+        call_command('seed_data', scale=1, random_seed=1, stdout=StringIO())
+        gig.refresh_from_db()
+        self.assertEqual((gig.total_orders, gig.rating_sum, gig.rating_count), (7, 9, 2))
+        profile = Profile.objects.get(user=seller)
+        self.assertEqual((profile.total_orders_completed, profile.total_earnings), (7, 70))
@@ -12,6 +12,9 @@ urlpatterns = [
     path('freelancers/', views.FreelancerListView.as_view(), name='freelancer_list'),
     # Admin endpoints
     path('admin/dashboard/', views.AdminDashboardView.as_view(), name='admin_dashboard'),
+    path('admin/metrics/daily/', views.AdminMetricsSeriesView.as_view(), name='admin_metrics_daily'),
     path('admin/orders/', views.AdminOrdersView.as_view(), name='admin_orders'),
     path('admin/users/', views.AdminUsersView.as_view(), name='admin_users'),
+    path('admin/cache/', views.AdminCacheStatsView.as_view(), name='admin_cache_stats'),
+    path('admin/requests/', views.AdminRequestStatsView.as_view(), name='admin_request_stats'),
 ]
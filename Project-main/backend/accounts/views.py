@@ -1,11 +1,15 @@
-from rest_framework import generics, permissions, status
+from rest_framework import filters, generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from django_filters.rest_framework import DjangoFilterBackend
+from config.exports import EXPORT_FORMATS, stream_export
+from config.pagination import KeysetPagination
 from .models import Profile
 from .serializers import (
-    RegisterSerializer, ProfileSerializer, PublicProfileSerializer, UserSerializer
+    RegisterSerializer, ProfileSerializer, PublicProfileSerializer, UserSerializer,
+    AdminUserSerializer,
 )
 
 User = get_user_model()
@@ -106,36 +110,41 @@ class DashboardStatsView(APIView):
         user = request.user
         profile, _ = Profile.objects.get_or_create(user=user)
 
+        from django.db.models import Count, Q, Sum
         from gigs.models import Gig
         from orders.models import Order
 
-        active_gigs = Gig.objects.filter(seller=user, is_active=True).count()
-        total_gigs = Gig.objects.filter(seller=user).count()
+        gig_stats = Gig.objects.filter(seller=user).aggregate(
+            active_gigs=Count('id', filter=Q(is_active=True)),
+            total_gigs=Count('id'),
+        )
 
         # Orders as seller
-        seller_orders = Order.objects.filter(gig__seller=user)
-        pending_orders = seller_orders.filter(status='pending').count()
-        active_orders = seller_orders.filter(status='in_progress').count()
-        completed_orders = seller_orders.filter(status='completed').count()
+        seller_stats = Order.objects.filter(gig__seller=user).aggregate(
+            pending_orders=Count('id', filter=Q(status='pending')),
+            active_orders=Count('id', filter=Q(status='in_progress')),
+            completed_orders=Count('id', filter=Q(status='completed')),
+        )
 
         # Orders as buyer
-        buyer_orders = Order.objects.filter(buyer=user)
-        my_purchases = buyer_orders.count()
-        buyer_active_orders = buyer_orders.filter(status__in=['pending', 'in_progress', 'delivered']).count()
-        total_spent = sum([order.amount for order in buyer_orders.filter(status='completed')])
+        buyer_stats = Order.objects.filter(buyer=user).aggregate(
+            my_purchases=Count('id'),
+            buyer_active_orders=Count('id', filter=Q(status__in=['pending', 'in_progress', 'delivered'])),
+            total_spent=Sum('amount', filter=Q(status='completed'), default=0),
+        )
 
         return Response({
             'total_earnings': float(profile.total_earnings),
-            'total_spent': float(total_spent),
+            'total_spent': float(buyer_stats['total_spent']),
             'average_rating': float(profile.average_rating),
             'total_orders_completed': profile.total_orders_completed,
-            'active_gigs': active_gigs,
-            'total_gigs': total_gigs,
-            'pending_orders': pending_orders,
-            'active_orders': active_orders,
-            'completed_orders': completed_orders,
-            'my_purchases': my_purchases,
-            'buyer_active_orders': buyer_active_orders,
+            'active_gigs': gig_stats['active_gigs'],
+            'total_gigs': gig_stats['total_gigs'],
+            'pending_orders': seller_stats['pending_orders'],
+            'active_orders': seller_stats['active_orders'],
+            'completed_orders': seller_stats['completed_orders'],
+            'my_purchases': buyer_stats['my_purchases'],
+            'buyer_active_orders': buyer_stats['buyer_active_orders'],
         })
 
 
@@ -153,70 +162,106 @@ class FreelancerListView(generics.ListAPIView):
 # ===== ADMIN PANEL VIEWS =====
 
 class AdminDashboardView(APIView):
-    """Admin-only: platform-wide statistics."""
+    """Admin-only: platform-wide statistics, read from the materialized counters."""
     permission_classes = [permissions.IsAdminUser]
 
     def get(self, request):
-        from gigs.models import Gig
-        from orders.models import Order
-        from django.db.models import Sum, Count
-
-        total_users = User.objects.count()
-        total_freelancers = User.objects.filter(is_freelancer=True).count()
-        total_buyers = User.objects.filter(is_buyer=True).count()
-        total_gigs = Gig.objects.count()
-        active_gigs = Gig.objects.filter(is_active=True).count()
-
-        all_orders = Order.objects.all()
-        total_orders = all_orders.count()
-        pending_orders = all_orders.filter(status='pending').count()
-        in_progress_orders = all_orders.filter(status='in_progress').count()
-        delivered_orders = all_orders.filter(status='delivered').count()
-        completed_orders = all_orders.filter(status='completed').count()
-        cancelled_orders = all_orders.filter(status='cancelled').count()
-
-        total_revenue = all_orders.filter(status='completed').aggregate(
-            total=Sum('amount'))['total'] or 0
-        total_platform_fees = all_orders.filter(status='completed').aggregate(
-            total=Sum('platform_fee'))['total'] or 0
+        from metrics.counters import get_counters
 
+        counters = get_counters()
         return Response({
-            'total_users': total_users,
-            'total_freelancers': total_freelancers,
-            'total_buyers': total_buyers,
-            'total_gigs': total_gigs,
-            'active_gigs': active_gigs,
-            'total_orders': total_orders,
-            'pending_orders': pending_orders,
-            'in_progress_orders': in_progress_orders,
-            'delivered_orders': delivered_orders,
-            'completed_orders': completed_orders,
-            'cancelled_orders': cancelled_orders,
-            'total_revenue': float(total_revenue),
-            'total_platform_fees': float(total_platform_fees),
+            'total_users': int(counters['users']),
+            'total_freelancers': int(counters['freelancers']),
+            'total_buyers': int(counters['buyers']),
+            'total_gigs': int(counters['gigs']),
+            'active_gigs': int(counters['active_gigs']),
+            'total_orders': int(counters['orders']),
+            'pending_orders': int(counters['orders:pending']),
+            'in_progress_orders': int(counters['orders:in_progress']),
+            'delivered_orders': int(counters['orders:delivered']),
+            'completed_orders': int(counters['orders:completed']),
+            'cancelled_orders': int(counters['orders:cancelled']),
+            'total_revenue': float(counters['revenue']),
+            'total_platform_fees': float(counters['platform_fees']),
         })
 
 
-class AdminOrdersView(APIView):
-    """Admin-only: view all orders and update their status."""
+class AdminMetricsSeriesView(APIView):
+    """Admin-only: daily orders and revenue for the last ``?days=`` days (default 30)."""
     permission_classes = [permissions.IsAdminUser]
+    max_days = 366
 
     def get(self, request):
-        from orders.models import Order
-        from orders.serializers import OrderSerializer
+        from metrics.counters import daily_series
 
-        status_filter = request.query_params.get('status', None)
-        orders = Order.objects.all().select_related('gig', 'buyer', 'gig__seller', 'gig__category')
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({'error': 'days must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        days = max(1, min(days, self.max_days))
+        return Response(daily_series(days))
+
+
+class AdminListPagination(KeysetPagination):
+    """Keyset pages by default: admin lists span the whole platform."""
+    default_mode = 'cursor'
+    page_size = 50
+    max_page_size = 200
+
+
+class AdminExportMixin:
+    """``?export=csv|ndjson`` streams the filtered list instead of paginating it."""
+    export_columns = []
+    export_filename = 'export'
+
+    def list_or_export(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        export_format = request.query_params.get('export')
+        if export_format:
+            if export_format not in EXPORT_FORMATS:
+                return Response({'error': f'Invalid export format. Choose from: {list(EXPORT_FORMATS)}'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            return stream_export(queryset, self.export_columns, export_format, self.export_filename)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class AdminOrdersView(AdminExportMixin, generics.GenericAPIView):
+    """Admin-only: browse, filter and export all orders, and update their status."""
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = AdminListPagination
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_fields = {
+        'status': ['exact'],
+        'buyer': ['exact'],
+        'gig': ['exact'],
+        'gig__seller': ['exact'],
+        'created_at': ['gte', 'lt'],
+    }
+    search_fields = ['gig__title', 'buyer__username', 'buyer__email']
+    ordering_fields = ['created_at', 'amount']
+    ordering = ['-created_at']
+    export_columns = [
+        'id', 'status', 'amount', 'platform_fee', 'gig_id', 'gig__title', 'gig__seller__username',
+        'buyer__username', 'buyer__email', 'created_at', 'delivered_at', 'completed_at',
+    ]
+    export_filename = 'orders'
+
+    def get_serializer_class(self):
+        from orders.serializers import OrderSerializer
+        return OrderSerializer
 
-        if status_filter:
-            orders = orders.filter(status=status_filter)
+    def get_queryset(self):
+        from orders.models import Order
+        return Order.objects.select_related('gig', 'buyer', 'gig__seller', 'gig__category')
 
-        orders = orders.order_by('-created_at')
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+    def get(self, request):
+        return self.list_or_export(request)
 
     def patch(self, request):
         """Admin can update any order's status."""
+        from orders.completion import complete_order
         from orders.models import Order
         from django.utils import timezone
 
@@ -238,21 +283,15 @@ class AdminOrdersView(APIView):
             return Response({'error': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
 
         old_status = order.status
-        order.status = new_status
-
-        if new_status == 'delivered' and not order.delivered_at:
-            order.delivered_at = timezone.now()
-
-        if new_status == 'completed' and old_status != 'completed':
-            gig = order.gig
-            gig.total_orders += 1
-            gig.save()
-            profile = gig.seller.profile
-            profile.total_orders_completed += 1
-            profile.total_earnings += order.amount
-            profile.save()
-
-        order.save()
+        if new_status == 'completed':
+            order, _ = complete_order(order.id)
+        else:
+            order.status = new_status
+            update_fields = ['status', 'updated_at']
+            if new_status == 'delivered' and not order.delivered_at:
+                order.delivered_at = timezone.now()
+                update_fields.append('delivered_at')
+            order.save(update_fields=update_fields)
 
         return Response({
             'message': f'Order #{order.id} status updated to {new_status}.',
@@ -262,25 +301,53 @@ class AdminOrdersView(APIView):
         })
 
 
-class AdminUsersView(APIView):
-    """Admin-only: view all users."""
+class AdminUsersView(AdminExportMixin, generics.ListAPIView):
+    """Admin-only: browse, filter and export all users."""
+    serializer_class = AdminUserSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = AdminListPagination
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_fields = {
+        'is_freelancer': ['exact'],
+        'is_buyer': ['exact'],
+        'is_staff': ['exact'],
+        'is_active': ['exact'],
+        'date_joined': ['gte', 'lt'],
+    }
+    search_fields = ['username', 'email']
+    ordering_fields = ['date_joined', 'username']
+    ordering = ['-date_joined']
+    export_columns = [
+        'id', 'username', 'email', 'is_freelancer', 'is_buyer', 'is_staff', 'is_active', 'date_joined',
+        'profile__total_earnings', 'profile__total_orders_completed',
+    ]
+    export_filename = 'users'
+
+    def get_queryset(self):
+        return User.objects.select_related('profile')
+
+    def get(self, request, *args, **kwargs):
+        return self.list_or_export(request)
+
+
+class AdminCacheStatsView(APIView):
+    """Admin-only: hit/miss counters for cached API responses."""
     permission_classes = [permissions.IsAdminUser]
 
     def get(self, request):
-        users = User.objects.all().order_by('-date_joined')
-        data = []
-        for u in users:
-            profile = getattr(u, 'profile', None)
-            data.append({
-                'id': u.id,
-                'username': u.username,
-                'email': u.email,
-                'is_freelancer': u.is_freelancer,
-                'is_buyer': u.is_buyer,
-                'is_staff': u.is_staff,
-                'is_active': u.is_active,
-                'date_joined': u.date_joined,
-                'total_earnings': float(profile.total_earnings) if profile else 0,
-                'total_orders_completed': profile.total_orders_completed if profile else 0,
-            })
-        return Response(data)
+        from config.caching import get_stats
+        return Response(get_stats())
+
+
+class AdminRequestStatsView(APIView):
+    """Admin-only: per-route latency and query histograms; DELETE resets them."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        from config.instrumentation import get_stats
+        return Response(get_stats())
+
+    def delete(self, request):
+        from config.instrumentation import reset_stats
+        reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,36 @@
+"""Async inbox and history reads for ASGI deployments (see config/asyncviews.py)."""
+from django.shortcuts import aget_object_or_404
+from rest_framework.response import Response
+
+from config.asyncviews import AsyncAPIView
+from gigs.serializers import aget_saved_gig_ids
+from . import views
+from .models import Conversation
+
+
+class ConversationListView(AsyncAPIView):
+    view_class = views.ConversationListView
+
+    async def aget(self, view, request):
+        # For the ``is_saved`` flag of each conversation's gig.
+        context = view.get_serializer_context()
+        await aget_saved_gig_ids(context)
+        return await self.list_response(view, view.filter_queryset(view.get_queryset()), context)
+
+
+class MessageListCreateView(AsyncAPIView):
+    """History reads on the event loop; new messages go through the DRF view."""
+    view_class = views.MessageListCreateView
+
+    async def aget(self, view, request, pk):
+        conversation = await aget_object_or_404(Conversation, pk=pk)
+        messages = []
+        if await conversation.participants.filter(pk=request.user.pk).aexists():
+            queryset = view.filter_queryset(view.filter_messages(conversation.messages.select_related('sender')))
+            limit = view.history_limit()
+            if limit is not None:
+                queryset = queryset.order_by('-created_at', '-id')[:limit]
+            messages = [message async for message in queryset]
+            if limit is not None:
+                messages.reverse()
+        return Response(view.get_serializer(messages, many=True).data)
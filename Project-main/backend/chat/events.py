@@ -0,0 +1,111 @@
+"""
+In-process pub/sub for pushing chat events to connected clients.
+
+Views publish events after their transaction commits and the server-sent
+events stream in ``ChatEventStreamView`` drains a per-connection queue.
+Under ASGI the stream waits for events on the event loop
+(``Subscription.aget``) rather than in a worker thread. The broker lives in
+process memory, so it needs no outside service; in a
+multi-process deployment each worker only reaches its own subscribers and
+clients fall back to the incremental ``?after=`` message sync.
+"""
+import asyncio
+import itertools
+import json
+import queue
+import threading
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+
+class Subscription(queue.Queue):
+    """A subscriber's event queue, readable from threads (``get``) and the event loop (``aget``)."""
+
+    def __init__(self, maxsize=0):
+        super().__init__(maxsize)
+        self._waiters = set()
+
+    def _put(self, item):
+        # Called with ``self.mutex`` held, by whichever thread publishes.
+        super()._put(item)
+        for loop, wakeup in self._waiters:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def aget(self, timeout):
+        """``get(timeout=timeout)`` without blocking the event loop or holding a thread."""
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        waiter = (loop, wakeup)
+        with self.mutex:
+            self._waiters.add(waiter)
+        try:
+            deadline = loop.time() + timeout
+            while True:
+                wakeup.clear()
+                try:
+                    return self.get_nowait()
+                except queue.Empty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise queue.Empty
+                try:
+                    await asyncio.wait_for(wakeup.wait(), remaining)
+                except TimeoutError:
+                    pass
+        finally:
+            with self.mutex:
+                self._waiters.discard(waiter)
+
+
+class ChatEventBroker:
+    """Fan events out to per-user subscriber queues."""
+
+    def __init__(self, max_queue_size=100):
+        self.max_queue_size = max_queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, user_id):
+        subscription = Subscription(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            queues = self._subscribers.get(user_id)
+            if queues is None:
+                return
+            queues.discard(subscription)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def publish(self, user_ids, event_type, data):
+        event = {'id': next(self._ids), 'type': event_type, 'data': data}
+        with self._lock:
+            targets = [q for user_id in set(user_ids) for q in self._subscribers.get(user_id, ())]
+        for subscription in targets:
+            try:
+                subscription.put_nowait(event)
+            except queue.Full:
+                # A stalled client shouldn't hold up everyone else; it will
+                # resync with ?after= once it reconnects.
+                pass
+        return event
+
+
+broker = ChatEventBroker()
+
+
+def publish_on_commit(user_ids, event_type, data):
+    """Publish once the surrounding transaction commits."""
+    user_ids = list(user_ids)
+    transaction.on_commit(lambda: broker.publish(user_ids, event_type, data))
+
+
+def format_sse(event):
+    payload = json.dumps(event['data'], cls=DjangoJSONEncoder)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 from gigs.models import Gig
 
@@ -24,6 +25,11 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['conversation', 'created_at'], name='chat_msg_conv_created_idx'),
+            # Unread counts: messages in a conversation not yet read by the other side.
+            models.Index(fields=['conversation', 'sender'], condition=Q(is_read=False), name='chat_msg_unread_idx'),
+        ]
 
     def __str__(self):
         return f"Message {self.id} from {self.sender.username}"
@@ -1,14 +1,19 @@
 from rest_framework import serializers
 from .models import Conversation, Message
 from accounts.serializers import UserSerializer
+from images.fields import ImageDerivativesField
 from gigs.serializers import GigListSerializer
 
 class MessageSerializer(serializers.ModelSerializer):
     sender_detail = UserSerializer(source='sender', read_only=True)
+    attachment_variants = ImageDerivativesField(source='attachment')
 
     class Meta:
         model = Message
-        fields = ['id', 'conversation', 'sender', 'sender_detail', 'text', 'attachment', 'is_read', 'created_at']
+        fields = [
+            'id', 'conversation', 'sender', 'sender_detail', 'text', 'attachment', 'attachment_variants',
+            'is_read', 'created_at',
+        ]
         read_only_fields = ['conversation', 'sender', 'is_read']
 
 class ConversationSerializer(serializers.ModelSerializer):
@@ -22,13 +27,19 @@ class ConversationSerializer(serializers.ModelSerializer):
         fields = ['id', 'participants', 'gig', 'gig_detail', 'created_at', 'updated_at', 'last_message', 'unread_count']
 
     def get_last_message(self, obj):
-        last_msg = obj.messages.order_by('-created_at').first()
+        # ConversationListView prefetches the latest message as `last_messages`.
+        if hasattr(obj, 'last_messages'):
+            last_msg = obj.last_messages[0] if obj.last_messages else None
+        else:
+            last_msg = obj.messages.order_by('-created_at').first()
         if last_msg:
             return MessageSerializer(last_msg).data
         return None
 
     def get_unread_count(self, obj):
         request = self.context.get('request')
+        if hasattr(obj, 'unread_total'):
+            return obj.unread_total
         if request and request.user.is_authenticated:
             return obj.messages.exclude(sender=request.user).filter(is_read=False).count()
         return 0
@@ -1,3 +1,195 @@
-from django.test import TestCase
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User, Profile
+from gigs.models import Gig
+from .events import broker
+from .models import Conversation, Message
 
-# Create your tests here.
+
+class ConversationListQueryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='me', email='me@example.com', password='pass12345')
+        Profile.objects.create(user=self.user)
+        self.client.force_authenticate(self.user)
+
+    def add_conversations(self, count):
+        for _ in range(count):
+            other = User.objects.create_user(
+                username=f'user{User.objects.count()}',
+                email=f'user{User.objects.count()}@example.com',
+                password='pass12345',
+            )
+            gig = Gig.objects.create(seller=other, title='Gig', description='desc', price=10)
+            self.user.profile.saved_gigs.add(gig)
+            conversation = Conversation.objects.create(gig=gig)
+            conversation.participants.add(self.user, other)
+            Message.objects.create(conversation=conversation, sender=other, text='hello')
+            Message.objects.create(conversation=conversation, sender=self.user, text='hi')
+            Message.objects.create(conversation=conversation, sender=other, text='latest')
+
+    def count_list_queries(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/chat/conversations/', params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_is_flat(self):
+        self.add_conversations(2)
+        small, _ = self.count_list_queries()
+        self.add_conversations(8)
+        large, response = self.count_list_queries()
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data), 10)
+
+    def test_last_message_and_unread_count(self):
+        self.add_conversations(1)
+        _, response = self.count_list_queries()
+        conversation = response.data[0]
+        self.assertEqual(conversation['last_message']['text'], 'latest')
+        self.assertEqual(conversation['unread_count'], 2)
+
+    def test_cursor_pagination_is_opt_in(self):
+        self.add_conversations(3)
+        _, response = self.count_list_queries({'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        next_page = self.client.get(response.data['next'])
+        self.assertEqual(len(next_page.data['results']), 1)
+
+
+class MessageSyncTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='me', email='me@example.com', password='pass12345')
+        self.other = User.objects.create_user(username='you', email='you@example.com', password='pass12345')
+        self.conversation = Conversation.objects.create()
+        self.conversation.participants.add(self.user, self.other)
+        self.messages = [
+            Message.objects.create(conversation=self.conversation, sender=self.other, text=f'm{i}')
+            for i in range(5)
+        ]
+        self.url = f'/api/chat/conversations/{self.conversation.id}/messages/'
+        self.client.force_authenticate(self.user)
+
+    def texts(self, response):
+        return [m['text'] for m in response.data]
+
+    def test_full_history_without_params(self):
+        response = self.client.get(self.url)
+        self.assertEqual(self.texts(response), ['m0', 'm1', 'm2', 'm3', 'm4'])
+
+    def test_after_returns_only_newer_messages(self):
+        response = self.client.get(self.url, {'after': self.messages[2].id})
+        self.assertEqual(self.texts(response), ['m3', 'm4'])
+        response = self.client.get(self.url, {'after': self.messages[-1].id})
+        self.assertEqual(response.data, [])
+
+    def test_backward_paging_with_keyset(self):
+        response = self.client.get(self.url, {'limit': 2})
+        self.assertEqual(self.texts(response), ['m3', 'm4'])
+        response = self.client.get(self.url, {'before': response.data[0]['id'], 'limit': 2})
+        self.assertEqual(self.texts(response), ['m1', 'm2'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {'after': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ChatEventTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='me', email='me@example.com', password='pass12345')
+        self.other = User.objects.create_user(username='you', email='you@example.com', password='pass12345')
+        self.conversation = Conversation.objects.create()
+        self.conversation.participants.add(self.user, self.other)
+
+    def stream_ticket(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.post('/api/chat/events/ticket/')
+        self.client.force_authenticate(None)
+        self.assertEqual(response.status_code, 200)
+        return response.data['ticket']
+
+    def open_stream(self, user):
+        ticket = self.stream_ticket(user)
+        response = self.client.get('/api/chat/events/', {'ticket': ticket}, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 200)
+        stream = iter(response.streaming_content)
+        self.assertTrue(next(stream).startswith(b'retry:'))
+        return response, stream
+
+    def test_broker_fans_out_to_subscribers(self):
+        subscription = broker.subscribe(self.user.id)
+        try:
+            broker.publish([self.user.id, self.other.id], 'ping', {'ok': True})
+            event = subscription.get_nowait()
+        finally:
+            broker.unsubscribe(self.user.id, subscription)
+        self.assertEqual(event['type'], 'ping')
+        self.assertEqual(event['data'], {'ok': True})
+
+    def test_new_message_is_pushed_to_participants(self):
+        response, stream = self.open_stream(self.other)
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/chat/conversations/{self.conversation.id}/messages/', {'text': 'hello'})
+        chunk = next(stream).decode()
+        response.close()
+        self.assertIn('event: message.created', chunk)
+        self.assertIn('"text": "hello"', chunk)
+
+    def test_read_receipt_is_pushed(self):
+        Message.objects.create(conversation=self.conversation, sender=self.user, text='hello')
+        response, stream = self.open_stream(self.user)
+        self.client.force_authenticate(self.other)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/chat/conversations/{self.conversation.id}/read/')
+        chunk = next(stream).decode()
+        response.close()
+        self.assertIn('event: messages.read', chunk)
+
+    @override_settings(CHAT_EVENTS_KEEPALIVE_SECONDS=0.05)
+    def test_stream_is_served_asynchronously_under_asgi(self):
+        ticket = self.stream_ticket(self.other)
+
+        async def read():
+            response = await AsyncClient().get(
+                '/api/chat/events/', {'ticket': ticket}, headers={'accept': 'text/event-stream'},
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            stream = aiter(response.streaming_content)
+            chunks = [await anext(stream), await anext(stream)]
+            # Published from another thread, as views do after their commit.
+            await sync_to_async(broker.publish)([self.other.id], 'message.created', {'text': 'hello'})
+            chunk = await anext(stream)
+            while chunk.startswith(b':'):
+                chunk = await anext(stream)
+            await stream.aclose()
+            return chunks + [chunk]
+
+        retry, keepalive, event = async_to_sync(read)()
+        self.assertTrue(retry.startswith(b'retry:'))
+        self.assertEqual(keepalive, b': keep-alive\n\n')
+        self.assertIn(b'event: message.created', event)
+        self.assertIn(b'"text": "hello"', event)
+
+    def test_stream_requires_authentication(self):
+        response = self.client.get('/api/chat/events/', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 401)
+
+    def test_stream_does_not_accept_access_tokens_in_the_url(self):
+        token = RefreshToken.for_user(self.user).access_token
+        for params in ({'token': str(token)}, {'ticket': str(token)}):
+            response = self.client.get('/api/chat/events/', params, HTTP_ACCEPT='text/event-stream')
+            self.assertEqual(response.status_code, 401)
+
+    def test_stream_tickets_expire(self):
+        ticket = self.stream_ticket(self.user)
+        with override_settings(CHAT_EVENTS_TICKET_SECONDS=-1):
+            response = self.client.get('/api/chat/events/', {'ticket': ticket}, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get('/api/chat/events/', {'ticket': ticket + 'x'}, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 401)
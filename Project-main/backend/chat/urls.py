@@ -1,9 +1,11 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
-    path('conversations/', views.ConversationListView.as_view(), name='conversation-list'),
+    path('conversations/', async_views.ConversationListView.as_view(), name='conversation-list'),
     path('conversations/create/', views.ConversationCreateView.as_view(), name='conversation-create'),
-    path('conversations/<int:pk>/messages/', views.MessageListCreateView.as_view(), name='message-list-create'),
+    path('conversations/<int:pk>/messages/', async_views.MessageListCreateView.as_view(), name='message-list-create'),
     path('conversations/<int:pk>/read/', views.MarkMessagesReadView.as_view(), name='mark-messages-read'),
+    path('events/', views.ChatEventStreamView.as_view(), name='chat-events'),
+    path('events/ticket/', views.ChatEventTicketView.as_view(), name='chat-events-ticket'),
 ]
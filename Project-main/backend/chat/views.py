@@ -1,19 +1,72 @@
+import json
+import queue
+import time
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.renderers import BaseRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.conf import settings
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.db.models import Count, OuterRef, Prefetch, Q, Subquery
+from django.utils.dateparse import parse_datetime
+from django.db.models.functions import Coalesce
+from config.pagination import OptionalCursorPagination
+from .events import broker, format_sse, publish_on_commit
 from .models import Conversation, Message
 from .serializers import ConversationSerializer, MessageSerializer
 from accounts.models import User
 
+
+class ConversationCursorPagination(OptionalCursorPagination):
+    ordering = ('-updated_at', '-id')
+
+
 class ConversationListView(generics.ListAPIView):
-    """List all conversations for the authenticated user."""
+    """
+    List all conversations for the authenticated user.
+
+    The whole inbox is built in a fixed number of queries: last message and
+    unread count come from subquery annotations, participants and the last
+    message rows are prefetched, and the gig is joined in.
+    """
     serializer_class = ConversationSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None
+    pagination_class = ConversationCursorPagination
+    ordering = ('-updated_at', '-id')
 
     def get_queryset(self):
-        return self.request.user.conversations.all()
+        user = self.request.user
+        latest = Message.objects.filter(
+            conversation=OuterRef('pk')
+        ).order_by('-created_at', '-id').values('id')[:1]
+        unread = Message.objects.filter(
+            conversation=OuterRef('pk'), is_read=False
+        ).exclude(sender=user).order_by().values('conversation').annotate(
+            total=Count('id')
+        ).values('total')
+
+        conversations = user.conversations.all()
+        last_message_ids = conversations.annotate(
+            latest_id=Subquery(latest)
+        ).values('latest_id')
+
+        return conversations.annotate(
+            unread_total=Coalesce(Subquery(unread), 0),
+        ).select_related(
+            'gig', 'gig__seller', 'gig__category'
+        ).prefetch_related(
+            'participants',
+            Prefetch(
+                'messages',
+                queryset=Message.objects.filter(id__in=last_message_ids).select_related('sender'),
+                to_attr='last_messages',
+            ),
+        )
 
 class ConversationCreateView(APIView):
     """Create a conversation with another user or return an existing one."""
@@ -31,6 +84,8 @@ class ConversationCreateView(APIView):
         if other_user == request.user:
             return Response({'error': 'Cannot create a conversation with yourself'}, status=status.HTTP_400_BAD_REQUEST)
 
+        created = False
+
         # Base filter: both users are participants
         conversations = Conversation.objects.filter(participants=request.user).filter(participants=other_user)
         
@@ -40,40 +95,110 @@ class ConversationCreateView(APIView):
             if not conversation:
                 conversation = Conversation.objects.create(gig_id=gig_id)
                 conversation.participants.add(request.user, other_user)
+                created = True
         else:
             # Look for a general conversation (gig_id is null)
             conversation = conversations.filter(gig_id__isnull=True).first()
             if not conversation:
                 conversation = Conversation.objects.create()
                 conversation.participants.add(request.user, other_user)
+                created = True
+
+        if created:
+            publish_on_commit([request.user.id, other_user.id], 'conversation.created', {
+                'conversation': conversation.id,
+            })
 
         serializer = ConversationSerializer(conversation, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 class MessageListCreateView(generics.ListCreateAPIView):
-    """List messages for a conversation and create new messages."""
+    """
+    List messages for a conversation and create new messages.
+
+    Without query parameters the full history is returned. Pollers can pass
+    ``?after=<message id>`` or ``?since=<ISO timestamp>`` to receive only newer
+    messages (an empty list when nothing changed). ``?limit=N`` returns the
+    latest N messages and ``?before=<message id>&limit=N`` pages backwards
+    through older history using a keyset on ``(created_at, id)``.
+    """
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = None
+    history_page_size = 50
+    max_history_page_size = 200
 
     def get_queryset(self):
         conversation_id = self.kwargs.get('pk')
         conversation = get_object_or_404(Conversation, pk=conversation_id)
         
         # Verify user is a participant
-        if self.request.user not in conversation.participants.all():
+        if not conversation.participants.filter(pk=self.request.user.pk).exists():
             return Message.objects.none()
-            
-        return conversation.messages.all()
+
+        return self.filter_messages(conversation.messages.select_related('sender'))
+
+    def filter_messages(self, messages):
+        """Apply ``after``/``since``/``before`` to a conversation's messages, without querying."""
+        params = self.request.query_params
+
+        if 'after' in params:
+            messages = messages.filter(id__gt=self._int_param('after'))
+        if 'since' in params:
+            since = parse_datetime(params['since'])
+            if since is None:
+                raise ValidationError({'since': 'Must be an ISO 8601 timestamp.'})
+            messages = messages.filter(created_at__gt=since)
+        if 'before' in params:
+            # An unknown pivot makes both comparisons NULL: an empty page.
+            before = self._int_param('before')
+            pivot = Subquery(messages.filter(pk=before).values('created_at')[:1])
+            messages = messages.filter(
+                Q(created_at__lt=pivot) |
+                Q(created_at=pivot, id__lt=before)
+            )
+
+        return messages.order_by('created_at', 'id')
+
+    def history_limit(self):
+        """Page size for ``before``/``limit`` history requests; None for the other modes."""
+        params = self.request.query_params
+        if 'before' not in params and 'limit' not in params:
+            return None
+        limit = self._int_param('limit') if params.get('limit') else self.history_page_size
+        return max(1, min(limit, self.max_history_page_size))
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        limit = self.history_limit()
+        if limit is not None:
+            # Walk the (conversation, created_at) index backwards, then restore
+            # chronological order for the client.
+            queryset = list(queryset.order_by('-created_at', '-id')[:limit])[::-1]
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    def _int_param(self, name):
+        try:
+            return int(self.request.query_params[name])
+        except (TypeError, ValueError):
+            raise ValidationError({name: 'Must be an integer.'})
 
     def perform_create(self, serializer):
         conversation_id = self.kwargs.get('pk')
         conversation = get_object_or_404(Conversation, pk=conversation_id)
-        serializer.save(sender=self.request.user, conversation=conversation)
+        message = serializer.save(sender=self.request.user, conversation=conversation)
         
         # Update conversation's updated_at timestamp natively
         conversation.save()
 
+        participant_ids = conversation.participants.values_list('id', flat=True)
+        publish_on_commit(participant_ids, 'message.created', {
+            'conversation': conversation.id,
+            'updated_at': conversation.updated_at,
+            'message': MessageSerializer(message).data,
+        })
+
 class MarkMessagesReadView(APIView):
     """Mark all unread messages in a conversation as read for the current user."""
     permission_classes = [permissions.IsAuthenticated]
@@ -82,10 +207,126 @@ class MarkMessagesReadView(APIView):
         conversation = get_object_or_404(Conversation, pk=pk)
         
         # Verify user is a participant
-        if request.user not in conversation.participants.all():
+        participant_ids = list(conversation.participants.values_list('id', flat=True))
+        if request.user.id not in participant_ids:
             return Response({'error': 'Not part of this conversation'}, status=status.HTTP_403_FORBIDDEN)
 
         unread_messages = conversation.messages.exclude(sender=request.user).filter(is_read=False)
         updated_count = unread_messages.update(is_read=True)
+
+        if updated_count:
+            publish_on_commit(participant_ids, 'messages.read', {
+                'conversation': conversation.id,
+                'reader': request.user.id,
+                'updated': updated_count,
+            })
         
         return Response({'success': True, 'updated': updated_count}, status=status.HTTP_200_OK)
+
+
+class EventStreamRenderer(BaseRenderer):
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only error responses are rendered; the stream itself bypasses renderers.
+        if data is None:
+            return b''
+        return json.dumps(data).encode()
+
+
+STREAM_TICKET_SALT = 'chat.events.ticket'
+
+
+class ChatEventTicketView(APIView):
+    """
+    Issue a ticket for opening the event stream.
+
+    EventSource cannot send an Authorization header, and an access token in
+    the URL would end up in access logs. A ticket is signed for this one
+    purpose and only opens a stream for ``CHAT_EVENTS_TICKET_SECONDS``.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        return Response({
+            'ticket': signing.dumps(request.user.id, salt=STREAM_TICKET_SALT),
+            'expires_in': settings.CHAT_EVENTS_TICKET_SECONDS,
+        })
+
+
+class StreamTicketAuthentication(JWTAuthentication):
+    """JWT auth that also accepts ``?ticket=`` from ``ChatEventTicketView``."""
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            return result
+        ticket = request.query_params.get('ticket')
+        if not ticket:
+            return None
+        try:
+            user_id = signing.loads(ticket, salt=STREAM_TICKET_SALT, max_age=settings.CHAT_EVENTS_TICKET_SECONDS)
+        except signing.BadSignature:
+            raise AuthenticationFailed('Invalid or expired stream ticket.', code='invalid_ticket')
+        user = User.objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed('Invalid or expired stream ticket.', code='invalid_ticket')
+        return user, None
+
+
+class ChatEventStreamView(APIView):
+    """
+    Server-sent events stream of chat activity for the authenticated user.
+
+    Emits ``message.created``, ``messages.read`` and ``conversation.created``
+    events, plus keep-alive comments. The stream closes after
+    ``CHAT_EVENTS_STREAM_TIMEOUT`` seconds and EventSource reconnects.
+
+    Under ASGI the stream is an async generator: Django would otherwise
+    buffer a sync one to the end before sending anything.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = [StreamTicketAuthentication]
+    renderer_classes = [EventStreamRenderer]
+
+    def get(self, request):
+        keepalive = getattr(settings, 'CHAT_EVENTS_KEEPALIVE_SECONDS', 15)
+        timeout = getattr(settings, 'CHAT_EVENTS_STREAM_TIMEOUT', 300)
+        user_id = request.user.id
+
+        def stream():
+            subscription = broker.subscribe(user_id)
+            try:
+                yield 'retry: 3000\n\n'
+                deadline = time.monotonic() + timeout
+                while time.monotonic() < deadline:
+                    try:
+                        event = subscription.get(timeout=keepalive)
+                    except queue.Empty:
+                        yield ': keep-alive\n\n'
+                        continue
+                    yield format_sse(event)
+            finally:
+                broker.unsubscribe(user_id, subscription)
+
+        async def astream():
+            subscription = broker.subscribe(user_id)
+            try:
+                yield 'retry: 3000\n\n'
+                deadline = time.monotonic() + timeout
+                while time.monotonic() < deadline:
+                    try:
+                        event = await subscription.aget(timeout=keepalive)
+                    except queue.Empty:
+                        yield ': keep-alive\n\n'
+                        continue
+                    yield format_sse(event)
+            finally:
+                broker.unsubscribe(user_id, subscription)
+
+        events = astream() if isinstance(request._request, ASGIRequest) else stream()
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
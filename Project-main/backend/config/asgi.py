@@ -0,0 +1,18 @@
+"""
+ASGI config for SkillBridge project.
+
+Serve with any ASGI server, e.g. ``uvicorn config.asgi:application
+--workers 4``. Async views are on by default here (``ASYNC_VIEWS``).
+Database connections are closed after every request (``DB_CONN_MAX_AGE=0``)
+unless configured otherwise: async requests run their queries in
+per-request threads, so a kept connection would never be reused and would
+only pile up. The chat event stream (/api/chat/events/) is an async
+generator here, so an open stream holds no worker thread.
+"""
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'true')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+application = get_asgi_application()
@@ -0,0 +1,137 @@
+"""
+Async counterparts of DRF views, served when ``ASYNC_VIEWS`` is on (the
+default under config/asgi.py).
+
+DRF views are synchronous: under ASGI Django runs each one in a worker
+thread, and a request waiting on the database or an external API holds that
+thread for its whole duration. ``AsyncAPIView`` serves the methods a
+subclass defines as ``a<method>`` (``aget``, ``apost``) on the event loop and
+leaves everything else to the DRF view in ``view_class``. The DRF view is
+still what defines the endpoint: its permissions, serializers, paginator,
+exception handling and renderers are reused, so both paths return the same
+responses. Only the I/O moves: the user behind the JWT is loaded with the
+async ORM, and handlers use ``aget``/``async for`` (or ``sync_to_async`` for
+DRF pieces that evaluate querysets themselves, such as paginators and
+django-filter forms).
+
+Under WSGI, or with ``ASYNC_VIEWS`` off, ``as_view()`` returns the DRF view
+itself.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .routers import use_primary
+
+
+async def aauthenticate(request):
+    """``(user, token)`` for the request's JWT, None without one; what ``JWTAuthentication`` does, without blocking."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    token = authentication.get_validated_token(raw_token)
+    try:
+        user_id = token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken('Token contained no recognizable user identification')
+    User = get_user_model()
+    try:
+        user = await User.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+    except User.DoesNotExist:
+        raise AuthenticationFailed('User not found', code='user_not_found')
+    if not user.is_active:
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+    return user, token
+
+
+class Authenticated(JWTAuthentication):
+    """Hands the credentials ``aauthenticate`` loaded to the DRF request."""
+
+    def __init__(self, user, token):
+        super().__init__()
+        self.credentials = (user, token)
+
+    def authenticate(self, request):
+        return self.credentials
+
+
+class AsyncAPIView(View):
+    """Serve ``a<method>`` handlers of a DRF view on the event loop; see the module docstring."""
+    view_class = None
+    view_is_async = True
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        if not settings.ASYNC_VIEWS:
+            return cls.view_class.as_view(**initkwargs)
+        # Like APIView.as_view(): CSRF is left to SessionAuthentication.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        handler = getattr(self, f'a{method}', None)
+        if handler is None and method == 'head':
+            handler = getattr(self, 'aget', None)
+        if handler is None:
+            return await sync_to_async(self.view_class.as_view())(request, *args, **kwargs)
+
+        view = self.view_class()
+        view.setup(request, *args, **kwargs)
+        drf_request = view.initialize_request(request, *args, **kwargs)
+        view.request = drf_request
+        view.headers = view.default_response_headers
+        try:
+            credentials = await aauthenticate(request)
+            if credentials is not None:
+                drf_request.authenticators = (Authenticated(*credentials),)
+            view.initial(drf_request, *args, **kwargs)
+            response = await handler(view, drf_request, *args, **kwargs)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+        response = view.finalize_response(drf_request, response, *args, **kwargs)
+        # Rendered here, on the event loop, rather than by Django in a worker thread.
+        response.render()
+        return HttpResponse(response.content, status=response.status_code, headers=dict(response.items()))
+
+    async def list_response(self, view, queryset, context=None):
+        """``ListModelMixin.list`` for an already filtered queryset."""
+        page = None
+        if view.paginator is not None:
+            # DRF paginators count and slice synchronously.
+            page = await sync_to_async(view.paginate_queryset)(queryset)
+        rows = page if page is not None else [row async for row in queryset]
+        serializer = view.get_serializer(rows, many=True, **({'context': context} if context else {}))
+        if page is not None:
+            return view.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    async def serve_cached(self, view, request, build):
+        """``CachedResponseMixin.get`` with ``build()`` producing the uncached response."""
+        key, data = await sync_to_async(view.get_cached_data)(request)
+        cache_status = 'HIT'
+        if data is None:
+            with use_primary():
+                response = await build()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            await sync_to_async(view.set_cached_data)(key, data)
+            cache_status = 'MISS'
+        data = await self.apersonalize_cached_data(view, data)
+        return view.cached_response(request, data, cache_status)
+
+    async def apersonalize_cached_data(self, view, data):
+        return data
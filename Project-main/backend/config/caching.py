@@ -0,0 +1,154 @@
+"""
+Response caching for read-heavy public endpoints.
+
+Cached responses are keyed on the view, the path, the query string and a
+version token for every dependency the view declares (``'gig:12'``,
+``'categories'`` ...). Writes call ``invalidate()`` with the dependencies
+they touch, which swaps those tokens so every response built from them is
+skipped from then on; nothing has to enumerate or delete keys. Bodies are
+stored without per-user fields; views re-apply those on every request.
+"""
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .routers import use_primary
+
+VERSION_PREFIX = 'respcache:version:'
+ENTRY_PREFIX = 'respcache:entry:'
+STATS_PREFIX = 'respcache:stats:'
+STATS_INDEX_KEY = 'respcache:stats-index'
+
+
+def _version_keys(dependencies):
+    return [VERSION_PREFIX + dep for dep in dependencies]
+
+
+def get_versions(dependencies):
+    """Return the current version token of each dependency, creating missing ones."""
+    keys = _version_keys(dependencies)
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        # A fresh random token (rather than restarting a counter) means an
+        # evicted version key can never resurrect an older cached entry.
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*dependencies):
+    """Expire cached responses that depend on any of ``dependencies``."""
+    def bump():
+        cache.set_many({key: uuid.uuid4().hex for key in _version_keys(dependencies)}, timeout=None)
+
+    bump()
+    # Bump again after commit so a response rebuilt from uncommitted state
+    # by a concurrent request is not served afterwards.
+    transaction.on_commit(bump)
+
+
+def record(namespace, outcome):
+    key = f'{STATS_PREFIX}{namespace}:{outcome}'
+    if cache.add(key, 1, timeout=None):
+        index = cache.get(STATS_INDEX_KEY, set())
+        if namespace not in index:
+            cache.set(STATS_INDEX_KEY, index | {namespace}, timeout=None)
+    else:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    """Hit/miss counters per cached view, as ``{namespace: {'hits', 'misses', 'hit_rate'}}``."""
+    stats = {}
+    for namespace in sorted(cache.get(STATS_INDEX_KEY, set())):
+        hits = cache.get(f'{STATS_PREFIX}{namespace}:hit', 0)
+        misses = cache.get(f'{STATS_PREFIX}{namespace}:miss', 0)
+        total = hits + misses
+        stats[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+        }
+    return stats
+
+
+def compute_etag(data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode()
+    return '"%s"' % hashlib.md5(payload).hexdigest()
+
+
+class CachedResponseMixin:
+    """
+    Cache successful GET responses of a DRF view.
+
+    Views set ``cache_namespace`` and implement ``get_cache_dependencies``;
+    ``personalize_cached_data`` re-applies per-user fields to the shared body.
+    Responses carry an ETag and honour ``If-None-Match``.
+    """
+    cache_namespace = None
+    cache_timeout = None
+
+    def get_cache_dependencies(self):
+        return [self.cache_namespace]
+
+    def personalize_cached_data(self, data):
+        return data
+
+    def get_cache_key(self, request):
+        versions = get_versions(self.get_cache_dependencies())
+        query = sorted(request.query_params.lists())
+        raw = json.dumps([request.path, query, versions])
+        return f'{ENTRY_PREFIX}{self.cache_namespace}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+    def get_cached_data(self, request):
+        """``(key, data)`` for this request; ``data`` is None on a miss. Counts the hit or miss."""
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        record(self.cache_namespace, 'miss' if data is None else 'hit')
+        return key, data
+
+    def set_cached_data(self, key, data):
+        timeout = self.cache_timeout or getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+        cache.set(key, data, timeout)
+
+    def cached_response(self, request, data, cache_status):
+        """The response for an (already personalized) body, or a 304 if the client has it."""
+        etag = compute_etag(data)
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        response['X-Cache'] = cache_status
+        response['Cache-Control'] = 'no-cache'
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+    def get(self, request, *args, **kwargs):
+        key, data = self.get_cached_data(request)
+        cache_status = 'HIT'
+        if data is None:
+            # Shared entries are built from the primary: a lagging replica
+            # could otherwise refill a just-invalidated entry with old data.
+            with use_primary():
+                response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            self.set_cached_data(key, data)
+            cache_status = 'MISS'
+        return self.cached_response(request, self.personalize_cached_data(data), cache_status)
@@ -0,0 +1,116 @@
+"""
+Database settings built from the environment.
+
+``DB_ENGINE`` picks the profile:
+
+``sqlite`` (default)
+    ``DB_NAME`` (default ``db.sqlite3`` next to manage.py). Unless
+    ``SQLITE_TUNING=false``, every connection sets a busy timeout, a memory
+    map of ``SQLITE_MMAP_SIZE`` bytes and a larger page cache.
+    ``SQLITE_WAL=true`` also switches to WAL (readers no longer block the
+    writer or each other) with ``synchronous=NORMAL`` (no fsync per commit in
+    WAL mode; still durable across application crashes). WAL is stored in
+    the database file and adds ``-wal``/``-shm`` files next to it, so it is
+    opt-in per database rather than applied to whatever ``DB_NAME`` points
+    at. Transactions take the write lock up front (``IMMEDIATE``) so
+    concurrent read-then-write transactions queue instead of failing.
+
+``postgres``
+    ``DB_NAME``, ``DB_USER``, ``DB_PASSWORD``, ``DB_HOST``, ``DB_PORT``.
+    ``DB_POOL=true`` uses psycopg's connection pool (``DB_POOL_MIN_SIZE`` /
+    ``DB_POOL_MAX_SIZE`` per process) instead of one connection per thread.
+
+Connections are kept for ``DB_CONN_MAX_AGE`` seconds (0 closes them after
+every request, ``none`` keeps them forever) and checked before reuse.
+
+``DB_REPLICAS`` lists read replicas, comma-separated: database files for
+SQLite, hosts for Postgres (same name and credentials as the primary). They
+become the aliases ``replica1``, ``replica2``... used by config/routers.py.
+"""
+import os
+
+
+def _bool(value):
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def sqlite_pragmas(environ=os.environ):
+    """PRAGMA statements run on every new SQLite connection."""
+    if not _bool(environ.get('SQLITE_TUNING', 'true')):
+        return []
+    busy_timeout_ms = int(float(environ.get('DB_TIMEOUT', 20)) * 1000)
+    pragmas = []
+    if _bool(environ.get('SQLITE_WAL', 'false')):
+        pragmas += ['PRAGMA journal_mode=WAL', 'PRAGMA synchronous=NORMAL']
+    return pragmas + [
+        f'PRAGMA busy_timeout={busy_timeout_ms}',
+        f'PRAGMA mmap_size={int(environ.get("SQLITE_MMAP_SIZE", 256 * 2 ** 20))}',
+        # Negative means KiB rather than pages.
+        f'PRAGMA cache_size=-{int(environ.get("SQLITE_CACHE_KB", 20000))}',
+        'PRAGMA temp_store=MEMORY',
+    ]
+
+
+def database_settings(base_dir, environ=os.environ):
+    """The ``DATABASES['default']`` entry for the configured profile."""
+    engine = environ.get('DB_ENGINE', 'sqlite').lower()
+    conn_max_age = environ.get('DB_CONN_MAX_AGE', '60')
+    conn_max_age = None if conn_max_age.lower() == 'none' else int(conn_max_age)
+
+    if engine == 'sqlite':
+        pragmas = sqlite_pragmas(environ)
+        options = {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': float(environ.get('DB_TIMEOUT', 20)),
+        }
+        if pragmas:
+            options['init_command'] = ';'.join(pragmas)
+        return {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': environ.get('DB_NAME') or base_dir / 'db.sqlite3',
+            'OPTIONS': options,
+            'CONN_MAX_AGE': conn_max_age,
+            'CONN_HEALTH_CHECKS': True,
+        }
+
+    if engine in ('postgres', 'postgresql'):
+        options = {'connect_timeout': int(environ.get('DB_CONNECT_TIMEOUT', 5))}
+        if _bool(environ.get('DB_POOL', 'false')):
+            options['pool'] = {
+                'min_size': int(environ.get('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(environ.get('DB_POOL_MAX_SIZE', 10)),
+                'timeout': float(environ.get('DB_TIMEOUT', 20)),
+            }
+            # The pool owns the connections; Django must not keep its own.
+            conn_max_age = 0
+        return {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': environ.get('DB_NAME', 'skillbridge'),
+            'USER': environ.get('DB_USER', 'skillbridge'),
+            'PASSWORD': environ.get('DB_PASSWORD', ''),
+            'HOST': environ.get('DB_HOST', 'localhost'),
+            'PORT': environ.get('DB_PORT', '5432'),
+            'OPTIONS': options,
+            'CONN_MAX_AGE': conn_max_age,
+            'CONN_HEALTH_CHECKS': True,
+        }
+
+    raise ValueError(f'Unsupported DB_ENGINE "{engine}"; use "sqlite" or "postgres".')
+
+
+def replica_settings(primary, environ=os.environ):
+    """``{alias: settings}`` for the replicas in ``DB_REPLICAS``, derived from ``primary``."""
+    replicas = {}
+    entries = [entry.strip() for entry in environ.get('DB_REPLICAS', '').split(',') if entry.strip()]
+    for number, entry in enumerate(entries, 1):
+        replica = dict(primary, OPTIONS=dict(primary['OPTIONS']))
+        if primary['ENGINE'].endswith('sqlite3'):
+            replica['NAME'] = entry
+            # Never takes the write lock.
+            replica['OPTIONS'].pop('transaction_mode', None)
+        else:
+            replica['HOST'] = entry
+        # Tests read and write one database.
+        replica['TEST'] = {'MIRROR': 'default'}
+        replicas[f'replica{number}'] = replica
+    return replicas
@@ -0,0 +1,336 @@
+"""
+Per-request database and latency instrumentation.
+
+Every database connection gets an ``execute_wrapper`` that hands its
+queries to the recorder ``InstrumentationMiddleware`` sets for the current
+request (a context variable, so queries the async ORM runs in worker
+threads are counted too). It sees each query (with or without DEBUG) and
+records the query count, the time spent in SQL and which statements ran
+more than once with different parameters (the fingerprint of an N+1 loop).
+The numbers go back to the client in a ``Server-Timing`` header, and
+requests slower than ``INSTRUMENTATION_SLOW_REQUEST_MS`` are logged with
+their SQL.
+
+Per-route histograms are kept in process and added to counters in the
+cache every ``INSTRUMENTATION_FLUSH_SECONDS``, so a request costs a few
+dictionary updates and the cache is only touched now and then. Buckets are
+fixed, which lets any number of worker processes add up into the same
+counters; ``get_stats`` reads them back for the admin endpoint.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+STATS_PREFIX = 'instrumentation:'
+ROUTES_KEY = 'instrumentation:routes'
+# Upper bounds of the histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+COUNTERS = ('requests', 'errors', 'queries', 'duplicates', 'total_us', 'sql_us')
+MAX_FINGERPRINTS = 5
+MAX_LOGGED_QUERIES = 50
+# Query parameters that carry credentials (stream tickets, signed media URLs).
+REDACTED_PARAMS = ('token', 'ticket')
+
+_IN_LIST = re.compile(r'\(%s(?:, %s)*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+
+
+def fingerprint(sql):
+    """``sql`` with parameter lists collapsed, so ``IN (%s, %s)`` and ``IN (%s)`` match."""
+    return _NUMBER.sub('N', _IN_LIST.sub('(%s, ...)', sql))
+
+
+def _prefix(route):
+    # Routes contain spaces and brackets, which aren't portable in cache keys.
+    return f'{STATS_PREFIX}{hashlib.md5(route.encode()).hexdigest()}:'
+
+
+def _keys(prefix):
+    keys = [prefix + name for name in COUNTERS + ('max_ms', 'fingerprints')]
+    keys += [f'{prefix}latency:{i}' for i in range(len(LATENCY_BUCKETS_MS) + 1)]
+    keys += [f'{prefix}queries:{i}' for i in range(len(QUERY_BUCKETS) + 1)]
+    return keys
+
+
+def bucket(value, bounds):
+    for index, bound in enumerate(bounds):
+        if value <= bound:
+            return index
+    return len(bounds)
+
+
+class QueryRecorder:
+    """``execute_wrapper`` callable collecting ``(sql, seconds)`` for each statement."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def sql_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self):
+        """``{fingerprint: count}`` for statements that ran more than once."""
+        counts = Counter(fingerprint(sql) for sql, _ in self.queries)
+        return {sql: count for sql, count in counts.items() if count > 1}
+
+
+_recorder = ContextVar('query_recorder', default=None)
+
+
+def _record(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install(connection):
+    """Send ``connection``'s queries to the current request's recorder; safe to call repeatedly."""
+    if _record not in connection.execute_wrappers:
+        # First, so wrappers pushed and popped by ``execute_wrapper()`` blocks stay last.
+        connection.execute_wrappers.insert(0, _record)
+
+
+def _install_on_connect(sender, connection, **kwargs):
+    install(connection)
+
+
+connection_created.connect(_install_on_connect)
+
+
+class RouteStats:
+    """Histograms for the requests this process has served since the last flush."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.last_flush = time.monotonic()
+
+    def add(self, route, status_code, total, recorder, duplicates):
+        latency_ms = total * 1000
+        with self.lock:
+            counters = self.pending.setdefault(route, Counter())
+            counters['requests'] += 1
+            counters['errors'] += status_code >= 500
+            counters['queries'] += len(recorder.queries)
+            counters['duplicates'] += sum(duplicates.values()) - len(duplicates)
+            counters['total_us'] += int(total * 1e6)
+            counters['sql_us'] += int(recorder.sql_time * 1e6)
+            counters[f'latency:{bucket(latency_ms, LATENCY_BUCKETS_MS)}'] += 1
+            counters[f'queries:{bucket(len(recorder.queries), QUERY_BUCKETS)}'] += 1
+            counters['max_ms'] = max(counters['max_ms'], int(latency_ms))
+            for sql, count in duplicates.items():
+                counters[f'fingerprint:{sql}'] = max(counters[f'fingerprint:{sql}'], count)
+            due = time.monotonic() - self.last_flush >= settings.INSTRUMENTATION_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+        if not pending:
+            return
+        routes = cache.get(ROUTES_KEY, set())
+        if not routes.issuperset(pending):
+            cache.set(ROUTES_KEY, routes | set(pending), timeout=None)
+        for route, counters in pending.items():
+            _merge(route, counters)
+
+
+def _increment(key, delta):
+    if not cache.add(key, delta, timeout=None):
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            cache.set(key, delta, timeout=None)
+
+
+def _merge(route, counters):
+    prefix = _prefix(route)
+    fingerprints = {}
+    for name, value in counters.items():
+        if name.startswith('fingerprint:'):
+            fingerprints[name[len('fingerprint:'):]] = value
+        elif name == 'max_ms':
+            if value > cache.get(prefix + name, 0):
+                cache.set(prefix + name, value, timeout=None)
+        elif value:
+            _increment(prefix + name, value)
+    if fingerprints:
+        stored = cache.get(prefix + 'fingerprints', {})
+        for sql, count in fingerprints.items():
+            stored[sql] = max(stored.get(sql, 0), count)
+        top = sorted(stored.items(), key=lambda item: -item[1])[:MAX_FINGERPRINTS]
+        cache.set(prefix + 'fingerprints', dict(top), timeout=None)
+
+
+route_stats = RouteStats()
+
+
+def _percentile(counts, bounds, pct):
+    """Upper bound of the bucket holding the ``pct``-th percentile; None for the open bucket."""
+    total = sum(counts)
+    if not total:
+        return None
+    seen = 0
+    for index, count in enumerate(counts):
+        seen += count
+        if seen >= total * pct / 100:
+            return bounds[index] if index < len(bounds) else None
+    return None
+
+
+def _histogram(counts, bounds):
+    labels = [f'<={bound}' for bound in bounds] + [f'>{bounds[-1]}']
+    return {label: count for label, count in zip(labels, counts) if count}
+
+
+def get_stats():
+    """Aggregated request metrics per ``"METHOD route"``, including this process's unflushed requests."""
+    route_stats.flush()
+    stats = {}
+    for route in sorted(cache.get(ROUTES_KEY, set())):
+        prefix = _prefix(route)
+        values = cache.get_many(_keys(prefix))
+        counters = {name: values.get(prefix + name, 0) for name in COUNTERS}
+        requests = counters['requests']
+        if not requests:
+            continue
+        latency = [values.get(f'{prefix}latency:{i}', 0) for i in range(len(LATENCY_BUCKETS_MS) + 1)]
+        queries = [values.get(f'{prefix}queries:{i}', 0) for i in range(len(QUERY_BUCKETS) + 1)]
+        stats[route] = {
+            'requests': requests,
+            'errors': counters['errors'],
+            'latency_ms': {
+                'mean': round(counters['total_us'] / requests / 1000, 2),
+                'p50': _percentile(latency, LATENCY_BUCKETS_MS, 50),
+                'p95': _percentile(latency, LATENCY_BUCKETS_MS, 95),
+                'p99': _percentile(latency, LATENCY_BUCKETS_MS, 99),
+                'max': values.get(prefix + 'max_ms', 0),
+                'histogram': _histogram(latency, LATENCY_BUCKETS_MS),
+            },
+            'queries': {
+                'mean': round(counters['queries'] / requests, 2),
+                'p95': _percentile(queries, QUERY_BUCKETS, 95),
+                'duplicates_mean': round(counters['duplicates'] / requests, 2),
+                'histogram': _histogram(queries, QUERY_BUCKETS),
+            },
+            'sql_ms_mean': round(counters['sql_us'] / requests / 1000, 2),
+            'duplicate_fingerprints': values.get(prefix + 'fingerprints', {}),
+        }
+    return stats
+
+
+def reset_stats():
+    routes = cache.get(ROUTES_KEY, set())
+    with route_stats.lock:
+        route_stats.pending = {}
+    keys = [ROUTES_KEY]
+    for route in routes:
+        keys += _keys(_prefix(route))
+    cache.delete_many(keys)
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return f'{request.method} /{match.route}' if match else f'{request.method} <unresolved>'
+
+
+class InstrumentationMiddleware:
+    """Record queries, SQL time and wall time of each request; see the module docstring."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.INSTRUMENTATION_ENABLED:
+            return self.get_response(request)
+        # Connections opened before this module was imported missed the signal.
+        for connection in connections.all():
+            install(connection)
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.process(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not settings.INSTRUMENTATION_ENABLED:
+            return await self.get_response(request)
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.process(request, response, recorder, time.perf_counter() - start)
+
+    def process(self, request, response, recorder, total):
+        duplicates = recorder.duplicates()
+        sql_time = recorder.sql_time
+        if settings.INSTRUMENTATION_SERVER_TIMING:
+            repeated = sum(duplicates.values()) - len(duplicates)
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={sql_time * 1000:.1f};desc="{len(recorder.queries)} queries, {repeated} repeated"',
+                f'app;dur={(total - sql_time) * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ])
+        route = route_name(request)
+        route_stats.add(route, response.status_code, total, recorder, duplicates)
+        if total * 1000 >= settings.INSTRUMENTATION_SLOW_REQUEST_MS:
+            log_slow_request(request, route, response.status_code, total, recorder, duplicates)
+        return response
+
+
+def loggable_path(request):
+    """The request path and query string, with credential parameters redacted."""
+    query = request.GET.copy()
+    for name in REDACTED_PARAMS:
+        if name in query:
+            query.setlist(name, ['REDACTED'])
+    return f'{request.path}?{query.urlencode()}' if query else request.path
+
+
+def log_slow_request(request, route, status_code, total, recorder, duplicates):
+    lines = [
+        f'Slow request {request.method} {loggable_path(request)} ({route}) -> {status_code}: '
+        f'{total * 1000:.0f}ms, {len(recorder.queries)} queries in {recorder.sql_time * 1000:.0f}ms'
+    ]
+    for sql, count in duplicates.items():
+        lines.append(f'  repeated {count}x: {sql}')
+    slowest = sorted(recorder.queries, key=lambda query: -query[1])[:MAX_LOGGED_QUERIES]
+    for sql, duration in slowest:
+        lines.append(f'  {duration * 1000:7.1f}ms  {sql}')
+    logger.warning('\n'.join(lines))
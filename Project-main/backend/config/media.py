@@ -0,0 +1,223 @@
+"""
+Serving user-uploaded media.
+
+``serve_media`` replaces the DEBUG-only static view. It answers conditional
+requests (ETag / Last-Modified → 304), single byte ranges (206, with
+If-Range), and streams whole files through ``FileResponse`` so the WSGI
+server can use ``sendfile``. With ``MEDIA_ACCEL_REDIRECT`` set, nginx is
+told to send the file itself via ``X-Accel-Redirect``.
+
+``MediaStorage`` puts a hash of the content into the names of public
+uploads (``gigs/logo.3f2a9c1b7d4e.png``), and derivative names embed the
+original's name, so any file whose name carries a hash can be cached as
+``immutable`` for a year. Other public files are cached briefly and
+revalidated with their ETag.
+
+Delivery files under ``submissions/`` are private. They are served to the
+order's buyer and seller (and staff), identified either by a JWT or by a
+signed URL from ``signed_media_url``, which is what API responses contain.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from rest_framework import serializers
+
+HASH_LENGTH = 12
+HASHED_NAME = re.compile(r'\.[0-9a-f]{%d}\.' % HASH_LENGTH)
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+PRIVATE_PREFIX = 'submissions/'
+STREAM_CHUNK_SIZE = 64 * 2 ** 10
+SIGNING_SALT = 'media'
+
+
+class MediaStorage(FileSystemStorage):
+    """Filesystem storage adding a content hash to names under ``MEDIA_HASHED_PREFIXES``."""
+
+    def save(self, name, content, max_length=None):
+        if name and name.startswith(tuple(settings.MEDIA_HASHED_PREFIXES)):
+            if not hasattr(content, 'chunks'):
+                content = File(content, name)
+            digest = hashlib.sha256()
+            for chunk in content.chunks():
+                digest.update(chunk)
+            root, ext = os.path.splitext(name)
+            name = f'{root}.{digest.hexdigest()[:HASH_LENGTH]}{ext}'
+        return super().save(name, content, max_length=max_length)
+
+
+def signed_media_url(name):
+    """URL of a private media file, valid for at least ``MEDIA_SIGNED_URL_MAX_AGE`` seconds."""
+    # Expiry is rounded up to the next window so the URL, and the browser's
+    # cached copy, stay the same for a whole window.
+    window = settings.MEDIA_SIGNED_URL_MAX_AGE
+    expires = (int(time.time()) // window + 2) * window
+    token = signing.Signer(salt=SIGNING_SALT).sign(f'{name}:{expires}').rsplit(':', 1)[1]
+    return f'{settings.MEDIA_URL}{name}?expires={expires}&token={token}'
+
+
+def _valid_signature(request, name):
+    expires, token = request.GET.get('expires', ''), request.GET.get('token', '')
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    try:
+        signing.Signer(salt=SIGNING_SALT).unsign(f'{name}:{expires}:{token}')
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def _can_read_private(request, name):
+    if _valid_signature(request, name):
+        return True
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+    from orders.models import Order
+
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except (InvalidToken, TokenError):
+        return False
+    if authenticated is None:
+        return False
+    user = authenticated[0]
+    if user.is_staff:
+        return True
+    return Order.objects.filter(Q(buyer=user) | Q(gig__seller=user), submission_file=name).exists()
+
+
+class SignedFileField(serializers.FileField):
+    """File field whose URL is signed, for files under a private prefix."""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = signed_media_url(value.name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+def cache_control(name):
+    if name.startswith(PRIVATE_PREFIX):
+        return f'private, max-age={settings.MEDIA_SIGNED_URL_MAX_AGE}'
+    if HASHED_NAME.search(name):
+        return 'public, max-age=31536000, immutable'
+    return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` (inclusive) for a single ``bytes=`` range; None to send
+    the whole file (no header, several ranges or bad syntax); ``False`` when
+    the range can't be satisfied.
+    """
+    match = RANGE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start, end = int(first), int(last) if last else size - 1
+        if start >= size:
+            return False
+        if end < start:
+            return None
+    else:
+        suffix = int(last)
+        if not suffix:
+            return False
+        start, end = max(size - suffix, 0), size - 1
+    return start, min(end, size - 1)
+
+
+def _stream(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def serve_media(request, path):
+    if any(segment in ('.', '..') for segment in path.split('/')):
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path.lstrip('/'))
+    except SuspiciousFileOperation:
+        raise Http404
+    # Access is decided on the resolved name, and only the canonical spelling
+    # is served, so no other spelling of a private path (``submissions//``,
+    # ``Submissions/`` on a case-insensitive filesystem, a symlink) skips
+    # the check.
+    root = os.path.normcase(os.path.realpath(settings.MEDIA_ROOT))
+    name = os.path.relpath(os.path.normcase(os.path.realpath(full_path)), root).replace(os.sep, '/')
+    requested = os.path.normcase(path.lstrip('/')).replace(os.sep, '/')
+    if name != requested or name.startswith('../'):
+        raise Http404
+    if name.lower().startswith(PRIVATE_PREFIX) and not _can_read_private(request, name):
+        return HttpResponseForbidden()
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': cache_control(name),
+        'Accept-Ranges': 'bytes',
+    }
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    if settings.MEDIA_ACCEL_REDIRECT:
+        # nginx serves the file (ranges included) from its internal location.
+        response = HttpResponse(headers=headers)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT + name
+        response['Content-Type'] = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        return response
+
+    byte_range = None
+    if request.headers.get('Range'):
+        if_range = request.headers.get('If-Range')
+        if not if_range or if_range == etag or parse_http_date_safe(if_range) == last_modified:
+            byte_range = parse_range(request.headers['Range'], stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416, headers=headers)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    if byte_range is None:
+        return FileResponse(open(full_path, 'rb'), headers=headers)
+
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        _stream(full_path, start, end - start + 1), status=206, headers=headers,
+        content_type=mimetypes.guess_type(name)[0] or 'application/octet-stream',
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response['Content-Length'] = str(end - start + 1)
+    return response
@@ -0,0 +1,174 @@
+"""Shared pagination classes for SkillBridge API views."""
+import base64
+import datetime
+import json
+from operator import attrgetter
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorValueEncoder(DjangoJSONEncoder):
+    """
+    Keeps datetimes and times at full precision.
+
+    DjangoJSONEncoder cuts them to milliseconds, and a keyset filter on a
+    truncated value repeats or skips rows created within the same millisecond.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class OptionalCursorPagination(CursorPagination):
+    """
+    Keyset pagination that only kicks in when the client asks for it.
+
+    Clients that expect a bare list keep working; passing ``?page_size=N``
+    (or following a ``cursor`` link) switches to cursor-paginated results.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset mode.
+
+    ``?pagination=cursor`` (or following a returned ``cursor`` link) pages on
+    the queryset's ordering plus an ``id`` tiebreaker. Keyset pages skip the
+    ``COUNT(*)`` and ``OFFSET`` scan, so deep pages cost the same as the first.
+    Without the parameter responses keep the usual ``count``/``page`` shape;
+    subclasses can set ``default_mode = 'cursor'`` to make keyset the default.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    default_mode = 'page'
+    keyset_page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_mode = False
+        params = request.query_params
+        mode = params.get(self.mode_query_param, self.default_mode)
+        if self.cursor_query_param not in params and mode != 'cursor':
+            return super().paginate_queryset(queryset, request, view)
+
+        ordering = self.get_keyset_ordering(queryset)
+        if ordering is None:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.keyset_mode = True
+        self.request = request
+        self.ordering = ordering
+        self.keyset_page_size = self.get_keyset_page_size(request)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['reverse'])
+
+        if cursor:
+            queryset = queryset.filter(self.keyset_filter(cursor['values'], reverse))
+        queryset = queryset.order_by(*(self.invert(f) for f in ordering) if reverse else ordering)
+
+        rows = list(queryset[:self.keyset_page_size + 1])
+        has_more = len(rows) > self.keyset_page_size
+        rows = rows[:self.keyset_page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.keyset_rows = rows
+        return rows
+
+    def get_keyset_ordering(self, queryset):
+        """Plain field/annotation names the queryset is sorted by, ending in ``id``."""
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            return None
+        names = [field.lstrip('-') for field in ordering]
+        if 'id' not in names and 'pk' not in names:
+            descending = ordering[-1].startswith('-') if ordering else False
+            ordering.append('-id' if descending else 'id')
+        return ordering
+
+    def get_keyset_page_size(self, request):
+        try:
+            size = int(request.query_params[self.keyset_page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def keyset_filter(self, values, reverse):
+        """Rows strictly after ``values`` in (lexicographic) ordering order."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, row, reverse):
+        values = [attrgetter(field.lstrip('-').replace('__', '.'))(row) for field in self.ordering]
+        payload = json.dumps({'o': self.ordering, 'v': values, 'r': reverse}, cls=CursorValueEncoder)
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            values, reverse, ordering = payload['v'], bool(payload['r']), payload['o']
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor only makes sense for the ordering it was issued under.
+        if ordering != self.ordering or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return {'values': values, 'reverse': reverse}
+
+    def get_next_link(self):
+        if not self.keyset_mode:
+            return super().get_next_link()
+        if not self.has_next or not self.keyset_rows:
+            return None
+        return self.encode_cursor(self.keyset_rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset_mode:
+            return super().get_previous_link()
+        if not self.has_previous or not self.keyset_rows:
+            return None
+        return self.encode_cursor(self.keyset_rows[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
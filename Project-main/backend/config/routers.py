@@ -0,0 +1,125 @@
+"""
+Read-replica routing.
+
+With replica aliases in ``DATABASE_REPLICAS`` (see ``DB_REPLICAS`` in
+config/database.py), ``ReplicaRouter`` sends reads made while serving a
+GET/HEAD/OPTIONS request to a random replica and everything else to
+``default``:
+
+* writes always go to the primary, and so does every read inside a
+  transaction or during an unsafe (POST, PUT, PATCH, DELETE) request;
+* after a successful unsafe request, the user's reads stay on the primary for
+  ``REPLICA_STICKY_SECONDS`` so they see their own writes despite replica
+  lag (users are identified by their JWT; the pin lives in the cache);
+* reads outside a request (jobs, management commands) use the primary;
+* ``read_only(queryset)`` sends a queryset to a replica explicitly, and
+  ``use_primary()`` keeps a block of code on the primary.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_PREFIX = 'replica:pinned:'
+
+# None outside requests; True when the current request must read from the primary.
+_use_primary = ContextVar('use_primary', default=None)
+
+
+def replica_alias():
+    """A replica to read from, or ``default`` when none is configured or the primary is required."""
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas or _use_primary.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    return random.choice(replicas)
+
+
+def read_only(queryset):
+    """``queryset`` on a replica, for reads that may lag behind the primary."""
+    return queryset.using(replica_alias())
+
+
+@contextmanager
+def use_primary():
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_primary.get() is not False:
+            return DEFAULT_DB_ALIAS
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+
+def token_user_id(request):
+    """User id from the request's JWT, without a database query; None if there is no valid token."""
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        return None
+    from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    try:
+        return AccessToken(header[len('Bearer '):])[api_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Decide per request whether reads may use a replica; see the module docstring."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        user_id = token_user_id(request)
+        safe = request.method in SAFE_METHODS
+        pinned = not safe or (user_id is not None and cache.get(f'{PIN_PREFIX}{user_id}'))
+        token = _use_primary.set(bool(pinned))
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_primary.reset(token)
+        if not safe and user_id is not None and response.status_code < 400:
+            cache.set(f'{PIN_PREFIX}{user_id}', True, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        user_id = token_user_id(request)
+        safe = request.method in SAFE_METHODS
+        pinned = not safe or (user_id is not None and await cache.aget(f'{PIN_PREFIX}{user_id}'))
+        token = _use_primary.set(bool(pinned))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_primary.reset(token)
+        if not safe and user_id is not None and response.status_code < 400:
+            await cache.aset(f'{PIN_PREFIX}{user_id}', True, settings.REPLICA_STICKY_SECONDS)
+        return response
@@ -2,10 +2,13 @@
 Django settings for SkillBridge project.
 """
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 
+from config.database import database_settings, replica_settings
+
 load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -34,9 +37,14 @@ INSTALLED_APPS = [
     'orders',
     'reviews',
     'chat',
+    'metrics',
+    'jobs',
+    'images',
 ]
 
 MIDDLEWARE = [
+    'config.instrumentation.InstrumentationMiddleware',
+    'config.routers.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -66,13 +74,57 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+
+# Async views (config/asyncviews.py): with ASYNC_VIEWS on (the default under
+# config/asgi.py), the busiest read endpoints and Stripe checkout run on the
+# event loop instead of holding a worker thread per request.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'false').lower() == 'true'
 
+# Database: see config/database.py for the DB_* and SQLITE_* environment
+# variables (tuned SQLite with persistent connections by default, WAL with
+# SQLITE_WAL=true, or a pooled Postgres profile).
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_settings(BASE_DIR),
 }
+DATABASES.update(replica_settings(DATABASES['default']))
+
+# Read replicas (config/routers.py): reads of safe requests go to these
+# aliases; a user's reads stay on the primary for REPLICA_STICKY_SECONDS
+# after they write.
+DATABASE_ROUTERS = ['config.routers.ReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
+# Caching: local memory by default; set CACHE_DIR to share a file-based cache
+# between worker processes on one host.
+if os.environ.get('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'skillbridge',
+        }
+    }
+
+# Seconds a cached API response may be served before it is rebuilt, even
+# without an invalidating write.
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Request instrumentation (config/instrumentation.py): query counts and
+# timings per request in a Server-Timing header, per-route histograms at
+# /api/auth/admin/requests/, and a log of requests slower than
+# INSTRUMENTATION_SLOW_REQUEST_MS with their SQL.
+INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', 'true').lower() == 'true'
+INSTRUMENTATION_SERVER_TIMING = True
+INSTRUMENTATION_SLOW_REQUEST_MS = int(os.environ.get('INSTRUMENTATION_SLOW_REQUEST_MS', 1000))
+INSTRUMENTATION_FLUSH_SECONDS = 10
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -92,6 +144,40 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media serving (config/media.py). Public uploads under these prefixes get a
+# content hash in their names and are cached as immutable; other public media
+# is cached for MEDIA_CACHE_MAX_AGE seconds. Set MEDIA_ACCEL_REDIRECT to an
+# nginx internal location (e.g. "/protected-media/") to hand files to nginx.
+STORAGES = {
+    'default': {'BACKEND': 'config.media.MediaStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+MEDIA_HASHED_PREFIXES = ('gigs/', 'avatars/', 'chat_attachments/')
+MEDIA_CACHE_MAX_AGE = 60 * 60
+MEDIA_SIGNED_URL_MAX_AGE = 60 * 60
+MEDIA_ACCEL_REDIRECT = os.environ.get('MEDIA_ACCEL_REDIRECT', '')
+
+# Image derivatives (images/derivatives.py): resized, metadata-free copies of
+# uploaded images. "<app_label>.<Model>.<field>" -> {size: (max width, max height)}.
+IMAGE_DERIVATIVES = {
+    'gigs.Gig.image': {'card': (480, 320), 'large': (1280, 853)},
+    'accounts.Profile.avatar': {'small': (64, 64), 'medium': (256, 256)},
+    'chat.Message.attachment': {'thumb': (320, 320), 'large': (1280, 1280)},
+}
+IMAGE_DERIVATIVE_FORMAT = 'WEBP'
+IMAGE_DERIVATIVE_QUALITY = 80
+
+# Delivery uploads (orders/uploads.py). Files up to DELIVERY_UPLOAD_MAX_SIZE
+# can be posted in one request; larger ones go through resumable chunked
+# uploads whose partial files live in DELIVERY_UPLOAD_TEMP_DIR.
+DELIVERY_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+DELIVERY_CHUNKED_UPLOAD_MAX_SIZE = 200 * 1024 * 1024
+DELIVERY_UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+DELIVERY_UPLOAD_TEMP_DIR = os.environ.get(
+    'DELIVERY_UPLOAD_TEMP_DIR', os.path.join(tempfile.gettempdir(), 'skillbridge-uploads'),
+)
+DELIVERY_UPLOAD_EXPIRY_HOURS = 24
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'accounts.User'
@@ -118,6 +204,20 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Chat push (server-sent events)
+CHAT_EVENTS_KEEPALIVE_SECONDS = 15
+CHAT_EVENTS_STREAM_TIMEOUT = 300
+# Seconds a ticket from /api/chat/events/ticket/ can be used to open a stream.
+CHAT_EVENTS_TICKET_SECONDS = 60
+
+# Background jobs (jobs/queue.py). With JOBS_EAGER on, enqueued jobs run
+# inline in the request; deployments turn it off and run `manage.py run_jobs`.
+JOBS_EAGER = os.environ.get('JOBS_EAGER', 'true').lower() == 'true'
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BACKOFF_SECONDS = 10
+JOBS_LOCK_TIMEOUT_SECONDS = 300
+JOBS_KEEP_FINISHED_DAYS = 7
+
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -126,3 +226,5 @@ STRIPE_SECRET_KEY = os.environ.get('STRIPE_SECRET_KEY', 'sk_test_placeholder')
 STRIPE_PUBLISHABLE_KEY = os.environ.get('STRIPE_PUBLISHABLE_KEY', 'pk_test_placeholder')
 STRIPE_WEBHOOK_SECRET = os.environ.get('STRIPE_WEBHOOK_SECRET', 'whsec_placeholder')
 STRIPE_PLATFORM_FEE_PERCENTAGE = 10  # 10% platform fee
+# Stripe calls made by async views at once, per process (the SDK blocks a thread per call).
+STRIPE_MAX_CONCURRENT_CALLS = int(os.environ.get('STRIPE_MAX_CONCURRENT_CALLS', 64))
@@ -0,0 +1,483 @@
+"""
+Query budgets for every API endpoint.
+
+Each endpoint is called once with N related rows behind it and again with
+10N, on top of background data from ``seed_data --scale``. The query count
+must be the same both times (no per-row queries) and at most the endpoint's
+budget. A failure lists the statements that ran more than once.
+
+Every route in ``config/urls.py`` has to appear either in ``ENDPOINTS`` or
+in ``NOT_BUDGETED``, so a new view can't slip in without a budget.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import (
+    AsyncClient, AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, path
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from accounts.models import Profile, User
+from chat import async_views as chat_async_views
+from chat.models import Conversation, Message
+from gigs import async_views as gig_async_views
+from gigs.models import Category, Gig
+from orders import async_views as order_async_views
+from orders.models import DeliveryUpload, Order
+from reviews.models import Review
+
+from .database import database_settings
+from .instrumentation import fingerprint, install
+from .routers import read_only
+
+# (route, role, method, path, data, budget). Paths are formatted with the
+# fixture ids; data is formatted likewise, and ``{stage}`` makes it unique.
+ENDPOINTS = [
+    ('api/auth/register/', None, 'post', '/api/auth/register/', {
+        'username': 'new{stage}', 'email': 'new{stage}@example.com', 'password': 'Str0ng-pass!',
+        'password2': 'Str0ng-pass!',
+    }, 7),
+    ('api/auth/login/', None, 'post', '/api/auth/login/', {'email': 'buyer@example.com', 'password': 'pass12345'}, 1),
+    ('api/auth/token/refresh/', None, 'post', '/api/auth/token/refresh/', {'refresh': '{refresh}'}, 1),
+    ('api/auth/profile/', 'seller', 'get', '/api/auth/profile/', None, 3),
+    ('api/auth/profile/<int:user_id>/', None, 'get', '/api/auth/profile/{seller}/', None, 1),
+    ('api/auth/dashboard/', 'seller', 'get', '/api/auth/dashboard/', None, 5),
+    ('api/auth/freelancers/', None, 'get', '/api/auth/freelancers/', None, 2),
+    ('api/auth/admin/dashboard/', 'admin', 'get', '/api/auth/admin/dashboard/', None, 2),
+    ('api/auth/admin/metrics/daily/', 'admin', 'get', '/api/auth/admin/metrics/daily/?days=90', None, 2),
+    ('api/auth/admin/orders/', 'admin', 'get', '/api/auth/admin/orders/', None, 3),
+    ('api/auth/admin/users/', 'admin', 'get', '/api/auth/admin/users/', None, 2),
+    ('api/auth/admin/cache/', 'admin', 'get', '/api/auth/admin/cache/', None, 1),
+    ('api/auth/admin/requests/', 'admin', 'get', '/api/auth/admin/requests/', None, 1),
+    ('api/gigs/', None, 'get', '/api/gigs/', None, 2),
+    ('api/gigs/', None, 'get', '/api/gigs/?search=logo&ordering=-average_rating', None, 2),
+    ('api/gigs/', None, 'get', '/api/gigs/?category={category}&tags=logo', None, 3),
+    ('api/gigs/', 'seller', 'post', '/api/gigs/', {
+        'title': 'New gig {stage}', 'description': 'desc', 'price': '25', 'category': '{category}',
+        'tags': 'logo, brand',
+    }, 14),
+    ('api/gigs/categories/', None, 'get', '/api/gigs/categories/', None, 1),
+    ('api/gigs/tags/popular/', None, 'get', '/api/gigs/tags/popular/', None, 1),
+    ('api/gigs/tags/facets/', None, 'get', '/api/gigs/tags/facets/', None, 1),
+    ('api/gigs/featured/', None, 'get', '/api/gigs/featured/', None, 1),
+    ('api/gigs/saved/', 'buyer', 'get', '/api/gigs/saved/', None, 5),
+    ('api/gigs/my-gigs/', 'seller', 'get', '/api/gigs/my-gigs/', None, 4),
+    ('api/gigs/<int:pk>/', None, 'get', '/api/gigs/{gig}/', None, 2),
+    ('api/gigs/<int:pk>/', 'buyer', 'get', '/api/gigs/{gig}/', None, 5),
+    ('api/gigs/<int:pk>/save/', 'buyer', 'post', '/api/gigs/{gig}/save/', None, 5),
+    ('api/orders/', 'buyer', 'get', '/api/orders/?role=buyer', None, 4),
+    ('api/orders/', 'seller', 'get', '/api/orders/?role=seller', None, 4),
+    ('api/orders/<int:pk>/', 'buyer', 'get', '/api/orders/{order}/', None, 3),
+    ('api/orders/uploads/<uuid:upload_id>/', 'seller', 'get', '/api/orders/uploads/{upload}/', None, 2),
+    ('api/orders/direct-order/', 'buyer', 'post', '/api/orders/direct-order/', {'gig_id': '{gig}'}, 7),
+    ('api/reviews/', None, 'get', '/api/reviews/?gig={gig}', None, 2),
+    ('api/reviews/<int:pk>/', None, 'get', '/api/reviews/{review}/', None, 1),
+    ('api/chat/conversations/', 'buyer', 'get', '/api/chat/conversations/', None, 5),
+    ('api/chat/conversations/create/', 'buyer', 'post', '/api/chat/conversations/create/', {
+        'user_id': '{seller}', 'gig_id': '{gig}',
+    }, 11),
+    ('api/chat/conversations/<int:pk>/messages/', 'buyer', 'get',
+     '/api/chat/conversations/{conversation}/messages/', None, 4),
+    ('api/chat/conversations/<int:pk>/messages/', 'buyer', 'post',
+     '/api/chat/conversations/{conversation}/messages/', {'text': 'Hello'}, 5),
+    ('api/chat/conversations/<int:pk>/read/', 'seller', 'post',
+     '/api/chat/conversations/{conversation}/read/', None, 4),
+    ('api/chat/events/ticket/', 'buyer', 'post', '/api/chat/events/ticket/', None, 1),
+    ('^media/(?P<path>.+)$', 'buyer', 'get', '/media/{submission}', None, 2),
+]
+
+NOT_BUDGETED = {
+    'admin/': 'Django admin site',
+    'api/orders/<int:pk>/status/': 'state machine on one order; covered by orders.tests',
+    'api/orders/<int:pk>/submit-delivery/': 'multipart upload of one file; covered by orders.tests',
+    'api/orders/<int:pk>/uploads/': 'creates one upload row; covered by orders.tests',
+    'api/orders/create-checkout-session/': 'calls Stripe',
+    'api/orders/webhook/': 'needs a Stripe signature',
+    'api/chat/events/': 'long-lived event stream',
+}
+
+SMALL, LARGE = 2, 20
+
+
+def routes(patterns=None, prefix=''):
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver) and route not in NOT_BUDGETED:
+            yield from routes(pattern.url_patterns, route)
+        else:
+            yield route
+
+
+class QueryBudgetTests(APITestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings = override_settings(MEDIA_ROOT=media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.seller = User.objects.create_user(
+            username='seller', email='seller@example.com', password='pass12345', is_freelancer=True,
+        )
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', is_staff=True,
+        )
+        for user in (self.seller, self.buyer, self.admin):
+            Profile.objects.create(user=user)
+        self.category = Category.objects.create(name='Design', slug='design')
+        self.gigs, self.orders, self.conversations = [], [], []
+
+    def add_rows(self, count):
+        """Grow every relation the fixture objects have to ``count`` rows."""
+        while len(self.gigs) < count:
+            self.gigs.append(Gig.objects.create(
+                seller=self.seller, category=self.category, title=f'Logo design {len(self.gigs)}',
+                description='desc', price=30, tags='logo, brand, vector',
+            ))
+        self.buyer.profile.saved_gigs.add(*self.gigs)
+        while len(self.orders) < count:
+            order = Order.objects.create(
+                gig=self.gigs[0], buyer=self.buyer, status='completed', amount=30,
+                submission_file=SimpleUploadedFile('work.pdf', b'%PDF-1.7\n'),
+            )
+            Review.objects.create(order=order, gig=order.gig, reviewer=self.buyer, rating=5, comment='Great')
+            DeliveryUpload.objects.create(order=order, uploader=self.seller, filename='work.pdf', size=100)
+            self.orders.append(order)
+        while len(self.conversations) < count:
+            conversation = Conversation.objects.create(gig=self.gigs[len(self.conversations)])
+            conversation.participants.add(self.seller, self.buyer)
+            self.conversations.append(conversation)
+        for conversation in self.conversations:
+            existing = conversation.messages.count()
+            Message.objects.bulk_create([
+                Message(conversation=conversation, sender=(self.buyer, self.seller)[i % 2], text=f'Message {i}')
+                for i in range(existing, count)
+            ])
+
+    def fixture_ids(self, stage):
+        order = self.orders[0]
+        return {
+            'stage': stage,
+            'seller': self.seller.id,
+            'category': self.category.id,
+            'gig': self.gigs[0].id,
+            'order': order.id,
+            'review': order.review.id,
+            'upload': order.uploads.first().pk,
+            'submission': order.submission_file.name,
+            'conversation': self.conversations[0].id,
+            'refresh': str(RefreshToken.for_user(self.buyer)),
+        }
+
+    def call(self, role, method, path, data, fixtures):
+        cache.clear()
+        self.client.credentials()
+        if role:
+            user = {'seller': self.seller, 'buyer': self.buyer, 'admin': self.admin}[role]
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        if data:
+            data = {key: value.format(**fixtures) for key, value in data.items()}
+        with CaptureQueriesContext(connection) as captured:
+            response = getattr(self.client, method)(path.format(**fixtures), data, format='json')
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return response, [query['sql'] for query in captured.captured_queries]
+
+    def measure(self, stage):
+        call_command('seed_data', scale=1 if stage == SMALL else 9, random_seed=stage, stdout=StringIO())
+        self.add_rows(stage)
+        fixtures = self.fixture_ids(stage)
+        results = []
+        for route, role, method, path, data, budget in ENDPOINTS:
+            response, queries = self.call(role, method, path, data, fixtures)
+            self.assertLess(response.status_code, 300, f'{method.upper()} {path}: {response.status_code}')
+            results.append(queries)
+        return results
+
+    def test_every_route_has_a_budget(self):
+        budgeted = {endpoint[0] for endpoint in ENDPOINTS}
+        missing = [route for route in routes() if route not in budgeted and route not in NOT_BUDGETED]
+        self.assertEqual(missing, [], 'Add these routes to ENDPOINTS (or NOT_BUDGETED with a reason)')
+
+    def test_query_counts_are_flat_and_within_budget(self):
+        small = self.measure(SMALL)
+        large = self.measure(LARGE)
+        for (route, role, method, path, data, budget), before, after in zip(ENDPOINTS, small, large):
+            with self.subTest(f'{method.upper()} {path} as {role or "anonymous"}'):
+                if len(after) != len(before) or len(after) > budget:
+                    self.fail(
+                        f'{len(before)} queries with {SMALL} rows, {len(after)} with {LARGE} rows '
+                        f'(budget {budget}).\n{repeated_sql(after)}'
+                    )
+
+
+def repeated_sql(queries):
+    counts = {}
+    for sql in queries:
+        counts.setdefault(fingerprint(sql), []).append(sql)
+    repeated = [(len(group), group[0]) for group in counts.values() if len(group) > 1]
+    if not repeated:
+        return 'No statement ran more than once; all queries:\n' + '\n'.join(queries)
+    return 'Repeated statements:\n' + '\n'.join(f'  {count}x {sql}' for count, sql in sorted(repeated, reverse=True))
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    def test_sqlite_profile(self):
+        config = database_settings(Path('/srv'), {'DB_CONN_MAX_AGE': '30'})
+        self.assertEqual(config['NAME'], Path('/srv/db.sqlite3'))
+        self.assertEqual(config['CONN_MAX_AGE'], 30)
+        self.assertEqual(config['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertNotIn('journal_mode', config['OPTIONS']['init_command'])
+        self.assertIn('PRAGMA busy_timeout=20000', config['OPTIONS']['init_command'])
+        wal = database_settings(Path('/srv'), {'SQLITE_WAL': 'true'})
+        self.assertIn('PRAGMA journal_mode=WAL', wal['OPTIONS']['init_command'])
+        self.assertIn('PRAGMA synchronous=NORMAL', wal['OPTIONS']['init_command'])
+        untuned = database_settings(Path('/srv'), {'SQLITE_TUNING': 'false', 'DB_CONN_MAX_AGE': 'none'})
+        self.assertNotIn('init_command', untuned['OPTIONS'])
+        self.assertIsNone(untuned['CONN_MAX_AGE'])
+
+    def test_pooled_postgres_profile(self):
+        config = database_settings(Path('/srv'), {'DB_ENGINE': 'postgres', 'DB_NAME': 'app', 'DB_POOL': 'true'})
+        self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(config['OPTIONS']['pool']['max_size'], 10)
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        with self.assertRaises(ValueError):
+            database_settings(Path('/srv'), {'DB_ENGINE': 'oracle'})
+
+
+class SQLiteTuningTests(TestCase):
+    def test_connections_are_tuned(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 20000)
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """The primary is the test database; the replica is a file snapshot of it that then falls behind."""
+    # The replica alias only exists while this class runs, so it can't be named
+    # up front for the runner's checks; '__all__' picks it up at setUpClass.
+    databases = '__all__'
+    client_class = APIClient
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.replica_path = os.path.join(cls.directory, 'replica.sqlite3')
+        connections.settings['replica'] = dict(connections.settings['default'], NAME=cls.replica_path)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        Profile.objects.create(user=self.buyer)
+        self.gig = Gig.objects.create(seller=self.seller, title='Logo design', description='desc', price=30)
+        Order.objects.create(gig=self.gig, buyer=self.buyer, amount=30)
+
+        connections['replica'].close()
+        connection.ensure_connection()
+        snapshot = sqlite3.connect(self.replica_path)
+        connection.connection.backup(snapshot)
+        snapshot.close()
+        settings = override_settings(DATABASE_REPLICAS=['replica'])
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        # Written after the snapshot: only the primary has it.
+        self.new_order = Order.objects.create(gig=self.gig, buyer=self.buyer, amount=30)
+
+    def order_ids(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        response = self.client.get('/api/orders/?role=buyer')
+        return {order['id'] for order in response.data['results']}
+
+    def test_safe_requests_read_from_the_replica(self):
+        self.assertNotIn(self.new_order.id, self.order_ids(self.buyer))
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        response = self.client.post(
+            '/api/chat/conversations/create/', {'user_id': self.seller.id}, format='json',
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.buyer)}',
+        )
+        self.assertLess(response.status_code, 300)
+        self.assertIn(self.new_order.id, self.order_ids(self.buyer))
+        with override_settings(REPLICA_STICKY_SECONDS=0):
+            cache.clear()
+            self.assertNotIn(self.new_order.id, self.order_ids(self.buyer))
+
+    def test_cached_responses_are_built_from_the_primary(self):
+        gig = Gig.objects.create(seller=self.seller, title='New gig', description='desc', price=10)
+        self.assertEqual(self.client.get(f'/api/gigs/{gig.id}/').status_code, 200)
+
+    def test_explicit_and_transactional_reads(self):
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(read_only(Order.objects.all()).count(), 1)
+        with transaction.atomic():
+            self.assertEqual(read_only(Order.objects.all()).count(), 2)
+
+
+@override_settings(ASYNC_VIEWS=True)
+class AsyncViewTests(TestCase):
+    """The async views answer exactly like the DRF views they stand in for."""
+    client_class = APIClient
+
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        Profile.objects.create(user=self.seller, stripe_account_id='acct_123')
+        buyer_profile = Profile.objects.create(user=self.buyer)
+        self.category = Category.objects.create(name='Design', slug='design')
+        self.gigs = [
+            Gig.objects.create(
+                seller=self.seller, category=self.category, title=f'Logo design {i}', description='desc', price=30 + i,
+            )
+            for i in range(3)
+        ]
+        buyer_profile.saved_gigs.add(self.gigs[1])
+        self.conversation = Conversation.objects.create(gig=self.gigs[0])
+        self.conversation.participants.add(self.seller, self.buyer)
+        self.messages = [
+            Message.objects.create(conversation=self.conversation, sender=(self.buyer, self.seller)[i % 2], text=f'Hi {i}')
+            for i in range(4)
+        ]
+
+    def fetch(self, view_class, path, user=None, **kwargs):
+        headers = {'authorization': f'Bearer {AccessToken.for_user(user)}'} if user else {}
+        request = AsyncRequestFactory().get(path, headers=headers)
+        return async_to_sync(view_class.as_view())(request, **kwargs)
+
+    def post(self, url, data, user):
+        """POST through the whole ASGI stack (CSRF checks included) with the async views mounted."""
+        class URLs:
+            urlpatterns = [
+                path('api/chat/conversations/<int:pk>/messages/', chat_async_views.MessageListCreateView.as_view()),
+                path('api/orders/create-checkout-session/', order_async_views.CreateCheckoutSessionView.as_view()),
+            ]
+
+        client = AsyncClient(enforce_csrf_checks=True)
+        with override_settings(ROOT_URLCONF=URLs):
+            return async_to_sync(client.post)(
+                url, data, content_type='application/json',
+                headers={'Authorization': f'Bearer {AccessToken.for_user(user)}'},
+            )
+
+    def assert_same_response(self, view_class, path, user=None, **kwargs):
+        self.client.credentials(**({'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'} if user else {}))
+        expected = self.client.get(path)
+        response = self.fetch(view_class, path, user, **kwargs)
+        self.assertEqual(response.status_code, expected.status_code, path)
+        self.assertEqual(json.loads(response.content), expected.json(), path)
+        return response
+
+    def test_reads_match_the_drf_views(self):
+        conversation, newest = self.conversation.id, self.messages[-1].id
+        cases = [
+            (chat_async_views.ConversationListView, '/api/chat/conversations/', {}),
+            (chat_async_views.ConversationListView, '/api/chat/conversations/?page_size=1', {}),
+            (chat_async_views.MessageListCreateView, f'/api/chat/conversations/{conversation}/messages/',
+             {'pk': conversation}),
+            (chat_async_views.MessageListCreateView, f'/api/chat/conversations/{conversation}/messages/?limit=2',
+             {'pk': conversation}),
+            (chat_async_views.MessageListCreateView,
+             f'/api/chat/conversations/{conversation}/messages/?before={newest}&limit=2', {'pk': conversation}),
+            (gig_async_views.GigListCreateView, '/api/gigs/', {}),
+            (gig_async_views.GigListCreateView, f'/api/gigs/?category={self.category.id}&ordering=price', {}),
+            (gig_async_views.GigListCreateView, '/api/gigs/?pagination=cursor&page_size=2', {}),
+            (gig_async_views.FeaturedGigsView, '/api/gigs/featured/', {}),
+            (gig_async_views.GigDetailView, f'/api/gigs/{self.gigs[1].id}/', {'pk': self.gigs[1].id}),
+        ]
+        for user in (self.buyer, None):
+            for view_class, path, kwargs in cases:
+                if user is None and view_class.__module__.startswith('chat'):
+                    continue
+                with self.subTest(path=path, user=user):
+                    cache.clear()
+                    self.assert_same_response(view_class, path, user, **kwargs)
+
+    def test_cached_detail_is_personalized(self):
+        path, pk = f'/api/gigs/{self.gigs[1].id}/', self.gigs[1].id
+        first = self.fetch(gig_async_views.GigDetailView, path, pk=pk)
+        second = self.fetch(gig_async_views.GigDetailView, path, self.buyer, pk=pk)
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertFalse(json.loads(first.content)['is_saved'])
+        self.assertTrue(json.loads(second.content)['is_saved'])
+        self.assertEqual(self.fetch(gig_async_views.GigDetailView, '/api/gigs/0/', pk=0).status_code, 404)
+
+    def test_authentication_errors(self):
+        path = '/api/chat/conversations/'
+        response = self.fetch(chat_async_views.ConversationListView, path)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+        request = AsyncRequestFactory().get(path, headers={'authorization': 'Bearer not-a-token'})
+        response = async_to_sync(chat_async_views.ConversationListView.as_view())(request)
+        self.assertEqual(response.status_code, 401)
+        outsider = User.objects.create_user(username='outsider', email='o@example.com', password='pass12345')
+        response = self.fetch(
+            chat_async_views.MessageListCreateView, f'/api/chat/conversations/{self.conversation.id}/messages/',
+            outsider, pk=self.conversation.id,
+        )
+        self.assertEqual(json.loads(response.content), [])
+
+    def test_writes_go_through_the_drf_view(self):
+        response = self.post(f'/api/chat/conversations/{self.conversation.id}/messages/', {'text': 'New'}, self.buyer)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(self.conversation.messages.filter(text='New').exists())
+
+    def test_checkout_creates_the_session_off_the_event_loop(self):
+        session = mock.Mock(id='cs_test_1', url='https://checkout.stripe.test/1')
+        with mock.patch('stripe.checkout.Session.create', return_value=session) as create:
+            response = self.post('/api/orders/create-checkout-session/', {'gig_id': self.gigs[0].id}, self.buyer)
+        self.assertEqual(response.status_code, 200, response.content)
+        order = Order.objects.get(id=json.loads(response.content)['order_id'])
+        self.assertEqual((order.status, order.stripe_payment_intent_id), ('payment_pending', 'cs_test_1'))
+        arguments = create.call_args.kwargs
+        self.assertEqual(arguments['metadata'], {'order_id': order.id})
+        self.assertEqual(arguments['payment_intent_data']['transfer_data']['destination'], 'acct_123')
+
+        with mock.patch('stripe.checkout.Session.create', side_effect=Exception('card declined')):
+            response = self.post('/api/orders/create-checkout-session/', {'gig_id': self.gigs[0].id}, self.buyer)
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_sync_views_when_disabled(self):
+        with override_settings(ASYNC_VIEWS=False):
+            view = gig_async_views.FeaturedGigsView.as_view()
+        self.assertIs(view.view_class, gig_async_views.FeaturedGigsView.view_class)
+
+
+class AsyncMiddlewareTests(TestCase):
+    def test_queries_are_counted_under_asgi(self):
+        install(connection)
+        Gig.objects.create(
+            seller=User.objects.create_user(username='seller', email='s@example.com', password='pass12345'),
+            title='Logo design', description='desc', price=30,
+        )
+        response = async_to_sync(AsyncClient().get)('/api/gigs/')
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries')
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Gig
+from .models import Category, Gig, Tag
 
 
 @admin.register(Category)
@@ -13,3 +13,9 @@ class GigAdmin(admin.ModelAdmin):
     list_display = ['title', 'seller', 'category', 'price', 'is_active', 'average_rating', 'total_orders']
     list_filter = ['category', 'is_active']
     search_fields = ['title', 'description']
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'gig_count']
+    search_fields = ['name']
@@ -0,0 +1,58 @@
+"""Async gig reads for ASGI deployments (see config/asyncviews.py)."""
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404
+from rest_framework.response import Response
+
+from config.asyncviews import AsyncAPIView
+from . import views
+from .serializers import aget_saved_gig_ids
+
+
+class SavedStateMixin:
+    """Load the user's saved gigs once per request, for both the serializer and the cached-body overlay."""
+
+    async def saved_state_context(self, view):
+        if not hasattr(self, 'saved_context'):
+            self.saved_context = view.get_serializer_context()
+            await aget_saved_gig_ids(self.saved_context)
+        return self.saved_context
+
+    async def apersonalize_cached_data(self, view, data):
+        context = await self.saved_state_context(view)
+        return views.mark_saved(data, context['saved_gig_ids'])
+
+
+class GigListCreateView(SavedStateMixin, AsyncAPIView):
+    """Gig listing on the event loop; creating gigs goes through the DRF view."""
+    view_class = views.GigListCreateView
+
+    async def aget(self, view, request):
+        # django-filter validates choices such as ?category= against the database.
+        queryset = await sync_to_async(view.filter_queryset)(view.get_queryset())
+        return await self.list_response(view, queryset, await self.saved_state_context(view))
+
+
+class GigDetailView(SavedStateMixin, AsyncAPIView):
+    """Gig detail on the event loop; edits and deletes go through the DRF view."""
+    view_class = views.GigDetailView
+
+    async def aget(self, view, request, pk):
+        async def build():
+            queryset = view.filter_queryset(view.get_queryset()).select_related('seller__profile')
+            gig = await aget_object_or_404(queryset, pk=pk)
+            view.check_object_permissions(request, gig)
+            context = await self.saved_state_context(view)
+            return Response(view.get_serializer(gig, context=context).data)
+
+        return await self.serve_cached(view, request, build)
+
+
+class FeaturedGigsView(SavedStateMixin, AsyncAPIView):
+    view_class = views.FeaturedGigsView
+
+    async def aget(self, view, request):
+        async def build():
+            queryset = view.filter_queryset(view.get_queryset())
+            return await self.list_response(view, queryset, await self.saved_state_context(view))
+
+        return await self.serve_cached(view, request, build)
@@ -0,0 +1,42 @@
+"""
+Denormalized active-gig counts for categories.
+
+``Category.gig_count`` is recounted for the affected categories inside the
+transaction that creates, deactivates, recategorizes or deletes a gig, and
+the cached category list is invalidated.
+``check_category_counts`` detects and repairs drift from bulk updates.
+"""
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from config.caching import invalidate
+
+from .models import Category, Gig
+
+
+def active_gig_counts():
+    """Subquery counting active gigs for the outer category row."""
+    return Subquery(
+        Gig.objects.filter(category=OuterRef('pk'), is_active=True)
+        .order_by().values('category').annotate(total=Count('id')).values('total'),
+        output_field=IntegerField(),
+    )
+
+
+def refresh_category_counts(category_ids=None):
+    """Recount active gigs for ``category_ids`` (all categories when ``None``)."""
+    categories = Category.objects.all()
+    if category_ids is not None:
+        category_ids = [pk for pk in category_ids if pk is not None]
+        if not category_ids:
+            return 0
+        categories = categories.filter(id__in=category_ids)
+    updated = categories.update(gig_count=Coalesce(active_gig_counts(), Value(0)))
+    invalidate('category_counts')
+    return updated
+
+
+def find_category_drift():
+    """Return ``[(category, stored, actual)]`` for categories whose counter is wrong."""
+    categories = Category.objects.annotate(actual=Coalesce(active_gig_counts(), Value(0)))
+    return [(c, c.gig_count, c.actual) for c in categories if c.gig_count != c.actual]
@@ -0,0 +1,17 @@
+"""Management command to backfill normalized tags from ``Gig.tags``."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from gigs.tags import rebuild_all_tags
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the normalized tag table and gig tag links from Gig.tags'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prune', action='store_true', help='Delete tags no gig uses any more')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            gigs, tags = rebuild_all_tags(prune=options['prune'])
+        self.stdout.write(self.style.SUCCESS(f'Linked {gigs} gigs to {tags} tags.'))
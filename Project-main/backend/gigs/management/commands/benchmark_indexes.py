@@ -0,0 +1,199 @@
+"""
+Management command showing how the hot list/dashboard queries are planned
+and how long they take with and without the declared ``Meta.indexes``.
+
+Seeds a synthetic data set inside a transaction, measures every query with
+the indexes in place, drops them and measures again, then rolls everything
+back (index drops included), so it can be pointed at a development database
+safely.
+"""
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from chat.models import Conversation, Message
+from gigs.models import Category, Gig
+from orders.models import Order
+from reviews.models import Review
+
+User = get_user_model()
+
+STATUSES = [status for status, _ in Order.STATUS_CHOICES]
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN and time the hot queries with and without the model indexes (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000, help='Number of users to seed')
+        parser.add_argument('--gigs', type=int, default=20000, help='Number of gigs to seed')
+        parser.add_argument('--orders', type=int, default=100000, help='Number of orders to seed')
+        parser.add_argument('--messages', type=int, default=100000, help='Number of chat messages to seed')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query')
+        parser.add_argument('--no-plans', action='store_true', help='Only print timings')
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        with transaction.atomic():
+            targets = self.seed(options, rng)
+            self.stdout.write(
+                f'Seeded {options["users"]} users, {options["gigs"]} gigs, '
+                f'{options["orders"]} orders, {options["messages"]} messages'
+            )
+            queries = self.hot_queries(**targets)
+
+            after = self.measure(queries, options['repeat'], 'after')
+            dropped = self.drop_indexes()
+            before = self.measure(queries, options['repeat'], 'before')
+
+            self.stdout.write(f'Dropped {len(dropped)} indexes for the baseline: {", ".join(dropped)}\n')
+            self.stdout.write(f'{"query":<32} {"before ms":>10} {"after ms":>10} {"speedup":>8}')
+            for name in queries:
+                speedup = before[name]['ms'] / after[name]['ms'] if after[name]['ms'] else 0
+                self.stdout.write(
+                    f'{name:<32} {before[name]["ms"]:>10.2f} {after[name]["ms"]:>10.2f} {speedup:>7.1f}x'
+                )
+            if not options['no_plans']:
+                for name in queries:
+                    self.stdout.write(f'\n== {name}')
+                    self.stdout.write('-- before\n' + before[name]['plan'])
+                    self.stdout.write('-- after\n' + after[name]['plan'])
+
+            transaction.set_rollback(True)
+
+    def seed(self, options, rng):
+        now = timezone.now()
+        users = User.objects.bulk_create([
+            User(username=f'bench_user_{i}', email=f'bench_user_{i}@example.com')
+            for i in range(options['users'])
+        ], batch_size=BATCH_SIZE)
+        categories = [
+            Category.objects.get_or_create(slug=f'benchmark-{i}', defaults={'name': f'Benchmark {i}'})[0]
+            for i in range(10)
+        ]
+        # A few prolific sellers so the dashboard queries have real work to do.
+        sellers = users[:max(1, len(users) // 10)]
+
+        gigs = Gig.objects.bulk_create([
+            Gig(
+                seller=rng.choice(sellers),
+                category=rng.choice(categories),
+                title=f'Benchmark gig {i}',
+                description='benchmark',
+                price=rng.randint(5, 500),
+                is_active=rng.random() < 0.9,
+                average_rating=round(rng.uniform(0, 5), 2),
+                total_orders=rng.randint(0, 500),
+            )
+            for i in range(options['gigs'])
+        ], batch_size=BATCH_SIZE)
+
+        orders = Order.objects.bulk_create([
+            Order(
+                gig=rng.choice(gigs),
+                buyer=rng.choice(users),
+                status=rng.choice(STATUSES),
+                amount=rng.randint(5, 500),
+            )
+            for _ in range(options['orders'])
+        ], batch_size=BATCH_SIZE)
+        # auto_now_add ignores explicit values on create, so spread the dates afterwards.
+        for order in orders:
+            order.created_at = now - timedelta(minutes=rng.randint(0, 525600))
+        Order.objects.bulk_update(orders, ['created_at'], batch_size=BATCH_SIZE)
+
+        Review.objects.bulk_create([
+            Review(order=order, gig_id=order.gig_id, reviewer_id=order.buyer_id,
+                   rating=rng.randint(1, 5), comment='benchmark')
+            for order in orders if order.status == 'completed'
+        ], batch_size=BATCH_SIZE)
+
+        conversations = Conversation.objects.bulk_create(
+            [Conversation(gig=rng.choice(gigs)) for _ in range(max(1, options['messages'] // 50))],
+            batch_size=BATCH_SIZE,
+        )
+        Message.objects.bulk_create([
+            Message(
+                conversation=rng.choice(conversations),
+                sender=rng.choice(users),
+                text='benchmark',
+                is_read=rng.random() < 0.8,
+            )
+            for _ in range(options['messages'])
+        ], batch_size=BATCH_SIZE)
+
+        return {
+            'seller': sellers[0],
+            'buyer': users[-1],
+            'category': categories[0],
+            'gig': gigs[0],
+            'conversation': conversations[0],
+        }
+
+    def hot_queries(self, seller, buyer, category, gig, conversation):
+        """The queries the indexes were planned for, as ``name -> (queryset, evaluate)``."""
+        active = Gig.objects.filter(is_active=True)
+        return {
+            'featured gigs': (
+                active.order_by('-average_rating', '-total_orders')[:8], list),
+            'gig list price range': (
+                active.filter(price__gte=50, price__lte=80).order_by('price', 'id')[:12], list),
+            'gig list by category': (
+                active.filter(category=category).order_by('-created_at')[:12], list),
+            'seller active gigs': (
+                Gig.objects.filter(seller=seller, is_active=True).order_by(), lambda qs: qs.count()),
+            'seller orders by status': (
+                Order.objects.filter(gig__seller=seller, status='pending').order_by(), lambda qs: qs.count()),
+            'buyer orders by status': (
+                Order.objects.filter(buyer=buyer, status='completed').order_by(), lambda qs: qs.count()),
+            'admin orders by status': (
+                Order.objects.filter(status='delivered').order_by('-created_at')[:20], list),
+            'conversation unread': (
+                Message.objects.filter(conversation=conversation, is_read=False).exclude(sender=buyer).order_by(),
+                lambda qs: qs.count()),
+            'gig reviews': (
+                Review.objects.filter(gig=gig).order_by('-created_at')[:20], list),
+        }
+
+    def measure(self, queries, repeat, label):
+        self.analyze()
+        results = {}
+        for name, (queryset, evaluate) in queries.items():
+            evaluate(queryset.all())  # warm the page cache
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                evaluate(queryset.all())
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = {'ms': statistics.median(timings), 'plan': self.explain(queryset, label)}
+        return results
+
+    def explain(self, queryset, label):
+        # QuerySet.explain() would reuse SQLite's cached plan from before the
+        # indexes were dropped; a distinct trailing comment forces a fresh one.
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql} -- {label}', params)
+            return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+    def analyze(self):
+        """Refresh planner statistics so index choices reflect the seeded data."""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def drop_indexes(self):
+        """Drop every index declared in Meta.indexes of the benchmarked models."""
+        dropped = []
+        with connection.cursor() as cursor:
+            for model in (Gig, Order, Message, Review):
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+                    dropped.append(index.name)
+        return dropped
@@ -0,0 +1,85 @@
+"""
+Management command comparing gig search latency with and without the
+full-text index.
+
+Seeds a synthetic corpus inside a transaction that is rolled back when the
+benchmark finishes, so it can be pointed at a development database safely.
+"""
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from gigs.models import Category, Gig
+from gigs.search import rebuild_index, search_backend, search_gigs, search_gigs_icontains
+
+User = get_user_model()
+
+WORDS = [
+    'react', 'django', 'python', 'logo', 'design', 'website', 'mobile', 'app', 'seo',
+    'content', 'writing', 'video', 'editing', 'marketing', 'data', 'analysis', 'api',
+    'backend', 'frontend', 'figma', 'branding', 'flutter', 'wordpress', 'shopify',
+    'landing', 'page', 'dashboard', 'machine', 'learning', 'animation', 'illustration',
+    'copywriting', 'podcast', 'translation', 'resume', 'database', 'cloud', 'deployment',
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark gig search: icontains scan vs full-text index (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gigs', type=int, default=100000, help='Number of gigs to seed')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per search term')
+        parser.add_argument(
+            '--terms', nargs='*',
+            default=['react', 'logo design', 'python api', 'machine learning dashboard', 'nomatch'],
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        with transaction.atomic():
+            self.seed(options['gigs'], rng)
+            self.stdout.write(f'Seeded {options["gigs"]} gigs; search backend: {search_backend()}')
+
+            base = Gig.objects.filter(is_active=True)
+            self.stdout.write(f'{"term":<30} {"icontains ms":>14} {"indexed ms":>12} {"hits":>8}')
+            for term in options['terms']:
+                scan = self.time_search(search_gigs_icontains, base, term, options['repeat'])
+                indexed = self.time_search(search_gigs, base, term, options['repeat'])
+                hits = search_gigs(base, term).count()
+                self.stdout.write(f'{term:<30} {scan:>14.2f} {indexed:>12.2f} {hits:>8}')
+
+            transaction.set_rollback(True)
+
+    def seed(self, count, rng):
+        seller = User.objects.create(username='bench_seller', email='bench_seller@example.com')
+        category, _ = Category.objects.get_or_create(slug='benchmark', defaults={'name': 'Benchmark'})
+        batch = []
+        for i in range(count):
+            batch.append(Gig(
+                seller=seller,
+                category=category,
+                title='I will ' + ' '.join(rng.choices(WORDS, k=5)),
+                description=' '.join(rng.choices(WORDS, k=60)),
+                tags=','.join(rng.sample(WORDS, 4)),
+                price=rng.randint(5, 500),
+            ))
+            if len(batch) == 5000:
+                Gig.objects.bulk_create(batch)
+                batch = []
+        Gig.objects.bulk_create(batch)
+        # bulk_create skips the post_save signal, so index in one pass.
+        rebuild_index()
+
+    def time_search(self, search, queryset, term, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = search(queryset, term)
+            results.count()
+            list(results[:12])
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
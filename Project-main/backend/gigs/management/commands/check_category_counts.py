@@ -0,0 +1,26 @@
+"""Management command to detect and repair drift in category gig counters."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from gigs.categories import find_category_drift, refresh_category_counts
+
+
+class Command(BaseCommand):
+    help = 'Compare Category.gig_count with the actual number of active gigs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rewrite counters that have drifted')
+
+    def handle(self, *args, **options):
+        drift = find_category_drift()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('All category counters are consistent.'))
+            return
+        for category, stored, actual in drift:
+            self.stdout.write(f'  {category.slug}: stored {stored}, actual {actual}')
+        if options['fix']:
+            with transaction.atomic():
+                refresh_category_counts([category.pk for category, _, _ in drift])
+            self.stdout.write(self.style.SUCCESS(f'Repaired {len(drift)} categories.'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} categories drifted; rerun with --fix to repair.'))
@@ -0,0 +1,18 @@
+"""Management command to rebuild the gig full-text search index."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from gigs.search import rebuild_index, search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the gig full-text search index from the gigs table'
+
+    def handle(self, *args, **options):
+        backend = search_backend()
+        if backend != 'fts5':
+            self.stdout.write(f'Search backend is "{backend}"; there is no separate index to rebuild.')
+            return
+        with transaction.atomic():
+            count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} gigs.'))
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from gigs.search import create_fts_table, search_vector
+
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        create_fts_table(connection)
+    elif connection.vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+
+        Gig = apps.get_model('gigs', 'Gig')
+        schema_editor.add_index(Gig, GinIndex(search_vector(), name='gigs_gig_search_idx'))
+
+
+def drop_search_index(apps, schema_editor):
+    from gigs.search import drop_fts_table
+
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        drop_fts_table(connection)
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS gigs_gig_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gigs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gigs', '0002_gig_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('gig_count', models.PositiveIntegerField(default=0, help_text='Number of active gigs with this tag')),
+            ],
+            options={
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['-gig_count', 'name'], name='gigs_tag_popular_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='gig',
+            name='normalized_tags',
+            field=models.ManyToManyField(blank=True, related_name='gigs', to='gigs.tag'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+
+def backfill_tags(apps, schema_editor):
+    Gig = apps.get_model('gigs', 'Gig')
+    Tag = apps.get_model('gigs', 'Tag')
+    Through = Gig.normalized_tags.through
+
+    gig_tags = {}
+    for gig_id, tags in Gig.objects.values_list('id', 'tags').iterator():
+        names = []
+        for raw in (tags or '').split(','):
+            name = ' '.join(raw.lower().split())[:50]
+            if name and name not in names:
+                names.append(name)
+        gig_tags[gig_id] = names
+
+    all_names = {name for names in gig_tags.values() for name in names}
+    Tag.objects.bulk_create([Tag(name=name) for name in all_names], ignore_conflicts=True)
+    tag_ids = dict(Tag.objects.values_list('name', 'id'))
+
+    Through.objects.bulk_create(
+        [Through(gig_id=gig_id, tag_id=tag_ids[name]) for gig_id, names in gig_tags.items() for name in names],
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+
+    active_gigs = set(Gig.objects.filter(is_active=True).values_list('id', flat=True))
+    counts = {}
+    for gig_id, names in gig_tags.items():
+        if gig_id in active_gigs:
+            for name in names:
+                counts[name] = counts.get(name, 0) + 1
+    for name, count in counts.items():
+        Tag.objects.filter(id=tag_ids[name]).update(gig_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gigs', '0003_tag_gig_normalized_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gigs', '0004_backfill_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GigSearchDocument',
+            fields=[
+                ('gig', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='gigs.gig')),
+                ('document', models.TextField(db_column='gigs_gig_fts')),
+            ],
+            options={
+                'db_table': 'gigs_gig_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:06
+
+from django.db import migrations, models
+
+
+def populate_gig_counts(apps, schema_editor):
+    Category = apps.get_model('gigs', 'Category')
+    Gig = apps.get_model('gigs', 'Gig')
+    counts = Gig.objects.filter(is_active=True, category__isnull=False).values('category').annotate(
+        total=models.Count('id')
+    ).values_list('category', 'total')
+    for category_id, total in counts:
+        Category.objects.filter(pk=category_id).update(gig_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gigs', '0005_gigsearchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='gig_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of active gigs in this category'),
+        ),
+        migrations.RunPython(populate_gig_counts, migrations.RunPython.noop),
+    ]
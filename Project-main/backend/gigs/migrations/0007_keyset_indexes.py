@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gigs', '0006_category_gig_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(fields=['is_active', 'created_at', 'id'], name='gigs_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(fields=['is_active', 'price', 'id'], name='gigs_active_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(fields=['is_active', 'average_rating', 'id'], name='gigs_active_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(fields=['is_active', 'total_orders', 'id'], name='gigs_active_orders_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gigs', '0007_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='gig',
+            name='gigs_active_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='gig',
+            name='gigs_active_price_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='gig',
+            name='gigs_active_rating_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='gig',
+            name='gigs_active_orders_idx',
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at', 'id'], name='gigs_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['price', 'id'], name='gigs_active_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['average_rating', 'id'], name='gigs_active_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['total_orders', 'id'], name='gigs_active_orders_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-average_rating', '-total_orders'], name='gigs_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'created_at'], name='gigs_category_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(fields=['seller', 'is_active'], name='gigs_seller_active_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gigs', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gig',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of reviews'),
+        ),
+        migrations.AddField(
+            model_name='gig',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, help_text='Sum of all review ratings'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 
 
@@ -8,6 +9,7 @@ class Category(models.Model):
     slug = models.SlugField(max_length=100, unique=True)
     icon = models.CharField(max_length=50, blank=True, help_text='Icon class name')
     description = models.TextField(blank=True)
+    gig_count = models.PositiveIntegerField(default=0, help_text='Number of active gigs in this category')
 
     class Meta:
         verbose_name_plural = 'Categories'
@@ -17,6 +19,25 @@ class Category(models.Model):
         return self.name
 
 
+class Tag(models.Model):
+    """A normalized gig tag, shared across gigs."""
+    name = models.CharField(max_length=50, unique=True)
+    gig_count = models.PositiveIntegerField(default=0, help_text='Number of active gigs with this tag')
+
+    class Meta:
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['-gig_count', 'name'], name='gigs_tag_popular_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def normalize(value):
+        return ' '.join(value.lower().split())[:50]
+
+
 class Gig(models.Model):
     """A service/gig offered by a freelancer."""
     seller = models.ForeignKey(
@@ -36,15 +57,36 @@ class Gig(models.Model):
     delivery_days = models.PositiveIntegerField(default=3)
     image = models.ImageField(upload_to='gigs/', blank=True, null=True)
     tags = models.CharField(max_length=500, blank=True, help_text='Comma-separated tags')
+    normalized_tags = models.ManyToManyField(Tag, related_name='gigs', blank=True)
     is_active = models.BooleanField(default=True)
     revisions = models.PositiveIntegerField(default=1, help_text='Number of revisions included')
     total_orders = models.PositiveIntegerField(default=0)
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    rating_sum = models.PositiveIntegerField(default=0, help_text='Sum of all review ratings')
+    rating_count = models.PositiveIntegerField(default=0, help_text='Number of reviews')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        # The browse queries filter on ``is_active`` as a bare boolean, which
+        # SQLite can't match against a leading index column, so the list
+        # indexes are partial indexes over active gigs instead.
+        indexes = [
+            # Keyset pagination over the sortable columns of the gig list.
+            models.Index(fields=['created_at', 'id'], condition=Q(is_active=True), name='gigs_active_created_idx'),
+            models.Index(fields=['price', 'id'], condition=Q(is_active=True), name='gigs_active_price_idx'),
+            models.Index(fields=['average_rating', 'id'], condition=Q(is_active=True), name='gigs_active_rating_idx'),
+            models.Index(fields=['total_orders', 'id'], condition=Q(is_active=True), name='gigs_active_orders_idx'),
+            # Homepage featured gigs, category browsing and seller dashboards.
+            models.Index(
+                fields=['-average_rating', '-total_orders'], condition=Q(is_active=True), name='gigs_featured_idx',
+            ),
+            models.Index(
+                fields=['category', 'created_at'], condition=Q(is_active=True), name='gigs_category_active_idx',
+            ),
+            models.Index(fields=['seller', 'is_active'], name='gigs_seller_active_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -52,3 +94,20 @@ class Gig(models.Model):
     @property
     def tags_list(self):
         return [t.strip() for t in self.tags.split(',') if t.strip()] if self.tags else []
+
+
+class GigSearchDocument(models.Model):
+    """Read-only mapping of the SQLite FTS5 search table (see gigs.search)."""
+    gig = models.OneToOneField(
+        Gig,
+        primary_key=True,
+        db_column='rowid',
+        on_delete=models.DO_NOTHING,
+        related_name='search_document'
+    )
+    # FTS5 exposes a hidden column named after the table; MATCH and bm25() use it.
+    document = models.TextField(db_column='gigs_gig_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'gigs_gig_fts'
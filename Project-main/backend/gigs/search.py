@@ -0,0 +1,179 @@
+"""
+Full-text search for gigs.
+
+On SQLite gigs are mirrored into an FTS5 table (``gigs_gig_fts``) that is
+kept in sync by the signals in ``gigs.signals`` and ranked with bm25. On
+PostgreSQL a weighted ``tsvector`` expression (backed by a GIN index) is
+ranked with ``ts_rank``. Other backends fall back to ``icontains`` matching.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Func, Lookup, Q
+
+from .models import GigSearchDocument
+
+FTS_TABLE = 'gigs_gig_fts'
+
+# Relative weight of title, description and tags when ranking matches.
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+TAGS_WEIGHT = 5.0
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Per-connection cache of whether the FTS5 table exists.
+_fts_tables = {}
+
+
+def search_backend(using=None):
+    conn = using or connection
+    if conn.vendor == 'sqlite':
+        if conn.alias not in _fts_tables:
+            _fts_tables[conn.alias] = fts_table_exists(conn)
+        if _fts_tables[conn.alias]:
+            return 'fts5'
+    if conn.vendor == 'postgresql':
+        return 'postgres'
+    return 'fallback'
+
+
+def fts_table_exists(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def create_fts_table(conn):
+    """Create and populate the FTS5 table; returns False if SQLite lacks FTS5."""
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+                f"title, description, tags, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        except Exception:
+            return False
+    _fts_tables.pop(conn.alias, None)
+    rebuild_index(conn)
+    return True
+
+
+def drop_fts_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    _fts_tables.pop(conn.alias, None)
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_gigs(queryset, text):
+    """Filter ``queryset`` to gigs matching ``text``, ordered by relevance."""
+    backend = search_backend()
+    if backend == 'fts5':
+        return _search_fts5(queryset, text)
+    if backend == 'postgres':
+        return _search_postgres(queryset, text)
+    return search_gigs_icontains(queryset, text)
+
+
+@GigSearchDocument._meta.get_field('document').register_lookup
+class FTSMatch(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class BM25(Func):
+    """bm25 relevance of a matched FTS5 row; lower is more relevant."""
+    function = 'bm25'
+    template = f'%(function)s(%(expressions)s, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}, {TAGS_WEIGHT})'
+    output_field = FloatField()
+
+
+def _search_fts5(queryset, text):
+    match = build_match_query(text)
+    if not match:
+        return queryset
+    # Joins gigs_gig_fts on rowid, so SQLite drives the query from the index
+    # and ranks in the same statement.
+    return queryset.filter(search_document__document__match=match).annotate(
+        search_rank=BM25('search_document__document'),
+    ).order_by('search_rank', '-id')
+
+
+def _search_postgres(queryset, text):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    query = SearchQuery(text, search_type='websearch', config='english')
+    # Not ``search_document``: that is the reverse accessor of GigSearchDocument.
+    return queryset.annotate(
+        search_vec=search_vector(),
+    ).filter(search_vec=query).annotate(
+        search_rank=SearchRank(search_vector(), query),
+    ).order_by('-search_rank', '-id')
+
+
+def search_vector():
+    """Weighted tsvector over title, tags and description (PostgreSQL only).
+
+    The ``gigs_gig_search_idx`` GIN index is built from this same expression.
+    """
+    from django.contrib.postgres.search import SearchVector
+
+    return (
+        SearchVector('title', weight='A', config='english') +
+        SearchVector('tags', weight='B', config='english') +
+        SearchVector('description', weight='C', config='english')
+    )
+
+
+def search_gigs_icontains(queryset, text):
+    """Unindexed substring match, equivalent to DRF's SearchFilter."""
+    condition = Q()
+    for term in text.split():
+        condition &= Q(title__icontains=term) | Q(description__icontains=term) | Q(tags__icontains=term)
+    return queryset.filter(condition)
+
+
+def index_gig(gig):
+    """Insert or refresh a single gig in the FTS index."""
+    if search_backend() != 'fts5':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [gig.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, description, tags) VALUES (%s, %s, %s, %s)',
+            [gig.pk, gig.title, gig.description, gig.tags],
+        )
+
+
+def remove_gig(gig_id):
+    if search_backend() != 'fts5':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [gig_id])
+
+
+def rebuild_index(using=None):
+    """Repopulate the FTS index from ``gigs_gig``. Returns the number of rows indexed."""
+    conn = using or connection
+    if search_backend(conn) != 'fts5':
+        return 0
+    with conn.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, description, tags) '
+            f'SELECT id, title, description, tags FROM gigs_gig'
+        )
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
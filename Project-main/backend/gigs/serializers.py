@@ -1,17 +1,51 @@
 from rest_framework import serializers
-from .models import Category, Gig
+from .models import Category, Gig, Tag
 from accounts.serializers import UserSerializer
+from images.fields import ImageDerivativesField
 
 
-class CategorySerializer(serializers.ModelSerializer):
-    gig_count = serializers.SerializerMethodField()
+def get_saved_gig_ids(context):
+    """
+    Return the ids of gigs saved by the requesting user.
+
+    Loaded with a single query and cached in the serializer context, which
+    nested serializers share with their root, so a page of gigs costs one
+    lookup instead of one per row.
+    """
+    if 'saved_gig_ids' not in context:
+        request = context.get('request')
+        saved = set()
+        if request and request.user.is_authenticated:
+            saved = set(Gig.objects.filter(saved_by__user=request.user).values_list('id', flat=True))
+        context['saved_gig_ids'] = saved
+    return context['saved_gig_ids']
+
+
+async def aget_saved_gig_ids(context):
+    """``get_saved_gig_ids`` for async views; fills the same context entry."""
+    if 'saved_gig_ids' not in context:
+        request = context.get('request')
+        saved = set()
+        if request and request.user.is_authenticated:
+            saved = {
+                gig_id async for gig_id in
+                Gig.objects.filter(saved_by__user=request.user).values_list('id', flat=True)
+            }
+        context['saved_gig_ids'] = saved
+    return context['saved_gig_ids']
 
+
+class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug', 'icon', 'description', 'gig_count']
+        read_only_fields = ['gig_count']
+
 
-    def get_gig_count(self, obj):
-        return obj.gigs.filter(is_active=True).count()
+class TagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ['id', 'name', 'gig_count']
 
 
 class GigListSerializer(serializers.ModelSerializer):
@@ -19,25 +53,19 @@ class GigListSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     tags_list = serializers.ListField(read_only=True)
     is_saved = serializers.SerializerMethodField()
+    image_variants = ImageDerivativesField(source='image')
 
     class Meta:
         model = Gig
         fields = [
             'id', 'seller', 'category', 'category_name', 'title',
-            'description', 'price', 'delivery_days', 'image', 'tags',
+            'description', 'price', 'delivery_days', 'image', 'image_variants', 'tags',
             'tags_list', 'is_saved', 'is_active', 'revisions', 'total_orders',
             'average_rating', 'created_at',
         ]
 
     def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            # We can optimize this by annotating the queryset in views instead.
-            # But for simplicity, we check if the user's profile has this gig saved.
-            profile = getattr(request.user, 'profile', None)
-            if profile:
-                return profile.saved_gigs.filter(id=obj.id).exists()
-        return False
+        return obj.id in get_saved_gig_ids(self.context)
 
 
 
@@ -66,12 +94,7 @@ class GigDetailSerializer(serializers.ModelSerializer):
             return None
 
     def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            profile = getattr(request.user, 'profile', None)
-            if profile:
-                return profile.saved_gigs.filter(id=obj.id).exists()
-        return False
+        return obj.id in get_saved_gig_ids(self.context)
 
 
 class GigCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,108 @@
+"""
+Keep the search index, normalized tags, category counts and cached
+responses in sync with gig writes.
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from accounts.models import Profile
+from config.caching import invalidate
+
+from .categories import refresh_category_counts
+from .models import Category, Gig
+from .search import index_gig, remove_gig
+from .tags import refresh_tag_counts, sync_gig_tags
+
+# What index_gig() writes to the search index.
+SEARCH_FIELDS = {'title', 'description', 'tags'}
+# What the post_save receivers compare with the stored row.
+LISTING_FIELDS = {'category', 'category_id', 'is_active', 'tags'}
+
+
+def writes_any(update_fields, fields):
+    """False for a ``save(update_fields=...)`` that writes none of ``fields``."""
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+@receiver(post_save, sender=Gig)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    # Counter-only saves (ratings, total_orders) leave the indexed text alone.
+    if writes_any(update_fields, SEARCH_FIELDS):
+        index_gig(instance)
+
+
+@receiver(post_delete, sender=Gig)
+def delete_from_search_index(sender, instance, **kwargs):
+    remove_gig(instance.pk)
+
+
+@receiver(post_save, sender=Gig)
+def update_normalized_tags(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Tag counts only include active gigs, so activation changes them too.
+    if raw or not writes_any(update_fields, {'tags', 'is_active'}):
+        return
+    previous = None if created else getattr(instance, '_previous_listing', None)
+    if previous is None or instance._previous_tags != instance.tags:
+        sync_gig_tags(instance)
+    elif previous[1] != instance.is_active:
+        refresh_tag_counts(list(instance.normalized_tags.values_list('id', flat=True)))
+
+
+@receiver(pre_delete, sender=Gig)
+def remember_deleted_gig_tags(sender, instance, **kwargs):
+    instance._deleted_tag_ids = list(instance.normalized_tags.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Gig)
+def update_tag_counts_after_delete(sender, instance, **kwargs):
+    tag_ids = getattr(instance, '_deleted_tag_ids', None)
+    if tag_ids:
+        refresh_tag_counts(tag_ids)
+
+
+@receiver(pre_save, sender=Gig)
+def remember_previous_category(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._previous_listing = instance._previous_tags = None
+    if raw or not instance.pk:
+        return
+    if not writes_any(update_fields, LISTING_FIELDS):
+        # e.g. counter updates; none of these can change.
+        instance._previous_listing, instance._previous_tags = (instance.category_id, instance.is_active), instance.tags
+        return
+    previous = Gig.objects.filter(pk=instance.pk).values_list('category_id', 'is_active', 'tags').first()
+    if previous:
+        instance._previous_listing, instance._previous_tags = previous[:2], previous[2]
+
+
+@receiver(post_save, sender=Gig)
+def update_category_counts(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_listing', None)
+    if not created and previous == (instance.category_id, instance.is_active):
+        return
+    refresh_category_counts({instance.category_id, previous[0] if previous else None})
+
+
+@receiver(post_delete, sender=Gig)
+def update_category_counts_after_delete(sender, instance, **kwargs):
+    refresh_category_counts([instance.category_id])
+
+
+@receiver(post_save, sender=Gig)
+@receiver(post_delete, sender=Gig)
+def invalidate_gig_responses(sender, instance, **kwargs):
+    invalidate(f'gig:{instance.pk}', 'gigs')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_responses(sender, **kwargs):
+    invalidate('categories')
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_seller_gig_responses(sender, instance, **kwargs):
+    # Gig detail responses embed the seller's public profile.
+    gig_ids = Gig.objects.filter(seller_id=instance.user_id).values_list('id', flat=True)
+    invalidate(*[f'gig:{gig_id}' for gig_id in gig_ids])
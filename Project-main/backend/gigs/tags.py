@@ -0,0 +1,80 @@
+"""
+Normalized tag storage for gigs.
+
+``Gig.tags`` stays the comma-separated string the API reads and writes;
+``Gig.normalized_tags`` mirrors it as rows in ``Tag`` so tags can be
+filtered exactly and counted without scanning gigs. ``Tag.gig_count`` is
+recomputed for the affected tags whenever a gig is saved or deleted.
+"""
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Gig, Tag
+
+
+def parse_tags(text):
+    """Split a comma-separated tag string into unique normalized names."""
+    names = []
+    for raw in (text or '').split(','):
+        name = Tag.normalize(raw)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def sync_gig_tags(gig):
+    """Point ``gig.normalized_tags`` at the tags in ``gig.tags`` and refresh counts."""
+    names = parse_tags(gig.tags)
+    previous = set(gig.normalized_tags.values_list('id', flat=True))
+    if names:
+        Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+        current = set(Tag.objects.filter(name__in=names).values_list('id', flat=True))
+    else:
+        current = set()
+    if current != previous:
+        gig.normalized_tags.set(current)
+    refresh_tag_counts(previous | current)
+
+
+def refresh_tag_counts(tag_ids=None):
+    """Recount active gigs for ``tag_ids`` (all tags when ``None``)."""
+    tags = Tag.objects.all() if tag_ids is None else Tag.objects.filter(id__in=tag_ids)
+    active = Gig.normalized_tags.through.objects.filter(
+        tag_id=OuterRef('pk'), gig__is_active=True
+    ).order_by().values('tag_id').annotate(total=Count('gig_id')).values('total')
+    return tags.update(gig_count=Coalesce(Subquery(active, output_field=IntegerField()), Value(0)))
+
+
+def tag_facets(gigs, limit=20):
+    """Count tags across the given gig queryset, most common first."""
+    gig_ids = gigs.order_by().values('id')
+    return Tag.objects.filter(gigs__in=gig_ids).annotate(
+        count=Count('gigs')
+    ).order_by('-count', 'name')[:limit]
+
+
+def rebuild_all_tags(prune=False):
+    """
+    Rebuild every gig's tag links from ``Gig.tags`` in bulk.
+
+    Returns ``(gigs, tags)`` processed. With ``prune`` tags no longer used by
+    any gig are deleted.
+    """
+    Through = Gig.normalized_tags.through
+    gig_tags = {
+        gig_id: parse_tags(tags)
+        for gig_id, tags in Gig.objects.values_list('id', 'tags').iterator()
+    }
+    names = {name for tag_names in gig_tags.values() for name in tag_names}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    tag_ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+
+    Through.objects.all().delete()
+    Through.objects.bulk_create(
+        [Through(gig_id=gig_id, tag_id=tag_ids[name]) for gig_id, tag_names in gig_tags.items() for name in tag_names],
+        batch_size=1000,
+    )
+    if prune:
+        Tag.objects.filter(gigs__isnull=True).delete()
+    refresh_tag_counts()
+    return len(gig_tags), len(names)
@@ -0,0 +1,364 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from accounts.models import User, Profile
+from .categories import find_category_drift
+from .models import Category, Gig, Tag
+from .search import FTS_TABLE, _search_postgres
+from .tags import rebuild_all_tags
+
+
+class SavedGigResolutionTests(APITestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.profile = Profile.objects.create(user=self.buyer)
+        self.category = Category.objects.create(name='Web', slug='web')
+        self.client.force_authenticate(self.buyer)
+
+    def add_gigs(self, count, save_every=2):
+        for i in range(count):
+            gig = Gig.objects.create(
+                seller=self.seller, category=self.category,
+                title=f'Gig {Gig.objects.count()}', description='desc', price=10,
+            )
+            if i % save_every == 0:
+                self.profile.saved_gigs.add(gig)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_is_saved_costs_one_query_per_request(self):
+        for url in ['/api/gigs/', '/api/gigs/featured/', '/api/gigs/saved/']:
+            Gig.objects.all().delete()
+            self.add_gigs(2)
+            small, _ = self.count_queries(url)
+            self.add_gigs(6)
+            large, _ = self.count_queries(url)
+            self.assertEqual(small, large, url)
+
+    def test_is_saved_values(self):
+        self.add_gigs(4)
+        _, response = self.count_queries('/api/gigs/')
+        saved_ids = set(self.profile.saved_gigs.values_list('id', flat=True))
+        for gig in response.data['results']:
+            self.assertEqual(gig['is_saved'], gig['id'] in saved_ids)
+
+    def test_anonymous_user_sees_nothing_saved(self):
+        self.add_gigs(2, save_every=1)
+        self.client.force_authenticate(None)
+        _, response = self.count_queries('/api/gigs/')
+        self.assertFalse(any(gig['is_saved'] for gig in response.data['results']))
+
+
+class GigSearchTests(APITestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+
+    def create_gig(self, title, description='Professional service', tags=''):
+        return Gig.objects.create(seller=self.seller, title=title, description=description, tags=tags, price=10)
+
+    def search(self, text):
+        response = self.client.get('/api/gigs/', {'search': text})
+        self.assertEqual(response.status_code, 200)
+        return [gig['id'] for gig in response.data['results']]
+
+    def test_results_are_ranked_by_relevance(self):
+        in_description = self.create_gig('Landing page', description='Built with react and vite')
+        in_title = self.create_gig('React dashboard')
+        self.create_gig('Logo design')
+        self.assertEqual(self.search('react'), [in_title.id, in_description.id])
+
+    def test_matches_word_prefixes_across_fields(self):
+        gig = self.create_gig('Mobile app', tags='flutter,dart')
+        self.assertEqual(self.search('flut mob'), [gig.id])
+
+    def test_index_follows_saves_and_deletes(self):
+        gig = self.create_gig('Logo design')
+        self.assertEqual(self.search('logo'), [gig.id])
+        gig.title = 'Brand identity'
+        gig.save()
+        self.assertEqual(self.search('logo'), [])
+        self.assertEqual(self.search('brand'), [gig.id])
+        gig.delete()
+        self.assertEqual(self.search('brand'), [])
+
+    def test_counter_saves_leave_the_index_alone(self):
+        gig = self.create_gig('Logo design')
+        gig.total_orders = 3
+        with CaptureQueriesContext(connection) as ctx:
+            gig.save(update_fields=['total_orders'])
+        self.assertFalse([q for q in ctx.captured_queries if FTS_TABLE in q['sql']])
+        gig.title = 'Brand identity'
+        gig.save(update_fields=['title'])
+        self.assertEqual(self.search('brand'), [gig.id])
+
+    def test_explicit_ordering_overrides_relevance(self):
+        cheap = self.create_gig('React site')
+        pricey = self.create_gig('React app')
+        Gig.objects.filter(pk=pricey.pk).update(price=99)
+        response = self.client.get('/api/gigs/', {'search': 'react', 'ordering': '-price'})
+        self.assertEqual([gig['id'] for gig in response.data['results']], [pricey.id, cheap.id])
+
+    def test_postgres_queryset_builds(self):
+        try:
+            queryset = _search_postgres(Gig.objects.all(), 'logo')
+        except ImportError:
+            # SearchRank needs psycopg; the annotations that could clash come first.
+            self.skipTest('psycopg is not installed')
+        self.assertIn('search_rank', str(queryset.query))
+
+
+class GigTagTests(APITestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+
+    def create_gig(self, tags, **kwargs):
+        return Gig.objects.create(seller=self.seller, title='Gig', description='desc', price=10, tags=tags, **kwargs)
+
+    def test_tags_are_normalized_on_save(self):
+        gig = self.create_gig('React, Django ,react,  Web  Apps')
+        self.assertEqual(sorted(gig.normalized_tags.values_list('name', flat=True)), ['django', 'react', 'web apps'])
+        gig.tags = 'django'
+        gig.save()
+        self.assertEqual(list(gig.normalized_tags.values_list('name', flat=True)), ['django'])
+        self.assertEqual(Tag.objects.get(name='react').gig_count, 0)
+
+    def test_tags_are_left_alone_when_unchanged(self):
+        gig = self.create_gig('react,django')
+        gig.title = 'Renamed'
+        for kwargs in ({}, {'update_fields': ['title']}):
+            with CaptureQueriesContext(connection) as ctx:
+                gig.save(**kwargs)
+            self.assertFalse([q for q in ctx.captured_queries if 'gigs_tag' in q['sql']], kwargs)
+        gig.is_active = False
+        gig.save(update_fields=['is_active'])
+        self.assertEqual(Tag.objects.get(name='react').gig_count, 0)
+
+    def test_exact_tag_filter_requires_every_tag(self):
+        both = self.create_gig('react,django')
+        self.create_gig('react')
+        self.create_gig('reactive')
+        response = self.client.get('/api/gigs/?tag=react&tag=Django')
+        self.assertEqual([gig['id'] for gig in response.data['results']], [both.id])
+        self.assertEqual(response.data['results'][0]['tags_list'], ['react', 'django'])
+
+    def test_popular_tags_count_active_gigs(self):
+        self.create_gig('react,django')
+        self.create_gig('react')
+        inactive = self.create_gig('react,vue', is_active=False)
+        response = self.client.get('/api/gigs/tags/popular/')
+        self.assertEqual([(t['name'], t['gig_count']) for t in response.data], [('react', 2), ('django', 1)])
+        inactive.delete()
+        self.assertEqual(Tag.objects.get(name='vue').gig_count, 0)
+
+    def test_popular_tags_limit_is_clamped(self):
+        self.create_gig('react,django')
+        for limit, count in (('-5', 1), ('0', 1), ('1000', 2), ('x', 2)):
+            response = self.client.get('/api/gigs/tags/popular/', {'limit': limit})
+            self.assertEqual(response.status_code, 200, limit)
+            self.assertEqual(len(response.data), count, limit)
+
+    def test_facets_follow_gig_filters(self):
+        category = Category.objects.create(name='Web', slug='web')
+        self.create_gig('react,django', category=category)
+        self.create_gig('react', category=category)
+        Gig.objects.create(seller=self.seller, title='Logo design', description='desc', price=10, tags='logo')
+        response = self.client.get('/api/gigs/tags/facets/', {'category': category.id})
+        self.assertEqual(response.data, [{'name': 'react', 'count': 2}, {'name': 'django', 'count': 1}])
+        response = self.client.get('/api/gigs/tags/facets/', {'search': 'logo'})
+        self.assertEqual(response.data, [{'name': 'logo', 'count': 1}])
+
+    def test_rebuild_all_tags_repairs_links(self):
+        gig = self.create_gig('react')
+        Gig.objects.filter(pk=gig.pk).update(tags='vue,svelte')
+        rebuild_all_tags(prune=True)
+        self.assertEqual(sorted(gig.normalized_tags.values_list('name', flat=True)), ['svelte', 'vue'])
+        self.assertFalse(Tag.objects.filter(name='react').exists())
+
+
+class CategoryCountTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        self.web = Category.objects.create(name='Web', slug='web')
+        self.design = Category.objects.create(name='Design', slug='design')
+
+    def create_gig(self, category, **kwargs):
+        return Gig.objects.create(seller=self.seller, category=category, title='Gig', description='desc', price=10, **kwargs)
+
+    def counts(self):
+        response = self.client.get('/api/gigs/categories/')
+        return {c['slug']: c['gig_count'] for c in response.data}
+
+    def test_counts_follow_gig_lifecycle(self):
+        gig = self.create_gig(self.web)
+        self.create_gig(self.web)
+        self.create_gig(self.design, is_active=False)
+        self.assertEqual(self.counts(), {'web': 2, 'design': 0})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            gig.category = self.design
+            gig.save()
+        self.assertEqual(self.counts(), {'web': 1, 'design': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            gig.is_active = False
+            gig.save()
+        self.assertEqual(self.counts(), {'web': 1, 'design': 0})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Gig.objects.filter(category=self.web).first().delete()
+        self.assertEqual(self.counts(), {'web': 0, 'design': 0})
+
+    def test_counter_saves_do_not_read_the_previous_row(self):
+        gig = self.create_gig(self.web)
+        gig.total_orders = 2
+        with CaptureQueriesContext(connection) as ctx:
+            gig.save(update_fields=['total_orders'])
+        self.assertEqual([q['sql'].split()[0] for q in ctx.captured_queries], ['UPDATE'])
+        self.assertEqual(self.counts(), {'web': 1, 'design': 0})
+
+    def test_cached_list_skips_the_database(self):
+        self.create_gig(self.web)
+        self.counts()
+        with self.assertNumQueries(0):
+            self.counts()
+
+    def test_drift_is_detected_and_repaired(self):
+        self.create_gig(self.web)
+        Gig.objects.update(is_active=False)
+        drift = find_category_drift()
+        self.assertEqual([(c.slug, stored, actual) for c, stored, actual in drift], [('web', 1, 0)])
+        call_command('check_category_counts', '--fix', stdout=StringIO())
+        self.assertEqual(find_category_drift(), [])
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        Profile.objects.create(user=self.seller)
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.profile = Profile.objects.create(user=self.buyer)
+        self.gig = Gig.objects.create(seller=self.seller, title='Logo design', description='desc', price=10)
+
+    def test_featured_hits_cache_without_queries(self):
+        first = self.client.get('/api/gigs/featured/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/gigs/featured/')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+
+    def test_is_saved_is_personalized_on_shared_entries(self):
+        self.profile.saved_gigs.add(self.gig)
+        anonymous = self.client.get(f'/api/gigs/{self.gig.id}/')
+        self.assertFalse(anonymous.data['is_saved'])
+        self.client.force_authenticate(self.buyer)
+        personal = self.client.get(f'/api/gigs/{self.gig.id}/')
+        self.assertEqual(personal['X-Cache'], 'HIT')
+        self.assertTrue(personal.data['is_saved'])
+        self.assertNotEqual(anonymous['ETag'], personal['ETag'])
+
+    def test_etag_revalidation(self):
+        response = self.client.get(f'/api/gigs/{self.gig.id}/')
+        revalidated = self.client.get(f'/api/gigs/{self.gig.id}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_gig_write_invalidates_only_its_entries(self):
+        other = Gig.objects.create(seller=self.seller, title='Other', description='desc', price=10)
+        self.client.get(f'/api/gigs/{self.gig.id}/')
+        self.client.get(f'/api/gigs/{other.id}/')
+        self.gig.title = 'Brand identity'
+        self.gig.save()
+        response = self.client.get(f'/api/gigs/{self.gig.id}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['title'], 'Brand identity')
+        self.assertEqual(self.client.get(f'/api/gigs/{other.id}/')['X-Cache'], 'HIT')
+
+    def test_query_parameters_are_part_of_the_key(self):
+        self.client.get('/api/gigs/categories/')
+        self.assertEqual(self.client.get('/api/gigs/categories/', {'x': 1})['X-Cache'], 'MISS')
+
+    def test_stats_are_admin_only(self):
+        self.client.get('/api/gigs/featured/')
+        self.client.get('/api/gigs/featured/')
+        self.client.force_authenticate(self.buyer)
+        self.assertEqual(self.client.get('/api/auth/admin/cache/').status_code, 403)
+        admin = User.objects.create_user(username='admin', email='admin@example.com', password='pass12345', is_staff=True)
+        self.client.force_authenticate(admin)
+        stats = self.client.get('/api/auth/admin/cache/').data
+        self.assertEqual(stats['featured_gigs'], {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        prices = [30, 10, 20, 10, 40, 10, 20]
+        self.gigs = [
+            Gig.objects.create(seller=self.seller, title=f'Gig {i}', description='desc', price=price)
+            for i, price in enumerate(prices)
+        ]
+
+    def walk(self, params):
+        ids, url, data = [], '/api/gigs/', dict(params, pagination='cursor', page_size=3)
+        while url:
+            response = self.client.get(url, data)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids += [gig['id'] for gig in response.data['results']]
+            url, data = response.data['next'], None
+        return ids, response
+
+    def test_default_ordering_matches_page_numbers(self):
+        ids, _ = self.walk({})
+        expected = [gig['id'] for gig in self.client.get('/api/gigs/').data['results']]
+        self.assertEqual(ids, expected)
+
+    def test_ties_are_broken_by_id(self):
+        ids, _ = self.walk({'ordering': 'price'})
+        expected = [g.id for g in sorted(self.gigs, key=lambda g: (g.price, g.id))]
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_walks_back(self):
+        first = self.client.get('/api/gigs/', {'pagination': 'cursor', 'page_size': 3, 'ordering': '-price'})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertIsNone(back.data['previous'])
+
+    def test_search_relevance_ordering_pages(self):
+        Gig.objects.create(seller=self.seller, title='React app', description='react', price=10)
+        Gig.objects.create(seller=self.seller, title='Site', description='react', price=10)
+        ids, _ = self.walk({'search': 'react'})
+        self.assertEqual(len(ids), 2)
+
+    def test_rows_within_the_same_millisecond(self):
+        base = timezone.now().replace(microsecond=0)
+        for i, gig in enumerate(self.gigs):
+            # 100µs apart: DjangoJSONEncoder would put them all on one value.
+            Gig.objects.filter(pk=gig.pk).update(created_at=base + timedelta(microseconds=100 * i))
+        for ordering in ('created_at', '-created_at'):
+            with self.subTest(ordering=ordering):
+                ids, url, data = [], '/api/gigs/', {'pagination': 'cursor', 'page_size': 2, 'ordering': ordering}
+                while url and len(ids) <= len(self.gigs):
+                    response = self.client.get(url, data)
+                    ids += [gig['id'] for gig in response.data['results']]
+                    url, data = response.data['next'], None
+                expected = [gig.id for gig in self.gigs]
+                self.assertEqual(ids, expected if ordering == 'created_at' else expected[::-1])
+
+    def test_cursor_from_another_ordering_is_rejected(self):
+        first = self.client.get('/api/gigs/', {'pagination': 'cursor', 'page_size': 3})
+        cursor = first.data['next'].split('cursor=')[1]
+        response = self.client.get('/api/gigs/', {'cursor': cursor, 'ordering': 'price'})
+        self.assertEqual(response.status_code, 404)
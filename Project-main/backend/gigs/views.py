@@ -1,10 +1,15 @@
 from rest_framework import generics, permissions, filters, status
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Category, Gig
+from config.caching import CachedResponseMixin
+from config.pagination import KeysetPagination
+from .models import Category, Gig, Tag
+from .search import search_gigs
+from .tags import tag_facets
 from .serializers import (
     CategorySerializer, GigListSerializer,
-    GigDetailSerializer, GigCreateSerializer
+    GigDetailSerializer, GigCreateSerializer, TagSerializer,
+    get_saved_gig_ids,
 )
 
 
@@ -15,25 +20,50 @@ class IsSellerOrReadOnly(permissions.BasePermission):
         return obj.seller == request.user
 
 
-class CategoryListView(generics.ListAPIView):
+class GigSearchFilter(filters.SearchFilter):
+    """Relevance-ranked full-text search (see gigs.search) instead of icontains scans."""
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return search_gigs(queryset, text)
+
+
+class SavedStateCacheMixin(CachedResponseMixin):
+    """Cache gig payloads shared by all users and overlay ``is_saved`` per request."""
+
+    def personalize_cached_data(self, data):
+        return mark_saved(data, get_saved_gig_ids({'request': self.request}))
+
+
+def mark_saved(data, saved):
+    """Set ``is_saved`` on a serialized gig or list of gigs from the ids in ``saved``."""
+    gigs = data if isinstance(data, list) else [data]
+    for gig in gigs:
+        gig['is_saved'] = gig['id'] in saved
+    return data
+
+
+class CategoryListView(CachedResponseMixin, generics.ListAPIView):
+    """Categories with their active-gig counters, cached until a gig or category changes."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
     pagination_class = None
+    cache_namespace = 'categories'
 
+    def get_cache_dependencies(self):
+        return ['categories', 'category_counts']
 
-class GigListCreateView(generics.ListCreateAPIView):
-    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+
+class GigFilterMixin:
+    """Filtering shared by the gig list and its tag facets."""
+    filter_backends = [DjangoFilterBackend, GigSearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'is_active']
     search_fields = ['title', 'description', 'tags']
     ordering_fields = ['price', 'created_at', 'average_rating', 'total_orders']
 
-    def get_serializer_class(self):
-        if self.request.method == 'POST':
-            return GigCreateSerializer
-        return GigListSerializer
-
     def get_queryset(self):
         queryset = Gig.objects.filter(is_active=True).select_related('seller', 'category')
         min_price = self.request.query_params.get('min_price')
@@ -42,8 +72,21 @@ class GigListCreateView(generics.ListCreateAPIView):
             queryset = queryset.filter(price__gte=min_price)
         if max_price:
             queryset = queryset.filter(price__lte=max_price)
+        # ?tag=react&tag=django matches gigs carrying every listed tag.
+        for tag in self.request.query_params.getlist('tag'):
+            queryset = queryset.filter(normalized_tags__name=Tag.normalize(tag))
         return queryset
 
+
+class GigListCreateView(GigFilterMixin, generics.ListCreateAPIView):
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
+
+    def get_serializer_class(self):
+        if self.request.method == 'POST':
+            return GigCreateSerializer
+        return GigListSerializer
+
     def perform_create(self, serializer):
         serializer.save(seller=self.request.user)
         # Automatically mark user as freelancer when they create a gig
@@ -52,9 +95,13 @@ class GigListCreateView(generics.ListCreateAPIView):
             self.request.user.save()
 
 
-class GigDetailView(generics.RetrieveUpdateDestroyAPIView):
+class GigDetailView(SavedStateCacheMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Gig.objects.select_related('seller', 'category')
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsSellerOrReadOnly]
+    cache_namespace = 'gig_detail'
+
+    def get_cache_dependencies(self):
+        return [f"gig:{self.kwargs['pk']}", 'categories']
 
     def get_serializer_class(self):
         if self.request.method in ('PUT', 'PATCH'):
@@ -68,14 +115,42 @@ class MyGigsView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Gig.objects.filter(seller=self.request.user).select_related('category')
+        return Gig.objects.filter(seller=self.request.user).select_related('seller', 'category')
+
 
+class PopularTagsView(generics.ListAPIView):
+    """Most used tags across active gigs, served from the per-tag counters."""
+    serializer_class = TagSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = None
 
-class FeaturedGigsView(generics.ListAPIView):
+    def get_queryset(self):
+        try:
+            limit = max(1, min(int(self.request.query_params.get('limit', 20)), 100))
+        except ValueError:
+            limit = 20
+        return Tag.objects.filter(gig_count__gt=0).order_by('-gig_count', 'name')[:limit]
+
+
+class TagFacetsView(GigFilterMixin, generics.GenericAPIView):
+    """Tag counts across the gigs matched by the same filters as the gig list."""
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        gigs = self.filter_queryset(self.get_queryset())
+        facets = tag_facets(gigs)
+        return Response([{'name': tag.name, 'count': tag.count} for tag in facets])
+
+
+class FeaturedGigsView(SavedStateCacheMixin, generics.ListAPIView):
     """Return top-rated gigs for the homepage."""
     serializer_class = GigListSerializer
     permission_classes = [permissions.AllowAny]
     pagination_class = None
+    cache_namespace = 'featured_gigs'
+
+    def get_cache_dependencies(self):
+        return ['gigs', 'categories']
 
     def get_queryset(self):
         return Gig.objects.filter(
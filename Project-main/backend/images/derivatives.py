@@ -0,0 +1,106 @@
+"""
+Resized, metadata-free derivatives of uploaded images.
+
+``settings.IMAGE_DERIVATIVES`` maps an image field (``'gigs.Gig.image'``) to
+named sizes, each a bounding box the image is shrunk to fit (never
+enlarged). Derivatives are written next to the originals under
+``derived/`` with a name computed from the original's and the size, so
+serializers can hand out their URLs without looking anything up. Originals
+carry a content hash in their names (``config.media.MediaStorage``), so a
+derivative URL never changes content and can be cached as immutable.
+
+Rendering applies the EXIF orientation, converts images with an ICC profile
+to sRGB (what browsers assume for untagged images), then saves fresh pixel
+data with no EXIF, ICC or XMP blocks. JPEG sources are decoded at a reduced scale
+(``Image.draft``) when the largest size allows it.
+"""
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+def derivative_name(name, size, box):
+    root, _ = os.path.splitext(name)
+    width, height = box
+    return f'derived/{root}.{size}-{width}x{height}.{EXTENSIONS[settings.IMAGE_DERIVATIVE_FORMAT]}'
+
+
+def field_key(field):
+    return f'{field.model._meta.label}.{field.name}'
+
+
+def sizes_for(key):
+    return settings.IMAGE_DERIVATIVES.get(key, {})
+
+
+def image_fields():
+    """Yield ``(key, model, field_name)`` for every configured image field."""
+    for key in settings.IMAGE_DERIVATIVES:
+        label, field_name = key.rsplit('.', 1)
+        yield key, apps.get_model(label), field_name
+
+
+def _to_srgb(image):
+    """Convert an image tagged with an ICC profile to sRGB, so it looks the same once untagged."""
+    profile = image.info.get('icc_profile')
+    if not profile or image.mode not in ('RGB', 'RGBA', 'CMYK', 'L'):
+        return image
+    try:
+        from PIL import ImageCms
+    except ImportError:
+        return image
+    try:
+        return ImageCms.profileToProfile(
+            image, ImageCms.ImageCmsProfile(BytesIO(profile)), ImageCms.createProfile('sRGB'),
+            outputMode='RGBA' if image.mode == 'RGBA' else 'RGB',
+        )
+    except (ImageCms.PyCMSError, OSError):
+        # A broken or mismatched profile: keep the pixels as they are.
+        return image
+
+
+def _prepare(image, fmt):
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    if fmt == 'JPEG' and image.mode == 'RGBA':
+        flat = Image.new('RGB', image.size, (255, 255, 255))
+        flat.paste(image, mask=image.getchannel('A'))
+        image = flat
+    return image
+
+
+def render_derivatives(name, sizes, storage=None):
+    """Write every size of the image stored as ``name``; returns the derivative names."""
+    storage = storage or default_storage
+    fmt = settings.IMAGE_DERIVATIVE_FORMAT
+    largest = (max(w for w, _ in sizes.values()), max(h for _, h in sizes.values()))
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        image.draft('RGB', largest)
+        image = _prepare(_to_srgb(ImageOps.exif_transpose(image)), fmt)
+
+    written = []
+    for size, box in sizes.items():
+        variant = image.copy()
+        variant.thumbnail(box, Image.Resampling.LANCZOS)
+        # Some encoders copy ICC and EXIF from the image's info by default.
+        variant.info = {}
+        buffer = BytesIO()
+        variant.save(buffer, fmt, quality=settings.IMAGE_DERIVATIVE_QUALITY)
+        path = derivative_name(name, size, box)
+        # Keep the computed name: save() would otherwise pick a new one.
+        storage.delete(path)
+        written.append(storage.save(path, ContentFile(buffer.getvalue())))
+    return written
+
+
+def missing_derivatives(name, sizes, storage=None):
+    storage = storage or default_storage
+    return [size for size, box in sizes.items() if not storage.exists(derivative_name(name, size, box))]
@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+from .derivatives import derivative_name, field_key, sizes_for
+
+
+class ImageDerivativesField(serializers.ReadOnlyField):
+    """
+    ``{size: url}`` for an image field's derivatives, or None without an image.
+
+    Use with ``source=`` naming the image field. URLs are computed, not
+    looked up; clients should fall back to the original image if one is
+    missing (e.g. not yet rendered by the worker).
+    """
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get('request')
+        urls = {}
+        for size, box in sizes_for(field_key(value.field)).items():
+            url = value.storage.url(derivative_name(value.name, size, box))
+            urls[size] = request.build_absolute_uri(url) if request else url
+        return urls
@@ -0,0 +1,9 @@
+"""Background jobs for image derivatives (see jobs/queue.py)."""
+from jobs.queue import job
+
+from .derivatives import render_derivatives, sizes_for
+
+
+@job('images.render_derivatives')
+def render(name, field):
+    render_derivatives(name, sizes_for(field))
@@ -0,0 +1,38 @@
+"""Management command to backfill image derivatives for existing media."""
+from django.core.management.base import BaseCommand
+
+from images.derivatives import image_fields, missing_derivatives, render_derivatives, sizes_for
+from jobs.queue import enqueue
+
+
+class Command(BaseCommand):
+    help = 'Render missing derivatives for every configured image field'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-render derivatives that already exist')
+        parser.add_argument('--queue', action='store_true', help='Queue the work for run_jobs instead of rendering here')
+
+    def handle(self, *args, **options):
+        for key, model, field_name in image_fields():
+            sizes = sizes_for(key)
+            names = (
+                model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .order_by().values_list(field_name, flat=True).distinct().iterator()
+            )
+            rendered = skipped = failed = 0
+            for name in names:
+                if not options['force'] and not missing_derivatives(name, sizes):
+                    skipped += 1
+                    continue
+                if options['queue']:
+                    enqueue('images.render_derivatives', name=name, field=key)
+                    rendered += 1
+                    continue
+                try:
+                    render_derivatives(name, sizes)
+                    rendered += 1
+                except Exception as e:  # missing or unreadable files shouldn't stop the backfill
+                    failed += 1
+                    self.stderr.write(f'  {name}: {e}')
+            action = 'queued' if options['queue'] else 'rendered'
+            self.stdout.write(f'{key}: {rendered} {action}, {skipped} up to date, {failed} failed')
@@ -0,0 +1,35 @@
+"""Queue derivatives for newly uploaded images of the configured fields."""
+from django.db.models.signals import post_save, pre_save
+
+from jobs.queue import enqueue
+
+from .derivatives import image_fields
+
+
+def note_new_uploads(sender, instance, **kwargs):
+    # A file assigned from an upload is only written to storage while the
+    # model saves; until then its FieldFile is uncommitted.
+    instance._new_image_fields = [
+        name for name in sender._image_derivative_fields
+        if getattr(instance, name) and not getattr(instance, name)._committed
+    ]
+
+
+def queue_derivatives(sender, instance, **kwargs):
+    for name in getattr(instance, '_new_image_fields', ()):
+        file = getattr(instance, name)
+        key = f'{sender._meta.label}.{name}'
+        enqueue('images.render_derivatives', key=f'derivatives:{file.name}', name=file.name, field=key)
+    instance._new_image_fields = []
+
+
+def connect():
+    for _, model, field_name in image_fields():
+        if not hasattr(model, '_image_derivative_fields'):
+            model._image_derivative_fields = []
+            pre_save.connect(note_new_uploads, sender=model, dispatch_uid=f'images-pre-{model._meta.label}')
+            post_save.connect(queue_derivatives, sender=model, dispatch_uid=f'images-post-{model._meta.label}')
+        model._image_derivative_fields.append(field_name)
+
+
+connect()
@@ -0,0 +1,97 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image, ImageCms
+from rest_framework.test import APITestCase
+from accounts.models import User, Profile
+from gigs.models import Gig
+from .derivatives import derivative_name
+
+GIG_SIZES = {'card': (480, 320), 'large': (1280, 853)}
+
+
+def jpeg_upload(name='photo.jpg', size=(1600, 1200)):
+    image = Image.new('RGB', size, (200, 30, 30))
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientation: rotate 90°
+    exif[0x010F] = 'SecretCam'
+    icc_profile = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', exif=exif, icc_profile=icc_profile)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class ImageDerivativeTests(APITestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings = override_settings(MEDIA_ROOT=media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        Profile.objects.create(user=self.seller)
+
+    def open_derivative(self, name, size):
+        with default_storage.open(derivative_name(name, size, GIG_SIZES[size])) as f:
+            image = Image.open(f)
+            image.load()
+        return image
+
+    def test_uploads_get_resized_stripped_derivatives(self):
+        gig = Gig.objects.create(seller=self.seller, title='Gig', description='desc', price=10, image=jpeg_upload())
+        card = self.open_derivative(gig.image.name, 'card')
+        self.assertEqual(card.format, 'WEBP')
+        # Orientation applied (portrait now) and shrunk to fit 480x320.
+        self.assertEqual(card.size, (240, 320))
+        self.assertFalse(card.getexif())
+        self.assertNotIn('icc_profile', card.info)
+        self.assertEqual(self.open_derivative(gig.image.name, 'large').size, (640, 853))
+
+    @override_settings(IMAGE_DERIVATIVE_FORMAT='JPEG')
+    def test_jpeg_derivatives_carry_no_metadata(self):
+        gig = Gig.objects.create(seller=self.seller, title='Gig', description='desc', price=10, image=jpeg_upload())
+        with default_storage.open(gig.image.name) as f:
+            self.assertIn('icc_profile', Image.open(f).info)
+        card = self.open_derivative(gig.image.name, 'card')
+        self.assertEqual(card.format, 'JPEG')
+        self.assertFalse(card.getexif())
+        self.assertNotIn('icc_profile', card.info)
+        # Converted to sRGB, the colour is unchanged.
+        red, green, blue = card.getpixel((10, 10))
+        self.assertLess(abs(red - 200) + abs(green - 30) + abs(blue - 30), 15)
+
+    def test_serializers_expose_per_size_urls(self):
+        gig = Gig.objects.create(seller=self.seller, title='Gig', description='desc', price=10, image=jpeg_upload())
+        data = self.client.get(f'/api/gigs/{gig.id}/').data
+        listing = self.client.get('/api/gigs/').data['results'][0]
+        self.assertEqual(set(listing['image_variants']), {'card', 'large'})
+        self.assertTrue(listing['image_variants']['card'].endswith(derivative_name(gig.image.name, 'card', GIG_SIZES['card'])))
+        self.assertTrue(listing['image_variants']['card'].startswith('http://testserver/media/derived/'))
+        self.assertIsNone(data['seller_profile']['avatar_variants'])
+
+    def test_backfill_renders_missing_derivatives(self):
+        gig = Gig.objects.create(seller=self.seller, title='Gig', description='desc', price=10)
+        # Images assigned by name (seed data, imports) aren't rendered on save.
+        gig.image = default_storage.save('gigs/old.jpg', jpeg_upload())
+        gig.save()
+        self.assertFalse(default_storage.exists(derivative_name(gig.image.name, 'card', GIG_SIZES['card'])))
+        call_command('generate_image_derivatives', stdout=StringIO())
+        self.assertTrue(default_storage.exists(derivative_name(gig.image.name, 'card', GIG_SIZES['card'])))
+        out = StringIO()
+        call_command('generate_image_derivatives', stdout=out)
+        self.assertIn('gigs.Gig.image: 0 rendered, 1 up to date', out.getvalue())
+
+    def test_hashed_uploads_are_served_immutable(self):
+        gig = Gig.objects.create(seller=self.seller, title='Gig', description='desc', price=10, image=jpeg_upload())
+        self.assertRegex(gig.image.name, r'^gigs/photo\.[0-9a-f]{12}\.jpg$')
+        for name in (gig.image.name, derivative_name(gig.image.name, 'card', GIG_SIZES['card'])):
+            response = self.client.get(f'/media/{name}')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+            response.close()
+        self.assertEqual(self.client.get('/media/gigs/missing.jpg').status_code, 404)
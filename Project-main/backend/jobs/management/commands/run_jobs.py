@@ -0,0 +1,38 @@
+"""Management command that runs queued background jobs."""
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import claim_next, prune_finished, release_stale, run
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs until stopped (or until the queue is empty with --burst)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is due')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after running this many jobs')
+
+    def handle(self, *args, **options):
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        done = failed = 0
+        release_stale()
+        while True:
+            claimed = claim_next(worker)
+            if claimed is None:
+                if options['burst']:
+                    break
+                release_stale()
+                prune_finished()
+                time.sleep(options['sleep'])
+                continue
+            if run(claimed):
+                done += 1
+            else:
+                failed += 1
+            if options['max_jobs'] and done + failed >= options['max_jobs']:
+                break
+        self.stdout.write(self.style.SUCCESS(f'Ran {done + failed} jobs ({failed} failed).'))
@@ -0,0 +1,167 @@
+"""
+A small database-backed job queue.
+
+Request handlers ``enqueue`` side work instead of doing it inline; the row is
+written in the same transaction as the request's own write, so a job exists
+exactly when the change that needs it was committed. ``manage.py run_jobs``
+workers claim due jobs with a conditional ``UPDATE`` (safe with several
+workers), run each one in its own transaction and reschedule failures with
+exponential backoff until ``max_attempts`` is reached.
+
+A job's effects and its ``succeeded`` mark commit together, so a job that
+fails part-way leaves nothing behind and a retry starts clean. Jobs enqueued
+with a ``key`` are only ever created once per key, which makes enqueueing
+safe to repeat (webhook redeliveries, double clicks, retried requests).
+
+With ``settings.JOBS_EAGER`` on (the default, and what the tests use) a job
+runs inline as soon as it is enqueued and any error propagates to the caller.
+Jobs enqueued with a ``delay`` are still left for the worker.
+"""
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def job(name, max_attempts=None):
+    """Register the decorated function as the job ``name``."""
+    def register(func):
+        if name in _registry and _registry[name] is not func:
+            raise ValueError(f'Job "{name}" is already registered.')
+        _registry[name] = func
+        func.job_name = name
+        func.max_attempts = max_attempts or settings.JOBS_MAX_ATTEMPTS
+        return func
+    return register
+
+
+def get_job(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f'No job registered as "{name}".') from None
+
+
+def enqueue(func, key=None, delay=None, **payload):
+    """
+    Queue ``func(**payload)`` and return the ``Job``.
+
+    ``func`` is a registered job function or its name. ``payload`` must be
+    JSON-serializable. When ``key`` is given and a job with that key already
+    exists, nothing is queued and the existing job is returned.
+    """
+    name = func if isinstance(func, str) else func.job_name
+    fields = {
+        'name': name,
+        'payload': payload,
+        'max_attempts': get_job(name).max_attempts,
+        'run_at': timezone.now() + (delay or timedelta()),
+    }
+    if key is None:
+        queued, created = Job.objects.create(**fields), True
+    else:
+        queued, created = Job.objects.get_or_create(key=key, defaults=fields)
+    if created and settings.JOBS_EAGER and not delay:
+        run(claim(queued.pk, 'eager'), raise_errors=True)
+        queued.refresh_from_db()
+    return queued
+
+
+def claim(job_id, worker):
+    """Mark a queued job as running for ``worker``; None if someone else got it first."""
+    now = timezone.now()
+    claimed = Job.objects.filter(pk=job_id, status=Job.QUEUED).update(
+        status=Job.RUNNING, attempts=F('attempts') + 1, locked_by=worker, locked_at=now,
+    )
+    return Job.objects.get(pk=job_id) if claimed else None
+
+
+def claim_next(worker, batch=20):
+    """Claim the oldest due job, or return None when nothing is due."""
+    due = (
+        Job.objects.filter(status=Job.QUEUED, run_at__lte=timezone.now())
+        .order_by('run_at', 'id').values_list('id', flat=True)[:batch]
+    )
+    for job_id in due:
+        claimed = claim(job_id, worker)
+        if claimed:
+            return claimed
+    return None
+
+
+def backoff(attempts):
+    """Seconds to wait before retrying after the ``attempts``-th failure."""
+    base = settings.JOBS_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+    return base + random.uniform(0, base / 2)
+
+
+class LockLost(Exception):
+    """The job was released by ``release_stale`` and claimed again while it ran."""
+
+
+def run(claimed, raise_errors=False):
+    """Run a claimed job and record the outcome. Returns True on success."""
+    func = get_job(claimed.name)
+    # Only the claim that is still current may record an outcome.
+    owned = Job.objects.filter(pk=claimed.pk, locked_by=claimed.locked_by, attempts=claimed.attempts)
+    try:
+        with transaction.atomic():
+            func(**claimed.payload)
+            if not owned.update(status=Job.SUCCEEDED, finished_at=timezone.now(), last_error=''):
+                raise LockLost
+        return True
+    except LockLost:
+        # Rolled back: the run that claimed it since owns the job's effects.
+        logger.warning('Job %s was released while running; discarded its changes', claimed)
+        return False
+    except Exception:
+        error = traceback.format_exc()
+        if claimed.attempts >= claimed.max_attempts:
+            outcome = {'status': Job.FAILED, 'finished_at': timezone.now()}
+            logger.error('Job %s gave up after %d attempts:\n%s', claimed, claimed.attempts, error)
+        else:
+            retry_at = timezone.now() + timedelta(seconds=backoff(claimed.attempts))
+            outcome = {'status': Job.QUEUED, 'run_at': retry_at}
+            logger.warning('Job %s failed (attempt %d), retrying at %s', claimed, claimed.attempts, retry_at)
+        owned.update(last_error=error, locked_by='', **outcome)
+        if raise_errors:
+            raise
+        return False
+
+
+def release_stale():
+    """
+    Requeue jobs whose worker died mid-run (locked longer than the lock timeout).
+
+    A worker that was only slow finds the job gone when it finishes and rolls
+    its run back (see ``run``).
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT_SECONDS)
+    return Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff).update(
+        status=Job.QUEUED, locked_by='', run_at=timezone.now(),
+    )
+
+
+def prune_finished():
+    """Delete succeeded jobs older than ``JOBS_KEEP_FINISHED_DAYS``; failed ones are kept for inspection."""
+    cutoff = timezone.now() - timedelta(days=settings.JOBS_KEEP_FINISHED_DAYS)
+    deleted, _ = Job.objects.filter(status=Job.SUCCEEDED, finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def retry(queryset):
+    """Put failed jobs back on the queue with a fresh set of attempts."""
+    return queryset.filter(status=Job.FAILED).update(
+        status=Job.QUEUED, attempts=0, run_at=timezone.now(), finished_at=None,
+    )
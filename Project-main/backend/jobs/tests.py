@@ -0,0 +1,153 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from accounts.models import User, Profile
+from gigs.models import Gig
+from orders.completion import complete_order
+from orders.jobs import credit_completion
+from orders.models import Order
+from reviews.models import Review
+from .models import Job
+from .queue import claim, enqueue, job, release_stale, retry, run
+
+calls = []
+
+
+@job('tests.record', max_attempts=3)
+def record(value, fail=False):
+    calls.append(value)
+    user = User.objects.create_user(username=f'u{len(calls)}', email=f'u{len(calls)}@example.com', password='pass12345')
+    Profile.objects.create(user=user)
+    if fail:
+        raise RuntimeError('boom')
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def work(self):
+        call_command('run_jobs', '--burst', stdout=StringIO())
+
+    def test_eager_mode_runs_inline(self):
+        queued = enqueue(record, value=1)
+        self.assertEqual(calls, [1])
+        self.assertEqual(queued.status, Job.SUCCEEDED)
+        with self.assertRaises(RuntimeError), self.assertLogs('jobs.queue', 'WARNING'):
+            enqueue('tests.record', value=2, fail=True)
+        later = enqueue(record, value=3, delay=timedelta(minutes=5))
+        self.assertEqual((calls, later.status), ([1, 2], Job.QUEUED))
+
+    @override_settings(JOBS_EAGER=False)
+    def test_worker_runs_due_jobs(self):
+        enqueue(record, value=1)
+        later = enqueue(record, value=2, delay=timedelta(hours=1))
+        self.assertEqual(calls, [])
+        self.work()
+        self.assertEqual(calls, [1])
+        self.assertEqual(Job.objects.get(pk=later.pk).status, Job.QUEUED)
+
+    @override_settings(JOBS_EAGER=False)
+    def test_failures_roll_back_and_back_off_until_max_attempts(self):
+        failing = enqueue(record, value=1, fail=True)
+        for attempt in range(1, 4):
+            with self.assertLogs('jobs.queue', 'WARNING'):
+                self.work()
+            failing.refresh_from_db()
+            self.assertEqual(failing.attempts, attempt)
+            self.assertIn('RuntimeError: boom', failing.last_error)
+            # The job's own writes are rolled back with it.
+            self.assertEqual(Profile.objects.count(), 0)
+            Job.objects.filter(pk=failing.pk).update(run_at=timezone.now())
+        self.assertEqual(failing.status, Job.FAILED)
+        self.assertEqual(len(calls), 3)
+
+        self.assertEqual(retry(Job.objects.all()), 1)
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts), (Job.QUEUED, 0))
+
+    @override_settings(JOBS_EAGER=False)
+    def test_idempotency_key(self):
+        first = enqueue(record, key='once', value=1)
+        second = enqueue(record, key='once', value=2)
+        self.assertEqual(first.pk, second.pk)
+        self.work()
+        enqueue(record, key='once', value=3)
+        self.work()
+        self.assertEqual(calls, [1])
+
+    @override_settings(JOBS_EAGER=False)
+    def test_stale_jobs_are_released(self):
+        stuck = enqueue(record, value=1)
+        Job.objects.filter(pk=stuck.pk).update(status=Job.RUNNING, locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(release_stale(), 1)
+        self.work()
+        self.assertEqual(calls, [1])
+
+    @override_settings(JOBS_EAGER=False)
+    def test_a_released_job_only_keeps_the_current_run(self):
+        queued = enqueue(record, value=1)
+        slow = claim(queued.pk, 'slow')
+        # The lock times out while the first worker is still running the job.
+        Job.objects.filter(pk=queued.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        release_stale()
+        current = claim(queued.pk, 'current')
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            self.assertFalse(run(slow))
+        self.assertEqual(Profile.objects.count(), 0)
+        self.assertTrue(run(current))
+        self.assertEqual(Profile.objects.count(), 1)
+        self.assertEqual(Job.objects.get(pk=queued.pk).status, Job.SUCCEEDED)
+
+
+@override_settings(JOBS_EAGER=False)
+class QueuedSideEffectTests(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller', email='seller@example.com', password='pass12345', is_freelancer=True,
+        )
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        Profile.objects.create(user=self.seller)
+        self.gig = Gig.objects.create(seller=self.seller, title='Gig', description='desc', price=40)
+
+    def test_completion_credit_is_queued_once(self):
+        order = Order.objects.create(gig=self.gig, buyer=self.buyer, amount=40, status='delivered')
+        complete_order(order.pk)
+        Order.objects.filter(pk=order.pk).update(status='delivered')
+        complete_order(order.pk)
+        self.assertEqual(Gig.objects.get(pk=self.gig.pk).total_orders, 0)
+
+        call_command('run_jobs', '--burst', stdout=StringIO())
+        self.assertEqual(Gig.objects.get(pk=self.gig.pk).total_orders, 1)
+        self.assertEqual(Profile.objects.get(user=self.seller).total_earnings, 40)
+        self.assertEqual(Job.objects.get().key, f'order:{order.pk}:credit')
+
+    def test_completion_is_credited_once_when_the_job_runs_twice(self):
+        order = Order.objects.create(gig=self.gig, buyer=self.buyer, amount=40, status='delivered')
+        complete_order(order.pk)
+        credit_completion(order.pk)
+        credit_completion(order.pk)
+        self.assertEqual(Gig.objects.get(pk=self.gig.pk).total_orders, 1)
+        self.assertEqual(Profile.objects.get(user=self.seller).total_earnings, 40)
+        self.assertIsNotNone(Order.objects.get(pk=order.pk).credited_at)
+
+    def test_review_rating_is_applied_by_the_worker(self):
+        order = Order.objects.create(gig=self.gig, buyer=self.buyer, amount=40, status='completed')
+        Review.objects.create(order=order, gig=self.gig, reviewer=self.buyer, rating=4, comment='ok')
+        self.assertEqual(Gig.objects.get(pk=self.gig.pk).rating_count, 0)
+        call_command('run_jobs', '--burst', stdout=StringIO())
+        gig = Gig.objects.get(pk=self.gig.pk)
+        self.assertEqual((gig.rating_count, gig.average_rating), (1, 4))
+
+    def test_deleting_a_gig_retracts_its_ratings_from_the_seller(self):
+        order = Order.objects.create(gig=self.gig, buyer=self.buyer, amount=40, status='completed')
+        Review.objects.create(order=order, gig=self.gig, reviewer=self.buyer, rating=4, comment='ok')
+        call_command('run_jobs', '--burst', stdout=StringIO())
+        # The retraction runs after the gig is gone.
+        self.gig.delete()
+        call_command('run_jobs', '--burst', stdout=StringIO())
+        profile = Profile.objects.get(user=self.seller)
+        self.assertEqual((profile.rating_sum, profile.rating_count, profile.average_rating), (0, 0, 0))
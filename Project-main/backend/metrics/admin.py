@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import DailyOrderMetric, PlatformCounter
+
+
+@admin.register(PlatformCounter)
+class PlatformCounterAdmin(admin.ModelAdmin):
+    list_display = ['name', 'value', 'updated_at']
+
+
+@admin.register(DailyOrderMetric)
+class DailyOrderMetricAdmin(admin.ModelAdmin):
+    list_display = ['date', 'orders_created', 'orders_completed', 'revenue', 'platform_fees']
+    date_hierarchy = 'date'
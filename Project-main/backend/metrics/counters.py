@@ -0,0 +1,221 @@
+"""
+Materialized platform metrics for the admin dashboard.
+
+``PlatformCounter`` rows hold running totals (users, gigs, orders per status,
+completed revenue and platform fees) and ``DailyOrderMetric`` rows hold a
+per-day series of orders placed, orders completed and completed revenue.
+Both are adjusted by the signals in ``metrics.signals`` with ``F()``
+increments, so reading the dashboard costs one small query however large
+the platform grows. Bulk writes bypass signals; ``reconcile_metrics``
+detects and repairs the resulting drift from the source tables.
+"""
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from gigs.models import Gig
+from orders.models import Order
+
+from .models import DailyOrderMetric, PlatformCounter
+
+User = get_user_model()
+
+ORDER_STATUSES = [status for status, _ in Order.STATUS_CHOICES]
+COUNTER_NAMES = [
+    'users', 'freelancers', 'buyers', 'gigs', 'active_gigs', 'orders',
+    *[f'orders:{status}' for status in ORDER_STATUSES],
+    'revenue', 'platform_fees',
+]
+DAILY_FIELDS = ['orders_created', 'orders_completed', 'revenue', 'platform_fees']
+
+
+# ---- Contributions of a single row ---------------------------------------
+
+def user_counters(flags):
+    """Counters contributed by a user with ``(is_freelancer, is_buyer)`` flags."""
+    if flags is None:
+        return Counter()
+    is_freelancer, is_buyer = flags
+    return Counter({'users': 1, 'freelancers': int(is_freelancer), 'buyers': int(is_buyer)})
+
+
+def gig_counters(is_active):
+    """Counters contributed by a gig; ``None`` means the gig does not exist."""
+    if is_active is None:
+        return Counter()
+    return Counter({'gigs': 1, 'active_gigs': int(is_active)})
+
+
+def order_state(order):
+    return {
+        'status': order.status,
+        'amount': Decimal(order.amount),
+        'platform_fee': Decimal(order.platform_fee),
+        'created_at': order.created_at,
+        'completed_at': order.completed_at,
+    }
+
+
+def order_counters(state):
+    if state is None:
+        return Counter()
+    completed = state['status'] == 'completed'
+    return Counter({
+        'orders': 1,
+        f"orders:{state['status']}": 1,
+        'revenue': state['amount'] if completed else 0,
+        'platform_fees': state['platform_fee'] if completed else 0,
+    })
+
+
+def order_daily(state):
+    """``{(date, field): value}`` contributed by an order to the daily series."""
+    if state is None:
+        return Counter()
+    values = Counter({(timezone.localdate(state['created_at']), 'orders_created'): 1})
+    if state['status'] == 'completed':
+        day = timezone.localdate(state['completed_at'] or timezone.now())
+        values[(day, 'orders_completed')] += 1
+        values[(day, 'revenue')] += state['amount']
+        values[(day, 'platform_fees')] += state['platform_fee']
+    return values
+
+
+def difference(new, old):
+    """``new - old`` keeping negative entries (``Counter.__sub__`` drops them)."""
+    delta = Counter(new)
+    delta.subtract(old)
+    return {key: value for key, value in delta.items() if value}
+
+
+# ---- Incremental updates -------------------------------------------------
+
+def bump(deltas):
+    """Add ``{counter name: delta}`` to the stored counters."""
+    # Rows are locked in name order, so concurrent bumps can't deadlock.
+    for name, delta in sorted(deltas.items()):
+        counters = PlatformCounter.objects.filter(name=name)
+        if not counters.update(value=F('value') + delta):
+            PlatformCounter.objects.get_or_create(name=name)
+            counters.update(value=F('value') + delta)
+
+
+def bump_daily(deltas):
+    """Add ``{(date, field): delta}`` to the stored daily series."""
+    by_day = {}
+    for (day, field), delta in deltas.items():
+        by_day.setdefault(day, {})[field] = F(field) + delta
+    for day, updates in sorted(by_day.items()):
+        rows = DailyOrderMetric.objects.filter(date=day)
+        if not rows.update(**updates):
+            DailyOrderMetric.objects.get_or_create(date=day)
+            rows.update(**updates)
+
+
+# ---- Reading -------------------------------------------------------------
+
+def get_counters():
+    """All counters as ``{name: value}``, missing ones reading as zero."""
+    stored = dict(PlatformCounter.objects.values_list('name', 'value'))
+    return {name: stored.get(name, Decimal(0)) for name in COUNTER_NAMES}
+
+
+def daily_series(days):
+    """The last ``days`` days of order metrics, oldest first, with empty days filled in."""
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    stored = {row['date']: row for row in DailyOrderMetric.objects.filter(date__gte=start).values('date', *DAILY_FIELDS)}
+    series = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        row = stored.get(day, {})
+        series.append({
+            'date': day,
+            'orders_created': row.get('orders_created', 0),
+            'orders_completed': row.get('orders_completed', 0),
+            'revenue': float(row.get('revenue', 0)),
+            'platform_fees': float(row.get('platform_fees', 0)),
+        })
+    return series
+
+
+# ---- Reconciliation ------------------------------------------------------
+
+def compute_counters():
+    """Recount every counter from the source tables."""
+    users = User.objects.aggregate(
+        users=Count('id'),
+        freelancers=Count('id', filter=Q(is_freelancer=True)),
+        buyers=Count('id', filter=Q(is_buyer=True)),
+    )
+    gigs = Gig.objects.aggregate(gigs=Count('id'), active_gigs=Count('id', filter=Q(is_active=True)))
+    completed = Q(status='completed')
+    orders = Order.objects.aggregate(
+        orders=Count('id'),
+        revenue=Sum('amount', filter=completed, default=0),
+        platform_fees=Sum('platform_fee', filter=completed, default=0),
+        **{f'orders:{status}': Count('id', filter=Q(status=status)) for status in ORDER_STATUSES},
+    )
+    actual = {**users, **gigs, **orders}
+    return {name: Decimal(actual[name]) for name in COUNTER_NAMES}
+
+
+def compute_daily_series():
+    """Rebuild the daily series from order timestamps as ``{date: {field: value}}``."""
+    series = {}
+    created = Order.objects.annotate(day=TruncDate('created_at')).order_by().values('day').annotate(
+        total=Count('id'),
+    )
+    for row in created:
+        series.setdefault(row['day'], dict.fromkeys(DAILY_FIELDS, 0))['orders_created'] = row['total']
+    completed = Order.objects.filter(status='completed', completed_at__isnull=False).annotate(
+        day=TruncDate('completed_at'),
+    ).order_by().values('day').annotate(
+        total=Count('id'), revenue=Sum('amount'), platform_fees=Sum('platform_fee'),
+    )
+    for row in completed:
+        values = series.setdefault(row['day'], dict.fromkeys(DAILY_FIELDS, 0))
+        values.update(orders_completed=row['total'], revenue=row['revenue'], platform_fees=row['platform_fees'])
+    return series
+
+
+def find_counter_drift():
+    """Return ``[(name, stored, actual)]`` for counters that no longer match the data."""
+    stored = get_counters()
+    return [(name, stored[name], value) for name, value in compute_counters().items() if stored[name] != value]
+
+
+def find_daily_drift():
+    """Return the dates whose stored daily metrics differ from the recomputed ones."""
+    actual = compute_daily_series()
+    stored = {row.pop('date'): row for row in DailyOrderMetric.objects.values('date', *DAILY_FIELDS)}
+    empty = dict.fromkeys(DAILY_FIELDS, 0)
+    return sorted(
+        day for day in actual.keys() | stored.keys()
+        if any(stored.get(day, empty)[f] != actual.get(day, empty)[f] for f in DAILY_FIELDS)
+    )
+
+
+def rebuild_counters():
+    """Overwrite every stored counter with a fresh recount."""
+    with transaction.atomic():
+        PlatformCounter.objects.bulk_create(
+            [PlatformCounter(name=name, value=value) for name, value in compute_counters().items()],
+            update_conflicts=True, unique_fields=['name'], update_fields=['value', 'updated_at'],
+        )
+
+
+def rebuild_daily_series():
+    """Replace the stored daily series with one recomputed from the orders table."""
+    with transaction.atomic():
+        DailyOrderMetric.objects.all().delete()
+        DailyOrderMetric.objects.bulk_create(
+            [DailyOrderMetric(date=day, **values) for day, values in compute_daily_series().items()],
+            batch_size=1000,
+        )
@@ -0,0 +1,55 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def populate_metrics(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    Gig = apps.get_model('gigs', 'Gig')
+    Order = apps.get_model('orders', 'Order')
+    PlatformCounter = apps.get_model('metrics', 'PlatformCounter')
+    DailyOrderMetric = apps.get_model('metrics', 'DailyOrderMetric')
+
+    completed = Q(status='completed')
+    counters = {
+        **User.objects.aggregate(
+            users=Count('id'),
+            freelancers=Count('id', filter=Q(is_freelancer=True)),
+            buyers=Count('id', filter=Q(is_buyer=True)),
+        ),
+        **Gig.objects.aggregate(gigs=Count('id'), active_gigs=Count('id', filter=Q(is_active=True))),
+        **Order.objects.aggregate(
+            orders=Count('id'),
+            revenue=Sum('amount', filter=completed, default=0),
+            platform_fees=Sum('platform_fee', filter=completed, default=0),
+        ),
+    }
+    for status, total in Order.objects.order_by().values_list('status').annotate(total=Count('id')):
+        counters[f'orders:{status}'] = total
+    PlatformCounter.objects.bulk_create([PlatformCounter(name=name, value=value) for name, value in counters.items()])
+
+    days = {}
+    created = Order.objects.annotate(day=TruncDate('created_at')).order_by().values('day').annotate(total=Count('id'))
+    for row in created:
+        days.setdefault(row['day'], DailyOrderMetric(date=row['day'])).orders_created = row['total']
+    finished = Order.objects.filter(completed, completed_at__isnull=False).annotate(
+        day=TruncDate('completed_at'),
+    ).order_by().values('day').annotate(total=Count('id'), revenue=Sum('amount'), fees=Sum('platform_fee'))
+    for row in finished:
+        metric = days.setdefault(row['day'], DailyOrderMetric(date=row['day']))
+        metric.orders_completed, metric.revenue, metric.platform_fees = row['total'], row['revenue'], row['fees']
+    DailyOrderMetric.objects.bulk_create(days.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0001_initial'),
+        ('accounts', '0003_profile_stripe_account_id'),
+        ('gigs', '0008_hot_path_indexes'),
+        ('orders', '0006_order_completed_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_metrics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+from django.db import models
+
+
+class PlatformCounter(models.Model):
+    """A platform-wide running total, e.g. ``users`` or ``orders:completed``."""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class DailyOrderMetric(models.Model):
+    """Orders placed and completed, and completed revenue, for one day."""
+    date = models.DateField(unique=True)
+    orders_created = models.PositiveIntegerField(default=0)
+    orders_completed = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    platform_fees = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"Orders on {self.date}"
@@ -0,0 +1,104 @@
+"""
+Apply each user, gig and order write to the materialized platform metrics.
+
+Every receiver computes what the row contributed before and after the
+write and bumps the counters by the difference. The "before" side is read
+from the database rather than the instance, which may be stale.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from gigs.models import Gig
+from orders.models import Order
+
+from .counters import (
+    bump, bump_daily, difference, gig_counters, order_counters, order_daily, order_state, user_counters,
+)
+
+User = get_user_model()
+
+USER_FLAGS = ('is_freelancer', 'is_buyer')
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_user_flags(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._previous_flags = None
+    if raw or not instance.pk:
+        return
+    if update_fields is not None and not set(USER_FLAGS) & set(update_fields):
+        # e.g. the last_login update on every login; the flags can't change.
+        instance._previous_flags = (instance.is_freelancer, instance.is_buyer)
+        return
+    instance._previous_flags = User.objects.filter(pk=instance.pk).values_list(*USER_FLAGS).first()
+
+
+@receiver(post_save, sender=User)
+def count_user(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_previous_flags', None)
+    bump(difference(user_counters((instance.is_freelancer, instance.is_buyer)), user_counters(previous)))
+
+
+@receiver(pre_delete, sender=User)
+def remember_deleted_user_flags(sender, instance, **kwargs):
+    instance._deleted_flags = User.objects.filter(pk=instance.pk).values_list(*USER_FLAGS).first()
+
+
+@receiver(post_delete, sender=User)
+def uncount_user(sender, instance, **kwargs):
+    bump(difference({}, user_counters(getattr(instance, '_deleted_flags', None))))
+
+
+@receiver(post_save, sender=Gig)
+def count_gig(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    # gigs.signals stores the pre-save (category_id, is_active) of existing gigs.
+    previous = None if created else getattr(instance, '_previous_listing', None)
+    bump(difference(gig_counters(instance.is_active), gig_counters(previous[1] if previous else None)))
+
+
+@receiver(pre_delete, sender=Gig)
+def remember_deleted_gig(sender, instance, **kwargs):
+    instance._deleted_is_active = Gig.objects.filter(pk=instance.pk).values_list('is_active', flat=True).first()
+
+
+@receiver(post_delete, sender=Gig)
+def uncount_gig(sender, instance, **kwargs):
+    bump(difference({}, gig_counters(getattr(instance, '_deleted_is_active', None))))
+
+
+def stored_order_state(pk):
+    stored = Order.objects.filter(pk=pk).only('status', 'amount', 'platform_fee', 'created_at', 'completed_at').first()
+    return order_state(stored) if stored else None
+
+
+@receiver(pre_save, sender=Order)
+def remember_previous_order(sender, instance, raw=False, **kwargs):
+    instance._previous_state = None
+    if instance.pk and not raw:
+        instance._previous_state = stored_order_state(instance.pk)
+
+
+@receiver(post_save, sender=Order)
+def count_order(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_previous_state', None)
+    current = order_state(instance)
+    bump(difference(order_counters(current), order_counters(previous)))
+    bump_daily(difference(order_daily(current), order_daily(previous)))
+
+
+@receiver(pre_delete, sender=Order)
+def remember_deleted_order(sender, instance, **kwargs):
+    instance._deleted_state = stored_order_state(instance.pk)
+
+
+@receiver(post_delete, sender=Order)
+def uncount_order(sender, instance, **kwargs):
+    state = getattr(instance, '_deleted_state', None)
+    bump(difference({}, order_counters(state)))
+    bump_daily(difference({}, order_daily(state)))
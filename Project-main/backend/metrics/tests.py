@@ -0,0 +1,106 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from accounts.models import User, Profile
+from gigs.models import Gig
+from orders.models import Order
+from .counters import bump, compute_counters, find_counter_drift, find_daily_drift, get_counters
+from .models import DailyOrderMetric
+
+
+class PlatformMetricsTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', is_staff=True,
+        )
+        self.seller = User.objects.create_user(
+            username='seller', email='seller@example.com', password='pass12345', is_freelancer=True,
+        )
+        Profile.objects.create(user=self.seller)
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.gig = Gig.objects.create(seller=self.seller, title='Gig', description='desc', price=40)
+        Gig.objects.create(seller=self.seller, title='Paused', description='desc', price=10, is_active=False)
+        self.client.force_authenticate(self.admin)
+
+    def order(self, status='pending', amount=40, fee=4):
+        return Order.objects.create(gig=self.gig, buyer=self.buyer, status=status, amount=amount, platform_fee=fee)
+
+    def set_status(self, order, status):
+        response = self.client.patch('/api/auth/admin/orders/', {
+            'order_id': order.id, 'status': status,
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def test_counters_follow_writes(self):
+        first, second = self.order(), self.order(amount=100, fee=10)
+        self.set_status(first, 'completed')
+        self.set_status(second, 'in_progress')
+        self.gig.is_active = False
+        self.gig.save()
+        self.seller.is_buyer = False
+        self.seller.save()
+
+        self.assertEqual(find_counter_drift(), [])
+        counters = get_counters()
+        self.assertEqual(counters['users'], 3)
+        self.assertEqual(counters['buyers'], 2)
+        self.assertEqual(counters['active_gigs'], 0)
+        self.assertEqual(counters['orders:completed'], 1)
+        self.assertEqual(counters['orders:pending'], 0)
+        self.assertEqual(counters['revenue'], 40)
+
+        second.delete()
+        self.set_status(first, 'cancelled')
+        self.assertEqual(find_counter_drift(), [])
+        self.assertEqual(get_counters()['revenue'], 0)
+
+    def test_dashboard_reads_counters_in_one_query(self):
+        self.set_status(self.order(), 'completed')
+        self.order()
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/auth/admin/dashboard/')
+        self.assertEqual(response.data['total_orders'], 2)
+        self.assertEqual(response.data['completed_orders'], 1)
+        self.assertEqual(response.data['pending_orders'], 1)
+        self.assertEqual(response.data['total_revenue'], 40.0)
+        self.assertEqual(response.data['total_platform_fees'], 4.0)
+        self.assertEqual(response.data['total_gigs'], 2)
+
+    def test_daily_series(self):
+        self.set_status(self.order(amount=25), 'completed')
+        self.order()
+        response = self.client.get('/api/auth/admin/metrics/daily/', {'days': 7})
+        self.assertEqual(len(response.data), 7)
+        today = response.data[-1]
+        self.assertEqual(today['date'], timezone.localdate())
+        self.assertEqual(today['orders_created'], 2)
+        self.assertEqual(today['orders_completed'], 1)
+        self.assertEqual(today['revenue'], 25.0)
+        self.assertEqual(response.data[0]['orders_created'], 0)
+        self.assertEqual(find_daily_drift(), [])
+
+    def test_reconcile_repairs_bulk_update_drift(self):
+        self.order()
+        Order.objects.update(status='completed', completed_at=timezone.now())
+        self.assertTrue(find_counter_drift())
+        self.assertTrue(find_daily_drift())
+
+        out = StringIO()
+        call_command('reconcile_metrics', stdout=out)
+        self.assertIn('--fix', out.getvalue())
+        call_command('reconcile_metrics', '--fix', stdout=out)
+        self.assertEqual(find_counter_drift(), [])
+        self.assertEqual(find_daily_drift(), [])
+        self.assertEqual(get_counters(), compute_counters())
+        self.assertEqual(DailyOrderMetric.objects.get().orders_completed, 1)
+
+    def test_counters_are_updated_in_a_stable_order(self):
+        with CaptureQueriesContext(connection) as captured:
+            bump({'users': 1, 'gigs': 1, 'orders': 1})
+        names = [name for query in captured.captured_queries for name in ('gigs', 'orders', 'users')
+                 if query['sql'].startswith('UPDATE') and f"'{name}'" in query['sql']]
+        self.assertEqual(names, ['gigs', 'orders', 'users'])
@@ -0,0 +1,66 @@
+"""Async checkout for ASGI deployments (see config/asyncviews.py)."""
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import aget_object_or_404
+from rest_framework import status
+from rest_framework.response import Response
+
+from config.asyncviews import AsyncAPIView
+from gigs.models import Gig
+from . import views
+from .models import Order
+
+# Not the event loop's default executor: that one has a handful of threads
+# (CPU count + 4) and is shared with everything else that runs in threads.
+stripe_executor = ThreadPoolExecutor(
+    max_workers=settings.STRIPE_MAX_CONCURRENT_CALLS, thread_name_prefix='stripe',
+)
+
+
+class CreateCheckoutSessionView(AsyncAPIView):
+    """
+    Checkout without tying up a worker while Stripe answers.
+
+    The Stripe SDK is synchronous, so the session is created on
+    ``stripe_executor`` (not the request's database thread); the request
+    itself waits on the event loop.
+    """
+    view_class = views.CreateCheckoutSessionView
+
+    async def apost(self, view, request):
+        try:
+            import stripe
+            stripe.api_key = settings.STRIPE_SECRET_KEY
+        except Exception:
+            return Response({'error': 'Stripe is not configured.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        gig = await aget_object_or_404(
+            Gig.objects.select_related('seller__profile'), id=request.data.get('gig_id'),
+        )
+        error = views.checkout_error(gig, request.user)
+        if error:
+            return error
+
+        order = await Order.objects.acreate(
+            gig=gig,
+            buyer=request.user,
+            status='payment_pending',
+            requirements=request.data.get('requirements', ''),
+            amount=gig.price,
+            platform_fee=views.checkout_fee(gig.price),
+        )
+        domain = request.headers.get('origin', 'http://localhost:5173')
+
+        try:
+            create_session = sync_to_async(
+                stripe.checkout.Session.create, thread_sensitive=False, executor=stripe_executor,
+            )
+            session = await create_session(**views.checkout_session_data(gig, order, domain))
+            order.stripe_payment_intent_id = session.id
+            await order.asave()
+            return Response({'checkout_url': session.url, 'order_id': order.id})
+        except Exception as e:
+            await order.adelete()
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
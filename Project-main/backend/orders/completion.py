@@ -0,0 +1,41 @@
+"""
+Order completion: mark the order completed and credit the gig and seller.
+
+The order row is locked (``select_for_update``; SQLite connections open
+their transactions with ``BEGIN IMMEDIATE``, which serializes writers the
+same way) and the counters are bumped with ``F()`` expressions, so
+concurrent completions can't lose updates. Credit is keyed on
+``completed_at``: an order is credited the first time it completes and
+never again, even if an admin moves it out of and back into ``completed``.
+The crediting itself is the ``orders.credit_completion`` job, queued in the
+same transaction under a per-order idempotency key; the job sets
+``credited_at`` with its increments, so running it again credits nothing.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.queue import enqueue
+
+from .models import Order
+
+
+def complete_order(order_id):
+    """
+    Complete the order and credit the gig and seller once.
+
+    Returns ``(order, credited)``; ``credited`` is False when the order had
+    already been completed before.
+    """
+    with transaction.atomic():
+        order = Order.objects.select_for_update().select_related('gig').get(pk=order_id)
+        if order.status == 'completed':
+            return order, False
+        credit = order.completed_at is None
+        order.status = 'completed'
+        if credit:
+            order.completed_at = timezone.now()
+        order.save(update_fields=['status', 'completed_at', 'updated_at'])
+        if credit:
+            enqueue('orders.credit_completion', key=f'order:{order.pk}:credit', order_id=order.pk)
+    return order, credit
+
@@ -0,0 +1,50 @@
+"""Background jobs for orders (see jobs/queue.py)."""
+from django.db.models import F
+from django.utils import timezone
+
+from accounts.models import Profile
+from config.caching import invalidate
+from gigs.models import Gig
+from jobs.queue import job
+
+from .models import DeliveryUpload, Order
+from .uploads import discard_partial
+
+
+@job('orders.credit_completion')
+def credit_completion(order_id):
+    """Add a completed order to its gig's order count and its seller's earnings."""
+    # Marked in the same transaction as the increments, so a second run of
+    # the job (released as stale while the first was still going) credits nothing.
+    if not Order.objects.filter(pk=order_id, credited_at__isnull=True).update(credited_at=timezone.now()):
+        return
+    order = Order.objects.select_related('gig').get(pk=order_id)
+    seller_id = order.gig.seller_id
+    Gig.objects.filter(pk=order.gig_id).update(total_orders=F('total_orders') + 1)
+    earnings = {
+        'total_orders_completed': F('total_orders_completed') + 1,
+        'total_earnings': F('total_earnings') + order.amount,
+    }
+    if not Profile.objects.filter(user_id=seller_id).update(**earnings):
+        Profile.objects.get_or_create(user_id=seller_id)
+        Profile.objects.filter(user_id=seller_id).update(**earnings)
+    # The updates above bypass the post_save receivers that normally expire
+    # cached gig responses (they embed total_orders and the seller profile).
+    gig_ids = Gig.objects.filter(seller_id=seller_id).values_list('id', flat=True)
+    invalidate('gigs', *[f'gig:{gig_id}' for gig_id in gig_ids])
+
+
+@job('orders.mark_paid')
+def mark_paid(order_id):
+    """Move an order whose Stripe checkout completed from payment_pending to pending."""
+    order = Order.objects.filter(pk=order_id, status='payment_pending').first()
+    if order:
+        order.status = 'pending'
+        order.save()
+
+
+@job('orders.expire_upload')
+def expire_upload(upload_id):
+    """Delete a chunked upload that was never finished and submitted."""
+    DeliveryUpload.objects.filter(pk=upload_id).delete()
+    discard_partial(upload_id)
@@ -0,0 +1,287 @@
+"""
+Management command comparing throughput of the WSGI and ASGI deployments.
+
+``--connections`` clients each send one request after another for
+``--duration`` seconds, mixing the async-capable reads (inbox, chat history,
+gig list, gig detail, featured gigs) and, with ``--checkout-ratio``, Stripe
+checkouts. Each mode runs in a child process so the URLconf is built with
+the right views:
+
+``wsgi``
+    ``config.wsgi`` with the DRF views behind a pool of ``--threads``
+    worker threads, like a threaded WSGI server (gunicorn ``gthread``):
+    requests beyond the pool size wait for a free thread.
+``asgi``
+    ``config.asgi`` with ``ASYNC_VIEWS`` on, every connection served
+    concurrently on one event loop, like uvicorn.
+
+No HTTP server is involved: requests go straight into the WSGI/ASGI
+application, so the numbers compare the request handling models, not
+socket handling. Checkouts don't reach Stripe; the SDK call is replaced
+with a sleep of ``--stripe-latency`` milliseconds, which is the part a
+thread-per-request server spends blocked.
+
+It creates (then deletes) its own users, gigs and conversations, so point
+it at a scratch database::
+
+    DB_NAME=/tmp/bench.sqlite3 python manage.py migrate
+    DB_NAME=/tmp/bench.sqlite3 python manage.py benchmark_asgi --connections 64 --checkout-ratio 0.1
+"""
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import Profile, User
+from chat.models import Conversation, Message
+from gigs.models import Gig
+from .benchmark_db import percentile
+
+PREFIX = 'bench_asgi_'
+MODES = ('wsgi', 'asgi')
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent API throughput of the WSGI and ASGI deployments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=64, help='Concurrent clients')
+        parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per mode')
+        parser.add_argument('--checkout-ratio', type=float, default=0.0)
+        parser.add_argument('--stripe-latency', type=float, default=300, help='Simulated Stripe latency (ms)')
+        parser.add_argument('--mode', choices=MODES, help='Run one mode in this process (used internally)')
+        parser.add_argument('--plan', help='JSON request plan (used internally)')
+
+    def handle(self, *args, **options):
+        if options['mode']:
+            self.run_mode(options)
+            return
+
+        plan = self.set_up(options['connections'])
+        try:
+            results = {mode: self.spawn(mode, plan, options) for mode in MODES}
+        finally:
+            self.tear_down()
+        self.report(results, options)
+
+    def set_up(self, count):
+        self.tear_down()
+        seller = User.objects.create_user(
+            username=f'{PREFIX}seller', email=f'{PREFIX}seller@example.com', password='x', is_freelancer=True,
+        )
+        Profile.objects.create(user=seller)
+        gigs = Gig.objects.bulk_create([
+            Gig(seller=seller, title=f'Benchmark gig {i}', description='desc', price=10 + i) for i in range(20)
+        ])
+        clients = []
+        for i in range(count):
+            buyer = User.objects.create_user(
+                username=f'{PREFIX}buyer{i}', email=f'{PREFIX}buyer{i}@example.com', password='x',
+            )
+            Profile.objects.create(user=buyer).saved_gigs.add(gigs[i % len(gigs)])
+            conversation = Conversation.objects.create(gig=gigs[i % len(gigs)])
+            conversation.participants.add(seller, buyer)
+            Message.objects.bulk_create([
+                Message(conversation=conversation, sender=(buyer, seller)[n % 2], text=f'Message {n}')
+                for n in range(30)
+            ])
+            clients.append({
+                'token': str(AccessToken.for_user(buyer)),
+                'reads': [
+                    '/api/chat/conversations/',
+                    f'/api/chat/conversations/{conversation.id}/messages/?limit=20',
+                    '/api/gigs/',
+                    f'/api/gigs/{gigs[(i * 7) % len(gigs)].id}/',
+                    '/api/gigs/featured/',
+                ],
+                'gig': gigs[(i + 1) % len(gigs)].id,
+            })
+        return clients
+
+    def tear_down(self):
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+    def spawn(self, mode, plan, options):
+        self.stdout.write(f'{mode}: {options["connections"]} connections for {options["duration"]:.0f}s...')
+        env = dict(os.environ, ASYNC_VIEWS='true' if mode == 'asgi' else 'false')
+        if mode == 'asgi':
+            # What config/asgi.py defaults to.
+            env.setdefault('DB_CONN_MAX_AGE', '0')
+        command = [
+            sys.executable, sys.argv[0], 'benchmark_asgi', '--mode', mode, '--plan', json.dumps(plan),
+            '--connections', str(options['connections']), '--threads', str(options['threads']),
+            '--duration', str(options['duration']), '--checkout-ratio', str(options['checkout_ratio']),
+            '--stripe-latency', str(options['stripe_latency']),
+        ]
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(f'{mode} run failed:\n{completed.stderr}')
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def run_mode(self, options):
+        if options['checkout_ratio']:
+            self.simulate_stripe(options['stripe_latency'] / 1000)
+        plan = json.loads(options['plan'])
+        deadline = time.monotonic() + options['duration']
+        if options['mode'] == 'wsgi':
+            results = self.run_wsgi(plan, deadline, options)
+        else:
+            results = asyncio.run(self.run_asgi(plan, deadline, options))
+        self.stdout.write(json.dumps(results))
+
+    @staticmethod
+    def simulate_stripe(latency):
+        import stripe
+
+        def create(**kwargs):
+            time.sleep(latency)
+            return SimpleNamespace(id=f'cs_bench_{random.getrandbits(48):x}', url='https://checkout.stripe.test/')
+
+        stripe.checkout.Session.create = create
+
+    @staticmethod
+    def next_request(client, rng, checkout_ratio):
+        if rng.random() < checkout_ratio:
+            return 'checkout', 'POST', '/api/orders/create-checkout-session/', json.dumps({'gig_id': client['gig']})
+        return 'read', 'GET', rng.choice(client['reads']), ''
+
+    def run_wsgi(self, plan, deadline, options):
+        from config.wsgi import application
+
+        factory = RequestFactory()
+        results = {'read': [], 'checkout': [], 'errors': []}
+        lock = threading.Lock()
+
+        def call(method, path, body, token):
+            headers = {'authorization': f'Bearer {token}'}
+            if method == 'GET':
+                environ = factory.get(path, headers=headers).environ
+            else:
+                environ = factory.post(path, body, content_type='application/json', headers=headers).environ
+            status = []
+            response = application(environ, lambda line, headers, exc_info=None: status.append(line))
+            try:
+                b''.join(response)
+            finally:
+                # Sends request_finished, which closes old database connections.
+                response.close()
+            return int(status[0].split()[0])
+
+        def client(index, pool):
+            rng = random.Random(index)
+            local = {'read': [], 'checkout': [], 'errors': []}
+            while time.monotonic() < deadline:
+                kind, method, path, body = self.next_request(plan[index], rng, options['checkout_ratio'])
+                start = time.perf_counter()
+                try:
+                    status = pool.submit(call, method, path, body, plan[index]['token']).result()
+                except Exception as exc:
+                    local['errors'].append(f'{kind}: {exc}')
+                    continue
+                if status >= 400:
+                    local['errors'].append(f'{kind}: HTTP {status}')
+                else:
+                    local[kind].append(time.perf_counter() - start)
+            with lock:
+                for key, values in local.items():
+                    results[key] += values
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            clients = [threading.Thread(target=client, args=(i, pool)) for i in range(len(plan))]
+            for thread in clients:
+                thread.start()
+            for thread in clients:
+                thread.join()
+        return results
+
+    async def run_asgi(self, plan, deadline, options):
+        from config.asgi import application
+
+        results = {'read': [], 'checkout': [], 'errors': []}
+
+        async def call(method, path, body, token):
+            url = urlsplit(path)
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': method, 'scheme': 'http', 'path': url.path, 'raw_path': url.path.encode(),
+                'query_string': url.query.encode(), 'root_path': '',
+                'headers': [
+                    (b'host', b'localhost'), (b'authorization', f'Bearer {token}'.encode()),
+                    (b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+                ],
+                'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+            }
+            finished = asyncio.Event()
+            status = []
+            sent = False
+
+            async def receive():
+                nonlocal sent
+                if not sent:
+                    sent = True
+                    return {'type': 'http.request', 'body': body.encode(), 'more_body': False}
+                await finished.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+                elif message['type'] == 'http.response.body' and not message.get('more_body'):
+                    finished.set()
+
+            await application(scope, receive, send)
+            finished.set()
+            return status[0]
+
+        async def client(index):
+            rng = random.Random(index)
+            while time.monotonic() < deadline:
+                kind, method, path, body = self.next_request(plan[index], rng, options['checkout_ratio'])
+                start = time.perf_counter()
+                try:
+                    status = await call(method, path, body, plan[index]['token'])
+                except Exception as exc:
+                    results['errors'].append(f'{kind}: {exc}')
+                    continue
+                if status >= 400:
+                    results['errors'].append(f'{kind}: HTTP {status}')
+                else:
+                    results[kind].append(time.perf_counter() - start)
+
+        await asyncio.gather(*(client(i) for i in range(len(plan))))
+        return results
+
+    def report(self, results, options):
+        duration = options['duration']
+        self.stdout.write(
+            f'\n{options["connections"]} connections, {options["threads"]} WSGI threads, '
+            f'{options["checkout_ratio"]:.0%} checkouts ({options["stripe_latency"]:.0f}ms simulated Stripe latency)'
+        )
+        self.stdout.write(f'{"mode":<6} {"kind":<9} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+        for mode, result in results.items():
+            kinds = ('read', 'checkout') if options['checkout_ratio'] else ('read',)
+            for kind in kinds:
+                samples = [s * 1000 for s in result[kind]]
+                self.stdout.write(
+                    f'{mode:<6} {kind:<9} {len(samples) / duration:>8.1f} {percentile(samples, 50):>8.1f} '
+                    f'{percentile(samples, 95):>8.1f} {percentile(samples, 99):>8.1f}'
+                )
+            total = sum(len(result[kind]) for kind in kinds)
+            errors = result['errors']
+            self.stdout.write(f'{mode:<6} {"total":<9} {total / duration:>8.1f}   errors: {len(errors)}')
+            for message, count in sorted(
+                ((m, errors.count(m)) for m in set(errors)), key=lambda item: -item[1],
+            )[:3]:
+                self.stdout.write(f'       {count}x {message}')
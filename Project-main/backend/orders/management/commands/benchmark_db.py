@@ -0,0 +1,163 @@
+"""
+Management command measuring API throughput under concurrent reads and writes.
+
+``--threads`` workers send requests through the full Django stack for
+``--duration`` seconds: reads (order list, chat history, dashboard) and,
+with probability ``--write-ratio``, writes (chat messages and direct
+orders, which also update counters and enqueue jobs). After each request
+the worker closes old connections as a WSGI server would, so
+``DB_CONN_MAX_AGE`` matters. It reports throughput, latency percentiles and
+errors ("database is locked" included).
+
+It writes to the configured database (creating, then deleting, its own
+users), so point it at a scratch copy and compare profiles, e.g.::
+
+    DB_NAME=/tmp/bench.sqlite3 python manage.py migrate
+    DB_NAME=/tmp/bench.sqlite3 SQLITE_TUNING=false DB_CONN_MAX_AGE=0 python manage.py benchmark_db
+    DB_NAME=/tmp/bench.sqlite3 SQLITE_WAL=true python manage.py benchmark_db
+"""
+import random
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import Profile, User
+from chat.models import Conversation, Message
+from gigs.models import Gig
+
+PREFIX = 'bench_db_'
+
+
+def percentile(samples, pct):
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method='inclusive')[pct - 1]
+
+
+class Command(BaseCommand):
+    help = 'Measure API throughput and errors under a concurrent mix of reads and writes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10, help='Seconds to run')
+        parser.add_argument('--write-ratio', type=float, default=0.3)
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        profile = f'{connection.vendor}, CONN_MAX_AGE={settings_dict["CONN_MAX_AGE"]}'
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                journal = cursor.execute('PRAGMA journal_mode').fetchone()[0]
+                synchronous = cursor.execute('PRAGMA synchronous').fetchone()[0]
+            profile += f', journal_mode={journal}, synchronous={synchronous}'
+        self.stdout.write(
+            f'{profile}\n{options["threads"]} threads, {options["duration"]:.0f}s, '
+            f'{options["write_ratio"]:.0%} writes'
+        )
+
+        seller, buyers, gig, conversations = self.set_up(options['threads'])
+        try:
+            results = self.run_workers(seller, buyers, gig, conversations, options)
+        finally:
+            self.tear_down()
+        self.report(results, options['duration'])
+
+    def set_up(self, count):
+        self.tear_down()
+        seller = User.objects.create_user(
+            username=f'{PREFIX}seller', email=f'{PREFIX}seller@example.com', password='x', is_freelancer=True,
+        )
+        Profile.objects.create(user=seller)
+        gig = Gig.objects.create(seller=seller, title='Benchmark gig', description='desc', price=10)
+        buyers, conversations = [], []
+        for i in range(count):
+            buyer = User.objects.create_user(
+                username=f'{PREFIX}buyer{i}', email=f'{PREFIX}buyer{i}@example.com', password='x',
+            )
+            Profile.objects.create(user=buyer)
+            conversation = Conversation.objects.create(gig=gig)
+            conversation.participants.add(seller, buyer)
+            Message.objects.bulk_create([
+                Message(conversation=conversation, sender=(buyer, seller)[n % 2], text=f'Message {n}')
+                for n in range(30)
+            ])
+            buyers.append(buyer)
+            conversations.append(conversation)
+        return seller, buyers, gig, conversations
+
+    def tear_down(self):
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+    def run_workers(self, seller, buyers, gig, conversations, options):
+        deadline = time.monotonic() + options['duration']
+        results = {'read': [], 'write': [], 'errors': []}
+        lock = threading.Lock()
+
+        def work(buyer, conversation, seed):
+            rng = random.Random(seed)
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(buyer)}')
+            reads = [
+                '/api/orders/?role=buyer',
+                f'/api/chat/conversations/{conversation.id}/messages/',
+                '/api/auth/dashboard/',
+            ]
+            local = {'read': [], 'write': [], 'errors': []}
+            while time.monotonic() < deadline:
+                kind = 'write' if rng.random() < options['write_ratio'] else 'read'
+                start = time.perf_counter()
+                try:
+                    if kind == 'read':
+                        response = client.get(rng.choice(reads))
+                    elif rng.random() < 0.5:
+                        response = client.post(
+                            f'/api/chat/conversations/{conversation.id}/messages/', {'text': 'Benchmark message'},
+                        )
+                    else:
+                        response = client.post(
+                            '/api/orders/direct-order/', {'gig_id': gig.id}, content_type='application/json',
+                        )
+                    if response.status_code >= 400:
+                        local['errors'].append(f'{kind}: HTTP {response.status_code}')
+                    else:
+                        local[kind].append(time.perf_counter() - start)
+                except Exception as exc:
+                    local['errors'].append(f'{kind}: {exc}')
+                finally:
+                    # What the WSGI handler does at the end of each request.
+                    close_old_connections()
+            connection.close()
+            with lock:
+                for key, values in local.items():
+                    results[key] += values
+
+        threads = [
+            threading.Thread(target=work, args=(buyer, conversation, i))
+            for i, (buyer, conversation) in enumerate(zip(buyers, conversations))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def report(self, results, duration):
+        total = len(results['read']) + len(results['write'])
+        self.stdout.write(f'{"":<8} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+        for kind in ('read', 'write'):
+            samples = [s * 1000 for s in results[kind]]
+            self.stdout.write(
+                f'{kind:<8} {len(samples) / duration:>8.1f} {percentile(samples, 50):>8.1f} '
+                f'{percentile(samples, 95):>8.1f} {percentile(samples, 99):>8.1f}'
+            )
+        self.stdout.write(f'{"total":<8} {total / duration:>8.1f}')
+        errors = results['errors']
+        self.stdout.write(f'errors: {len(errors)}')
+        for message, count in sorted(
+            ((m, errors.count(m)) for m in set(errors)), key=lambda item: -item[1],
+        )[:5]:
+            self.stdout.write(f'  {count}x {message}')
@@ -0,0 +1,142 @@
+"""
+Management command measuring memory and I/O while delivery uploads run concurrently.
+
+Each scenario parses ``--concurrency`` multipart uploads at once on threads,
+through Django's default upload handlers alone and with
+``DeliveryUploadHandler`` in front of them, and reports the peak Python heap
+(``tracemalloc``), how much of the file was stored (memory or temp file) and
+how much of the body was read. Request bodies are generated on the fly so the
+benchmark itself holds no payload. A last scenario sends the same files
+through resumable chunked uploads. Nothing touches the database.
+"""
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.files.uploadhandler import load_handler
+from django.core.management.base import BaseCommand
+from django.http.multipartparser import MultiPartParser
+from django.test import override_settings
+
+from orders.uploads import DeliveryUploadHandler, create_partial, discard_partial, write_chunk
+
+MB = 2 ** 20
+BOUNDARY = 'benchmarkboundary'
+
+
+class SyntheticStream:
+    """File-like object reading a sequence of byte strings and ``(byte, count)`` runs."""
+
+    def __init__(self, segments):
+        self.segments = list(segments)
+        self.length = sum(len(s) if isinstance(s, bytes) else s[1] for s in self.segments)
+        self.position = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.length - self.position
+        out = bytearray()
+        start = 0
+        for segment in self.segments:
+            seg_len = len(segment) if isinstance(segment, bytes) else segment[1]
+            lo = max(self.position - start, 0)
+            if lo < seg_len and len(out) < size:
+                take = min(seg_len - lo, size - len(out))
+                out += segment[lo:lo + take] if isinstance(segment, bytes) else segment[0] * take
+            start += seg_len
+        self.position += len(out)
+        return bytes(out)
+
+
+def multipart_body(size, head):
+    preamble = (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="submission_file"; filename="work.pdf"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'
+    ).encode()
+    epilogue = f'\r\n--{BOUNDARY}--\r\n'.encode()
+    return SyntheticStream([preamble, head, (b'x', size - len(head)), epilogue])
+
+
+class Command(BaseCommand):
+    help = 'Measure peak memory and bytes stored while delivery uploads are parsed concurrently'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--size-mb', type=int, default=9, help='Size of an accepted upload')
+        parser.add_argument('--oversize-mb', type=int, default=50, help='Size of an oversized upload')
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        size, oversize = options['size_mb'] * MB, options['oversize_mb'] * MB
+        self.stdout.write(
+            f'{concurrency} concurrent uploads, limit {settings.DELIVERY_UPLOAD_MAX_SIZE // MB}MB\n'
+            f'{"scenario":<28} {"handlers":<9} {"peak heap MB":>12} {"stored MB":>10} {"read MB":>8} {"ms":>7}'
+        )
+        scenarios = [
+            (f'{size // MB}MB PDF', size, b'%PDF-1.7\n'),
+            (f'{oversize // MB}MB PDF (over limit)', oversize, b'%PDF-1.7\n'),
+            (f'{size // MB}MB non-PDF', size, b'MZ\x90\x00\x03'),
+        ]
+        for label, file_size, head in scenarios:
+            for guarded in (False, True):
+                result = self.measure(concurrency, lambda: self.parse(file_size, head, guarded))
+                self.report(label, 'guarded' if guarded else 'default', result)
+
+        chunked_size = max(oversize, size)
+        with tempfile.TemporaryDirectory() as partials, override_settings(DELIVERY_UPLOAD_TEMP_DIR=partials):
+            result = self.measure(concurrency, lambda: self.chunked(chunked_size))
+        self.report(f'{chunked_size // MB}MB PDF, chunked', 'chunked', result)
+
+    def parse(self, size, head, guarded):
+        body = multipart_body(size, head)
+        meta = {
+            'CONTENT_TYPE': f'multipart/form-data; boundary={BOUNDARY}',
+            'CONTENT_LENGTH': str(body.length),
+        }
+        handlers = [load_handler(path) for path in settings.FILE_UPLOAD_HANDLERS]
+        if guarded:
+            handlers.insert(0, DeliveryUploadHandler())
+        _, files = MultiPartParser(meta, body, handlers).parse()
+        stored = sum(f.size for f in files.values())
+        for f in files.values():
+            f.close()
+        return stored, body.position
+
+    def chunked(self, size):
+        upload = SimpleNamespace(pk=uuid.uuid4())
+        create_partial(upload)
+        chunk = settings.DELIVERY_UPLOAD_CHUNK_SIZE
+        try:
+            for offset in range(0, size, chunk):
+                length = min(chunk, size - offset)
+                stream = SyntheticStream([b'%PDF-1.7\n', (b'x', length - 9)] if offset == 0 else [(b'x', length)])
+                write_chunk(upload, offset, stream, length)
+        finally:
+            discard_partial(upload.pk)
+        return size, size
+
+    def measure(self, concurrency, work):
+        results = []
+        tracemalloc.start()
+        start = time.perf_counter()
+        threads = [threading.Thread(target=lambda: results.append(work())) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = (time.perf_counter() - start) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stored = sum(r[0] for r in results) / len(results)
+        read = sum(r[1] for r in results) / len(results)
+        return peak, stored, read, elapsed
+
+    def report(self, label, handlers, result):
+        peak, stored, read, elapsed = result
+        self.stdout.write(
+            f'{label:<28} {handlers:<9} {peak / MB:>12.1f} {stored / MB:>10.1f} {read / MB:>8.1f} {elapsed:>7.0f}'
+        )
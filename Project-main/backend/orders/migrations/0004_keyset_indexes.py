@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gigs', '0007_keyset_indexes'),
+        ('orders', '0003_order_github_link_order_submission_file_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['buyer', 'created_at', 'id'], name='orders_buyer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['gig', 'created_at', 'id'], name='orders_gig_created_idx'),
+        ),
+    ]
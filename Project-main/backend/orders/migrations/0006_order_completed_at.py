@@ -0,0 +1,26 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:18
+
+from django.db import migrations, models
+
+
+def backfill_completed_at(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    # Completed orders are not edited afterwards, so their last update is
+    # the best record of when they were completed.
+    Order.objects.filter(status='completed', completed_at__isnull=True).update(completed_at=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_completed_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:56
+
+from django.db import migrations, models
+
+
+def backfill_credited_at(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    Job = apps.get_model('jobs', 'Job')
+    # Orders whose credit job hasn't run yet are left for that job.
+    pending = [
+        int(key.split(':')[1]) for key in Job.objects.filter(
+            name='orders.credit_completion', status__in=['queued', 'running'], key__isnull=False,
+        ).values_list('key', flat=True)
+    ]
+    Order.objects.filter(completed_at__isnull=False).exclude(pk__in=pending).update(
+        credited_at=models.F('completed_at'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_delivery_upload'),
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='credited_at',
+            field=models.DateTimeField(blank=True, help_text='When the gig and seller were credited for this order', null=True),
+        ),
+        migrations.RunPython(backfill_credited_at, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.conf import settings
 
@@ -30,9 +32,43 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     delivered_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    credited_at = models.DateTimeField(
+        null=True, blank=True, help_text='When the gig and seller were credited for this order',
+    )
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of a buyer's orders and of a gig's orders.
+            models.Index(fields=['buyer', 'created_at', 'id'], name='orders_buyer_created_idx'),
+            models.Index(fields=['gig', 'created_at', 'id'], name='orders_gig_created_idx'),
+            # Per-status counts on the seller/buyer dashboards and admin status filter.
+            models.Index(fields=['gig', 'status'], name='orders_gig_status_idx'),
+            models.Index(fields=['buyer', 'status'], name='orders_buyer_status_idx'),
+            models.Index(fields=['status', 'created_at'], name='orders_status_created_idx'),
+            # Keyset pages of the admin order list.
+            models.Index(fields=['created_at', 'id'], name='orders_created_idx'),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.gig.title} by {self.buyer.username}"
+
+
+class DeliveryUpload(models.Model):
+    """A resumable, chunked upload of a delivery file, attached to the order once complete."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='uploads')
+    uploader = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='delivery_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField(help_text='Total file size in bytes')
+    received = models.PositiveBigIntegerField(default=0, help_text='Bytes stored so far; the next chunk starts here')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Upload {self.id} for order #{self.order_id} ({self.received}/{self.size})"
+
+    @property
+    def complete(self):
+        return self.received == self.size
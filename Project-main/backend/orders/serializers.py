@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from config.media import SignedFileField
 from .models import Order
 from gigs.serializers import GigListSerializer
 from accounts.serializers import UserSerializer
@@ -7,6 +8,7 @@ from accounts.serializers import UserSerializer
 class OrderSerializer(serializers.ModelSerializer):
     gig_detail = GigListSerializer(source='gig', read_only=True)
     buyer_detail = UserSerializer(source='buyer', read_only=True)
+    submission_file = SignedFileField(required=False, allow_null=True)
 
     class Meta:
         model = Order
@@ -14,9 +16,9 @@ class OrderSerializer(serializers.ModelSerializer):
             'id', 'gig', 'gig_detail', 'buyer', 'buyer_detail',
             'status', 'requirements', 'amount',
             'submission_file', 'github_link', 'submission_note',
-            'created_at', 'updated_at', 'delivered_at',
+            'created_at', 'updated_at', 'delivered_at', 'completed_at',
         ]
-        read_only_fields = ['buyer', 'amount', 'delivered_at']
+        read_only_fields = ['buyer', 'amount', 'delivered_at', 'completed_at']
 
 
 class OrderCreateSerializer(serializers.ModelSerializer):
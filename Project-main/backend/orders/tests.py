@@ -0,0 +1,294 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.models import User, Profile
+from gigs.models import Gig
+from .completion import complete_order
+from .models import DeliveryUpload, Order
+from config.media import signed_media_url
+from .uploads import partial_path
+
+
+class OrderCompletionTests(APITestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        Profile.objects.create(user=self.seller)
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.gig = Gig.objects.create(seller=self.seller, title='Gig', description='desc', price=50)
+        self.order = Order.objects.create(gig=self.gig, buyer=self.buyer, status='delivered', amount=50)
+
+    def assert_credited(self, orders, earnings):
+        self.gig.refresh_from_db()
+        profile = Profile.objects.get(user=self.seller)
+        self.assertEqual(self.gig.total_orders, orders)
+        self.assertEqual(profile.total_orders_completed, orders)
+        self.assertEqual(profile.total_earnings, earnings)
+
+    def test_buyer_completion_credits_seller(self):
+        self.client.force_authenticate(self.buyer)
+        response = self.client.patch(f'/api/orders/{self.order.id}/status/', {'status': 'completed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'completed')
+        self.assert_credited(1, 50)
+
+    def test_recompleting_does_not_double_count(self):
+        admin = User.objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        self.client.force_authenticate(admin)
+        for status in ['completed', 'completed', 'cancelled', 'completed']:
+            self.client.patch('/api/auth/admin/orders/', {'order_id': self.order.id, 'status': status})
+        _, credited = complete_order(self.order.id)
+        self.assertFalse(credited)
+        self.assert_credited(1, 50)
+
+    def test_completion_writes_only_changed_columns(self):
+        Gig.objects.filter(pk=self.gig.pk).update(title='Renamed elsewhere')
+        complete_order(self.order.id)
+        self.gig.refresh_from_db()
+        self.assertEqual(self.gig.title, 'Renamed elsewhere')
+
+
+def complete_with_retry(order_id, attempts=500):
+    # The in-memory test database reports lock contention immediately
+    # instead of waiting out the busy timeout like a file database, so
+    # retry the way that timeout would.
+    for _ in range(attempts):
+        try:
+            return complete_order(order_id)
+        except OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            time.sleep(0.002)
+    raise AssertionError(f'order {order_id} stayed locked')
+
+
+class ConcurrentCompletionTests(TransactionTestCase):
+    threads = 8
+    orders_per_thread = 5
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        Profile.objects.create(user=self.seller)
+        buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.gig = Gig.objects.create(seller=self.seller, title='Gig', description='desc', price=20)
+        self.orders = [
+            Order.objects.create(gig=self.gig, buyer=buyer, status='delivered', amount=20)
+            for _ in range(self.threads * self.orders_per_thread)
+        ]
+
+    def test_concurrent_completions_are_not_lost_or_doubled(self):
+        errors = []
+        barrier = threading.Barrier(self.threads)
+
+        def worker(index):
+            try:
+                barrier.wait()
+                # Every order is completed by two threads at once.
+                for order in self.orders[index::self.threads // 2]:
+                    complete_with_retry(order.id)
+            except Exception as exc:  # surfaced below
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(i % (self.threads // 2),)) for i in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        completed = len(self.orders)
+        self.gig.refresh_from_db()
+        profile = Profile.objects.get(user=self.seller)
+        self.assertEqual(Order.objects.filter(status='completed').count(), completed)
+        self.assertEqual(self.gig.total_orders, completed)
+        self.assertEqual(profile.total_orders_completed, completed)
+        self.assertEqual(profile.total_earnings, 20 * completed)
+
+
+class DeliveryUploadTests(APITestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        settings = override_settings(
+            MEDIA_ROOT=self.media,
+            DELIVERY_UPLOAD_TEMP_DIR=os.path.join(self.media, 'partial'),
+            DELIVERY_UPLOAD_MAX_SIZE=2 ** 20,
+            DELIVERY_UPLOAD_CHUNK_SIZE=256 * 2 ** 10,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        gig = Gig.objects.create(seller=self.seller, title='Gig', description='desc', price=50)
+        self.order = Order.objects.create(gig=gig, buyer=self.buyer, status='in_progress', amount=50)
+        self.client.force_authenticate(self.seller)
+
+    def pdf(self, size):
+        return b'%PDF-1.7\n' + b'x' * (size - 9)
+
+    def submit(self, **data):
+        return self.client.post(f'/api/orders/{self.order.id}/submit-delivery/', data, format='multipart')
+
+    def assert_not_delivered(self):
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'in_progress')
+        self.assertFalse(self.order.submission_file)
+
+    def test_direct_upload(self):
+        response = self.submit(submission_file=SimpleUploadedFile('work.pdf', self.pdf(5000)))
+        self.assertEqual(response.status_code, 200)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'delivered')
+        self.assertEqual(self.order.submission_file.size, 5000)
+
+    def test_file_contents_must_be_a_pdf(self):
+        response = self.submit(submission_file=SimpleUploadedFile('work.pdf', b'MZ' + b'x' * 5000))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'Only PDF files are accepted.')
+        response = self.submit(submission_file=SimpleUploadedFile('work.pdf', b'%P'))
+        self.assertEqual(response.status_code, 400)
+        self.assert_not_delivered()
+
+    def test_oversized_uploads_are_stopped(self):
+        # Slightly over: caught while the file streams in.
+        response = self.submit(submission_file=SimpleUploadedFile('work.pdf', self.pdf(2 ** 20 + 1)))
+        self.assertEqual(response.status_code, 413)
+        # Far over: refused from the Content-Length alone.
+        response = self.submit(submission_file=SimpleUploadedFile('work.pdf', self.pdf(3 * 2 ** 20)))
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.data['error'], 'File size must be under 1MB.')
+        self.assert_not_delivered()
+
+    def put_chunk(self, upload_id, data, offset):
+        return self.client.put(
+            f'/api/orders/uploads/{upload_id}/?offset={offset}', data, content_type='application/octet-stream',
+        )
+
+    def test_resumable_chunked_upload(self):
+        content = self.pdf(600 * 2 ** 10)
+        response = self.client.post(f'/api/orders/{self.order.id}/uploads/', {'filename': 'big.pdf', 'size': len(content)})
+        self.assertEqual(response.status_code, 201)
+        upload_id, chunk = response.data['upload_id'], response.data['chunk_size']
+
+        self.assertEqual(self.put_chunk(upload_id, content[:chunk], 0).data['offset'], chunk)
+        # A retried chunk or a skipped one is refused with the offset to resume from.
+        response = self.put_chunk(upload_id, content[:chunk], 0)
+        self.assertEqual((response.status_code, response.data['offset']), (409, chunk))
+        self.assertEqual(self.put_chunk(upload_id, content[2 * chunk:], 2 * chunk).status_code, 409)
+        self.assertEqual(self.put_chunk(upload_id, b'x' * (chunk + 1), chunk).status_code, 413)
+
+        offset = self.client.get(f'/api/orders/uploads/{upload_id}/').data['offset']
+        while offset < len(content):
+            offset = self.put_chunk(upload_id, content[offset:offset + chunk], offset).data['offset']
+        self.assertTrue(self.client.get(f'/api/orders/uploads/{upload_id}/').data['complete'])
+
+        response = self.submit(upload_id=upload_id, submission_note='Done')
+        self.assertEqual(response.status_code, 200)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'delivered')
+        with self.order.submission_file.open('rb') as stored:
+            self.assertEqual(stored.read(), content)
+        self.assertFalse(DeliveryUpload.objects.exists())
+        self.assertFalse(os.path.exists(partial_path(upload_id)))
+
+    def test_chunked_upload_checks(self):
+        url = f'/api/orders/{self.order.id}/uploads/'
+        self.assertEqual(self.client.post(url, {'filename': 'a.zip', 'size': 100}).status_code, 400)
+        self.assertEqual(self.client.post(url, {'filename': 'a.pdf', 'size': 10 ** 10}).status_code, 413)
+        upload_id = self.client.post(url, {'filename': 'a.pdf', 'size': 100}).data['upload_id']
+        self.assertEqual(self.put_chunk(upload_id, b'PK' + b'x' * 98, 0).status_code, 400)
+        # Incomplete uploads can't be submitted.
+        self.assertEqual(self.submit(upload_id=upload_id).status_code, 400)
+
+        self.client.force_authenticate(self.buyer)
+        self.assertEqual(self.client.post(url, {'filename': 'a.pdf', 'size': 100}).status_code, 403)
+        self.assertEqual(self.client.get(f'/api/orders/uploads/{upload_id}/').status_code, 404)
+
+
+class SubmissionMediaTests(APITestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        settings = override_settings(MEDIA_ROOT=self.media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.stranger = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        gig = Gig.objects.create(seller=self.seller, title='Gig', description='desc', price=50)
+        self.content = b'%PDF-1.7\n' + bytes(range(256)) * 40
+        self.order = Order.objects.create(
+            gig=gig, buyer=self.buyer, status='delivered', amount=50,
+            submission_file=SimpleUploadedFile('work.pdf', self.content),
+        )
+        self.url = f'/media/{self.order.submission_file.name}'
+
+    def get(self, url=None, user=None, **headers):
+        if user:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(user)}'
+        return self.client.get(url or self.url, **headers)
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_only_buyer_seller_or_signed_url(self):
+        self.assertEqual(self.get().status_code, 403)
+        self.assertEqual(self.get(user=self.stranger).status_code, 403)
+        for user in (self.buyer, self.seller):
+            response = self.get(user=user)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.body(response), self.content)
+            self.assertTrue(response['Cache-Control'].startswith('private'))
+        self.assertEqual(self.get(signed_media_url(self.order.submission_file.name)).status_code, 200)
+        self.assertEqual(self.get(self.url + '?expires=9999999999&token=forged').status_code, 403)
+
+    def test_api_returns_signed_urls(self):
+        self.client.force_authenticate(self.buyer)
+        url = self.client.get(f'/api/orders/{self.order.id}/').data['submission_file']
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(url.replace('http://testserver', '')).status_code, 200)
+
+    def test_ranges_and_conditional_requests(self):
+        signed = signed_media_url(self.order.submission_file.name)
+        full = self.get(signed)
+        self.assertEqual(full['Accept-Ranges'], 'bytes')
+
+        partial = self.get(signed, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(self.body(partial), self.content[10:20])
+        self.assertEqual(self.body(self.get(signed, HTTP_RANGE='bytes=-5')), self.content[-5:])
+        self.assertEqual(self.get(signed, HTTP_RANGE=f'bytes={len(self.content)}-').status_code, 416)
+        # A stale If-Range gets the whole (changed) file instead of a slice.
+        stale = self.get(signed, HTTP_RANGE='bytes=0-4', HTTP_IF_RANGE='"old"')
+        self.assertEqual(stale.status_code, 200)
+
+        self.assertEqual(self.get(signed, HTTP_IF_NONE_MATCH=full['ETag']).status_code, 304)
+        self.assertEqual(self.get(signed, HTTP_IF_MODIFIED_SINCE=full['Last-Modified']).status_code, 304)
+        self.assertEqual(self.get('/media/../config/settings.py').status_code, 404)
+
+    def test_private_files_cannot_be_reached_through_other_spellings(self):
+        name = self.order.submission_file.name
+        for url in (f'/media/gigs/../{name}', f'/media/./{name}'):
+            self.assertEqual(self.get(url).status_code, 404, url)
+            self.assertEqual(self.get(url, user=self.buyer).status_code, 404, url)
+        self.assertEqual(self.get(f'/media/{name.replace("/", "//", 1)}').status_code, 404)
+
+    def test_private_files_cannot_be_reached_with_other_casing(self):
+        name = self.order.submission_file.name
+        # What a case-insensitive filesystem does with a differently cased path.
+        os.symlink(os.path.join(self.media, 'submissions'), os.path.join(self.media, 'Submissions'))
+        self.assertEqual(self.get(f'/media/S{name[1:]}').status_code, 404)
+        self.assertEqual(self.get(f'/media/S{name[1:]}', user=self.buyer).status_code, 404)
+        # Where the filesystem doesn't resolve the spelling, the prefix check ignores case.
+        self.assertEqual(self.get(f'/media/{name.upper()}').status_code, 403)
+        self.assertEqual(self.get(user=self.buyer).status_code, 200)
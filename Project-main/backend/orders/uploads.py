@@ -0,0 +1,143 @@
+"""
+Streaming checks for delivery uploads, and resumable chunked uploads.
+
+``DeliveryUploadHandler`` sits in front of Django's default upload handlers
+and sees every chunk as it is read from the request. It refuses a request
+whose ``Content-Length`` is already over the limit before reading any of it,
+stops storing a file as soon as it grows past the limit, and checks the PDF
+signature in the first bytes instead of trusting the filename, so a bad
+upload is never fully buffered or spooled to disk.
+
+Larger deliverables go through a ``DeliveryUpload``: the client sends the
+file as a series of ``PUT`` requests, each written at its offset into a
+partial file, and can resume from the stored offset after a dropped
+connection. Each request only ties up a worker for one chunk.
+"""
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+
+PDF_MAGIC = b'%PDF-'
+COPY_BUFFER_SIZE = 64 * 2 ** 10
+# Room for the multipart framing and the other form fields next to the file.
+FORM_OVERHEAD = 64 * 2 ** 10
+
+
+def size_label(size):
+    return f'{size // 2 ** 20}MB'
+
+
+class DeliveryUploadHandler(FileUploadHandler):
+    """
+    Reject oversized and non-PDF delivery files while they stream in.
+
+    Insert it at the front of ``request.upload_handlers`` before the body is
+    parsed, then check ``error`` / ``status_code`` once it has been.
+    """
+    chunk_size = COPY_BUFFER_SIZE
+
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size or settings.DELIVERY_UPLOAD_MAX_SIZE
+        self.error = None
+        self.status_code = None
+        self.head = None
+
+    def reject(self, error, status_code):
+        self.error, self.status_code = error, status_code
+        # Drop what was stored so far. The rest of the body is bounded by the
+        # Content-Length check below, so it is read and discarded rather than
+        # resetting the connection, and the client gets a proper response.
+        raise StopUpload(connection_reset=False)
+
+    def too_large(self):
+        self.reject(f'File size must be under {size_label(self.max_size)}.', 413)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length > self.max_size + FORM_OVERHEAD:
+            self.error = f'File size must be under {size_label(self.max_size)}.'
+            self.status_code = 413
+            # Skip parsing altogether; none of the body is read.
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        if self.content_length and self.content_length > self.max_size:
+            self.too_large()
+        self.head = b''
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_size:
+            self.too_large()
+        if self.head is not None:
+            self.head += raw_data[:len(PDF_MAGIC) - len(self.head)]
+            if len(self.head) == len(PDF_MAGIC):
+                self.check_head()
+        return raw_data
+
+    def check_head(self):
+        head, self.head = self.head, None
+        if head != PDF_MAGIC:
+            self.reject('Only PDF files are accepted.', 400)
+
+    def file_complete(self, file_size):
+        if self.head is not None:
+            # Shorter than the signature: not a PDF.
+            self.head = None
+            self.error, self.status_code = 'Only PDF files are accepted.', 400
+        return None
+
+
+class PartialFile(File):
+    """A finished partial upload; storages that support it move the file instead of copying it."""
+
+    def temporary_file_path(self):
+        return self.name
+
+
+def partial_path(upload_id):
+    return os.path.join(settings.DELIVERY_UPLOAD_TEMP_DIR, f'{upload_id}.part')
+
+
+def create_partial(upload):
+    os.makedirs(settings.DELIVERY_UPLOAD_TEMP_DIR, exist_ok=True)
+    open(partial_path(upload.pk), 'wb').close()
+
+
+def discard_partial(upload_id):
+    try:
+        os.remove(partial_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+def write_chunk(upload, offset, stream, length):
+    """
+    Copy ``length`` bytes from ``stream`` into the partial file at ``offset``.
+
+    Returns the number of bytes written, which is less than ``length`` if the
+    client went away mid-chunk. Writes are positional, so a chunk that is
+    sent twice simply overwrites itself. Raises ``ValueError`` when the chunk
+    at offset 0 doesn't start with the PDF signature.
+    """
+    written = 0
+    with open(partial_path(upload.pk), 'r+b') as partial:
+        partial.seek(offset)
+        if offset == 0 and length:
+            head = stream.read(len(PDF_MAGIC))
+            if head != PDF_MAGIC:
+                raise ValueError('Only PDF files are accepted.')
+            partial.write(head)
+            written = len(head)
+        while written < length:
+            block = stream.read(min(COPY_BUFFER_SIZE, length - written))
+            if not block:
+                break
+            partial.write(block)
+            written += len(block)
+    return written
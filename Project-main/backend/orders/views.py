@@ -1,3 +1,7 @@
+import os
+import uuid
+from datetime import timedelta
+
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -6,13 +10,21 @@ from django.db import models
 from django.conf import settings
 from django.shortcuts import get_object_or_404
 from decimal import Decimal
-from .models import Order
+from config.media import signed_media_url
+from config.pagination import KeysetPagination
+from jobs.queue import enqueue
+from .completion import complete_order
+from .models import DeliveryUpload, Order
 from .serializers import OrderSerializer, OrderCreateSerializer, OrderStatusSerializer
+from .uploads import (
+    PDF_MAGIC, DeliveryUploadHandler, PartialFile, create_partial, discard_partial, partial_path, size_label, write_chunk,
+)
 from gigs.models import Gig
 
 
 class OrderListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -23,8 +35,8 @@ class OrderListCreateView(generics.ListCreateAPIView):
         user = self.request.user
         role = self.request.query_params.get('role', 'buyer')
         if role == 'seller':
-            return Order.objects.filter(gig__seller=user).select_related('gig', 'buyer', 'gig__category')
-        return Order.objects.filter(buyer=user).select_related('gig', 'buyer', 'gig__category')
+            return Order.objects.filter(gig__seller=user).select_related('gig', 'buyer', 'gig__seller', 'gig__category')
+        return Order.objects.filter(buyer=user).select_related('gig', 'buyer', 'gig__seller', 'gig__category')
 
 
 class OrderDetailView(generics.RetrieveAPIView):
@@ -35,7 +47,7 @@ class OrderDetailView(generics.RetrieveAPIView):
         user = self.request.user
         return Order.objects.filter(
             models.Q(buyer=user) | models.Q(gig__seller=user)
-        ).select_related('gig', 'buyer', 'gig__category')
+        ).select_related('gig', 'buyer', 'gig__seller', 'gig__category')
 
 
 class OrderStatusUpdateView(generics.UpdateAPIView):
@@ -63,16 +75,7 @@ class OrderStatusUpdateView(generics.UpdateAPIView):
         # Buyer actions
         elif order.buyer == user:
             if new_status == 'completed' and order.status == 'delivered':
-                serializer.save()
-                # Update gig stats
-                gig = order.gig
-                gig.total_orders += 1
-                gig.save()
-                # Update seller profile stats
-                profile = gig.seller.profile
-                profile.total_orders_completed += 1
-                profile.total_earnings += order.amount
-                profile.save()
+                serializer.instance, _ = complete_order(order.pk)
             elif new_status == 'cancelled' and order.status in ('pending',):
                 serializer.save()
             else:
@@ -81,46 +84,76 @@ class OrderStatusUpdateView(generics.UpdateAPIView):
             return Response({'error': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
 
 
+def delivery_error(order, user):
+    """Response refusing ``user``'s delivery for ``order``, or None if they may deliver."""
+    # Only the seller can submit work
+    if order.gig.seller_id != user.id:
+        return Response({'error': 'Only the seller can submit work for this order.'},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    # Order must be in pending or in_progress state
+    if order.status not in ('pending', 'in_progress'):
+        return Response({'error': f'Cannot submit work for an order with status "{order.status}".'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    return None
+
+
 class SubmitDeliveryView(APIView):
     """
     Seller submits their work — upload a PDF and/or provide a GitHub link.
     This transitions the order from pending → delivered.
+
+    Files up to DELIVERY_UPLOAD_MAX_SIZE can be posted directly as
+    ``submission_file``; larger ones are sent through a chunked upload
+    (``DeliveryUploadCreateView``) and referenced by ``upload_id``.
     """
     from rest_framework.parsers import MultiPartParser, FormParser
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
     def post(self, request, pk):
-        order = get_object_or_404(Order, id=pk)
+        order = get_object_or_404(Order.objects.select_related('gig'), id=pk)
+        refusal = delivery_error(order, request.user)
+        if refusal:
+            return refusal
 
-        # Only the seller can submit work
-        if order.gig.seller != request.user:
-            return Response({'error': 'Only the seller can submit work for this order.'},
-                            status=status.HTTP_403_FORBIDDEN)
-
-        # Order must be in pending or in_progress state
-        if order.status not in ('pending', 'in_progress'):
-            return Response({'error': f'Cannot submit work for an order with status "{order.status}".'},
-                            status=status.HTTP_400_BAD_REQUEST)
+        # Checks the file as it is read; nothing has been parsed yet.
+        guard = DeliveryUploadHandler(request)
+        request.upload_handlers.insert(0, guard)
 
         github_link = request.data.get('github_link', '').strip()
         submission_note = request.data.get('submission_note', '').strip()
         submission_file = request.FILES.get('submission_file')
+        upload_id = request.data.get('upload_id', '').strip()
+
+        if guard.error:
+            return Response({'error': guard.error}, status=guard.status_code)
 
         # Must provide at least a file or a GitHub link
-        if not submission_file and not github_link:
+        if not submission_file and not upload_id and not github_link:
             return Response({'error': 'Please upload a PDF file or provide a GitHub link.'},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        # Validate file is a PDF if provided
+        upload = None
+        if upload_id:
+            upload = DeliveryUpload.objects.filter(
+                pk=parse_upload_id(upload_id), order=order, uploader=request.user,
+            ).first()
+            if upload is None or not upload.complete:
+                return Response({'error': 'The uploaded file is missing or incomplete.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        # The handler has checked the size and the PDF signature.
         if submission_file:
             if not submission_file.name.lower().endswith('.pdf'):
                 return Response({'error': 'Only PDF files are accepted.'},
                                 status=status.HTTP_400_BAD_REQUEST)
-            if submission_file.size > 10 * 1024 * 1024:  # 10MB limit
-                return Response({'error': 'File size must be under 10MB.'},
-                                status=status.HTTP_400_BAD_REQUEST)
             order.submission_file = submission_file
+        elif upload:
+            with PartialFile(open(partial_path(upload.pk), 'rb')) as partial:
+                order.submission_file.save(upload.filename, partial, save=False)
+            upload.delete()
+            discard_partial(upload.pk)
 
         if github_link:
             order.github_link = github_link
@@ -136,11 +169,109 @@ class SubmitDeliveryView(APIView):
             'order_id': order.id,
             'status': order.status,
             'github_link': order.github_link,
-            'submission_file': order.submission_file.url if order.submission_file else None,
+            'submission_file': signed_media_url(order.submission_file.name) if order.submission_file else None,
             'submission_note': order.submission_note,
         })
 
 
+def parse_upload_id(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def upload_state(upload):
+    return {
+        'upload_id': upload.pk,
+        'offset': upload.received,
+        'size': upload.size,
+        'complete': upload.complete,
+        'chunk_size': settings.DELIVERY_UPLOAD_CHUNK_SIZE,
+    }
+
+
+class DeliveryUploadCreateView(APIView):
+    """
+    Start a resumable upload of a delivery file: POST ``{filename, size}``.
+
+    The file is then sent in chunks to ``DeliveryUploadView`` and submitted
+    with ``upload_id`` once complete.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        order = get_object_or_404(Order.objects.select_related('gig'), id=pk)
+        refusal = delivery_error(order, request.user)
+        if refusal:
+            return refusal
+
+        filename = os.path.basename(str(request.data.get('filename', '')).strip())
+        try:
+            size = int(request.data.get('size'))
+        except (TypeError, ValueError):
+            return Response({'error': 'size is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not filename.lower().endswith('.pdf'):
+            return Response({'error': 'Only PDF files are accepted.'}, status=status.HTTP_400_BAD_REQUEST)
+        if size < len(PDF_MAGIC):
+            return Response({'error': 'The file is empty.'}, status=status.HTTP_400_BAD_REQUEST)
+        if size > settings.DELIVERY_CHUNKED_UPLOAD_MAX_SIZE:
+            return Response({'error': f'File size must be under {size_label(settings.DELIVERY_CHUNKED_UPLOAD_MAX_SIZE)}.'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        upload = DeliveryUpload.objects.create(order=order, uploader=request.user, filename=filename, size=size)
+        create_partial(upload)
+        enqueue('orders.expire_upload', key=f'upload:{upload.pk}:expire', upload_id=str(upload.pk),
+                delay=timedelta(hours=settings.DELIVERY_UPLOAD_EXPIRY_HOURS))
+        return Response(upload_state(upload), status=status.HTTP_201_CREATED)
+
+
+class DeliveryUploadView(APIView):
+    """
+    GET the current offset of a chunked upload, or PUT the next chunk.
+
+    A chunk is the raw request body, written at ``?offset=`` (which must be
+    the stored offset). After a failed request, GET the offset and resume
+    from there.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_upload(self, upload_id):
+        return get_object_or_404(DeliveryUpload, pk=upload_id, uploader=self.request.user)
+
+    def get(self, request, upload_id):
+        return Response(upload_state(self.get_upload(upload_id)))
+
+    def put(self, request, upload_id):
+        upload = self.get_upload(upload_id)
+        try:
+            offset = int(request.query_params.get('offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response({'error': 'offset is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        if offset != upload.received:
+            return Response(dict(upload_state(upload), error='Chunk does not start at the current offset.'),
+                            status=status.HTTP_409_CONFLICT)
+        if length > settings.DELIVERY_UPLOAD_CHUNK_SIZE:
+            return Response({'error': f'Chunks must be at most {size_label(settings.DELIVERY_UPLOAD_CHUNK_SIZE)}.'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        if not length or offset + length > upload.size or (offset == 0 and length < len(PDF_MAGIC)):
+            return Response({'error': 'Invalid chunk length.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            written = write_chunk(upload, offset, request.stream, length)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        # Only a complete chunk moves the offset; a concurrent duplicate of
+        # the same chunk wrote the same bytes and loses the race here.
+        if written == length:
+            DeliveryUpload.objects.filter(pk=upload.pk, received=offset).update(
+                received=offset + length, updated_at=timezone.now(),
+            )
+        upload.refresh_from_db()
+        return Response(upload_state(upload))
+
+
 class DirectOrderView(APIView):
     """
     Create an order directly with simulated payment.
@@ -192,6 +323,53 @@ class DirectOrderView(APIView):
         }, status=status.HTTP_201_CREATED)
 
 
+def checkout_error(gig, buyer):
+    """A 400 response if ``buyer`` may not check out ``gig``, else None."""
+    if gig.seller == buyer:
+        return Response({'error': 'You cannot order your own gig.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not gig.is_active:
+        return Response({'error': 'This gig is not active.'}, status=status.HTTP_400_BAD_REQUEST)
+    return None
+
+
+def checkout_fee(amount):
+    return amount * (Decimal(settings.STRIPE_PLATFORM_FEE_PERCENTAGE) / Decimal(100))
+
+
+def checkout_session_data(gig, order, domain):
+    """Arguments of ``stripe.checkout.Session.create``; expects ``gig.seller.profile`` to be loaded."""
+    session_data = {
+        'payment_method_types': ['card'],
+        'line_items': [{
+            'price_data': {
+                'currency': 'usd',
+                'product_data': {
+                    'name': gig.title,
+                    'description': f"Order from {gig.seller.username}",
+                },
+                'unit_amount': int(order.amount * 100),
+            },
+            'quantity': 1,
+        }],
+        'mode': 'payment',
+        'success_url': f"{domain}/payment-success?session_id={{CHECKOUT_SESSION_ID}}",
+        'cancel_url': f"{domain}/gigs/{gig.id}",
+        'metadata': {
+            'order_id': order.id
+        }
+    }
+
+    seller_stripe_account = gig.seller.profile.stripe_account_id
+    if seller_stripe_account:
+        session_data['payment_intent_data'] = {
+            'transfer_data': {
+                'destination': seller_stripe_account,
+            },
+            'application_fee_amount': int(order.platform_fee * 100),
+        }
+    return session_data
+
+
 class CreateCheckoutSessionView(APIView):
     """Stripe Checkout Session — requires real Stripe keys. Kept for production use."""
     permission_classes = [permissions.IsAuthenticated]
@@ -209,58 +387,24 @@ class CreateCheckoutSessionView(APIView):
         gig = get_object_or_404(Gig, id=gig_id)
         buyer = request.user
         
-        if gig.seller == buyer:
-            return Response({'error': 'You cannot order your own gig.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not gig.is_active:
-            return Response({'error': 'This gig is not active.'}, status=status.HTTP_400_BAD_REQUEST)
+        error = checkout_error(gig, buyer)
+        if error:
+            return error
 
         amount = gig.price
-        fee_percentage = Decimal(settings.STRIPE_PLATFORM_FEE_PERCENTAGE) / Decimal(100)
-        platform_fee = amount * fee_percentage
-        
         order = Order.objects.create(
             gig=gig,
             buyer=buyer,
             status='payment_pending',
             requirements=requirements,
             amount=amount,
-            platform_fee=platform_fee
+            platform_fee=checkout_fee(amount)
         )
         
         domain = request.headers.get('origin', 'http://localhost:5173')
 
         try:
-            session_data = {
-                'payment_method_types': ['card'],
-                'line_items': [{
-                    'price_data': {
-                        'currency': 'usd',
-                        'product_data': {
-                            'name': gig.title,
-                            'description': f"Order from {gig.seller.username}",
-                        },
-                        'unit_amount': int(amount * 100),
-                    },
-                    'quantity': 1,
-                }],
-                'mode': 'payment',
-                'success_url': f"{domain}/payment-success?session_id={{CHECKOUT_SESSION_ID}}",
-                'cancel_url': f"{domain}/gigs/{gig.id}",
-                'metadata': {
-                    'order_id': order.id
-                }
-            }
-            
-            seller_stripe_account = gig.seller.profile.stripe_account_id
-            if seller_stripe_account:
-                session_data['payment_intent_data'] = {
-                    'transfer_data': {
-                        'destination': seller_stripe_account,
-                    },
-                    'application_fee_amount': int(platform_fee * 100),
-                }
-                
-            session = stripe.checkout.Session.create(**session_data)
+            session = stripe.checkout.Session.create(**checkout_session_data(gig, order, domain))
             order.stripe_payment_intent_id = session.id
             order.save()
             
@@ -295,12 +439,9 @@ class StripeWebhookView(APIView):
             session = event['data']['object']
             order_id = session.get('metadata', {}).get('order_id')
             
+            # Stripe redelivers events until it gets a 2xx; the event id keeps
+            # the follow-up from being queued twice.
             if order_id:
-                try:
-                    order = Order.objects.get(id=order_id)
-                    order.status = 'pending'
-                    order.save()
-                except Order.DoesNotExist:
-                    pass
+                enqueue('orders.mark_paid', key=f"stripe:{event['id']}", order_id=int(order_id))
 
         return Response(status=status.HTTP_200_OK)
@@ -0,0 +1,9 @@
+"""Background jobs for reviews (see jobs/queue.py)."""
+from jobs.queue import job
+
+from . import ratings
+
+
+@job('reviews.apply_rating_change')
+def apply_rating_change(gig_id, rating_delta, count_delta, seller_id=None):
+    ratings.apply_rating_change(gig_id, rating_delta, count_delta, seller_id)
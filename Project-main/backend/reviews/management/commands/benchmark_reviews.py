@@ -0,0 +1,72 @@
+"""
+Management command timing review insertion as a seller accumulates reviews.
+
+For each size it bulk-loads that many reviews onto one gig, then times
+``Review.objects.create`` (which maintains the running aggregates) next to
+the two full ``Avg`` aggregations it replaced. Everything runs inside a
+transaction that is rolled back, so it can be pointed at a development
+database safely.
+"""
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Avg
+
+from accounts.models import Profile
+from gigs.models import Gig
+from orders.models import Order
+from reviews.models import Review
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark review insertion against gig/seller review counts (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='*', type=int, default=[100, 1000, 10000, 50000])
+        parser.add_argument('--repeat', type=int, default=20, help='Reviews inserted per size')
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        with transaction.atomic():
+            seller = User.objects.create(username='bench_seller', email='bench_seller@example.com')
+            Profile.objects.create(user=seller)
+            buyer = User.objects.create(username='bench_buyer', email='bench_buyer@example.com')
+            gig = Gig.objects.create(seller=seller, title='Benchmark gig', description='benchmark', price=10)
+
+            self.stdout.write(f'{"reviews":>10} {"insert ms":>10} {"full avg ms":>12}')
+            loaded = 0
+            for size in sorted(options['sizes']):
+                self.load_reviews(gig, buyer, size - loaded, rng)
+                loaded = size
+                insert, full = [], []
+                for _ in range(options['repeat']):
+                    order = Order.objects.create(gig=gig, buyer=buyer, amount=10, status='completed')
+                    start = time.perf_counter()
+                    Review.objects.create(order=order, gig=gig, reviewer=buyer, rating=rng.randint(1, 5), comment='x')
+                    insert.append((time.perf_counter() - start) * 1000)
+
+                    start = time.perf_counter()
+                    gig.reviews.aggregate(Avg('rating'))
+                    Review.objects.filter(gig__in=Gig.objects.filter(seller=seller)).aggregate(Avg('rating'))
+                    full.append((time.perf_counter() - start) * 1000)
+                loaded += options['repeat']
+                self.stdout.write(f'{size:>10} {statistics.median(insert):>10.2f} {statistics.median(full):>12.2f}')
+
+            transaction.set_rollback(True)
+
+    def load_reviews(self, gig, buyer, count, rng):
+        if count <= 0:
+            return
+        orders = Order.objects.bulk_create(
+            [Order(gig=gig, buyer=buyer, amount=10, status='completed') for _ in range(count)], batch_size=5000,
+        )
+        Review.objects.bulk_create([
+            Review(order=order, gig=gig, reviewer=buyer, rating=rng.randint(1, 5), comment='x')
+            for order in orders
+        ], batch_size=5000)
@@ -0,0 +1,26 @@
+"""Management command to rebuild gig and seller rating aggregates from the reviews table."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.ratings import find_rating_drift, rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Recompute rating_sum, rating_count and average_rating for every gig and seller'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report gigs whose totals drifted')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = find_rating_drift()
+            for gig, stored, actual in drift:
+                self.stdout.write(f'  gig {gig.pk}: stored {stored} reviews, actual {actual}')
+            if drift:
+                self.stdout.write(self.style.WARNING(f'{len(drift)} gigs drifted; rerun without --check to rebuild.'))
+            else:
+                self.stdout.write(self.style.SUCCESS('All rating aggregates are consistent.'))
+            return
+        with transaction.atomic():
+            gigs, profiles = rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt ratings for {gigs} gigs and {profiles} profiles.'))
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gigs', '0008_hot_path_indexes'),
+        ('orders', '0005_hot_path_indexes'),
+        ('reviews', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['gig', 'created_at'], name='reviews_gig_created_idx'),
+        ),
+    ]
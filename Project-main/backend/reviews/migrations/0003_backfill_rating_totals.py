@@ -0,0 +1,26 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def backfill_rating_totals(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Gig = apps.get_model('gigs', 'Gig')
+    Profile = apps.get_model('accounts', 'Profile')
+    reviews = Review.objects.order_by()
+    for gig_id, total, count in reviews.values_list('gig').annotate(Sum('rating'), Count('id')):
+        Gig.objects.filter(pk=gig_id).update(rating_sum=total, rating_count=count)
+    for seller_id, total, count in reviews.values_list('gig__seller').annotate(Sum('rating'), Count('id')):
+        Profile.objects.filter(user_id=seller_id).update(rating_sum=total, rating_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_hot_path_indexes'),
+        ('gigs', '0009_rating_totals'),
+        ('accounts', '0005_rating_totals'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rating_totals, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -20,24 +20,31 @@ class Review(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # A gig's reviews, newest first.
+            models.Index(fields=['gig', 'created_at'], name='reviews_gig_created_idx'),
+        ]
 
     def __str__(self):
         return f"Review by {self.reviewer.username} - {self.rating}★"
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update gig average rating
-        from django.db.models import Avg
-        gig = self.gig
-        avg = gig.reviews.aggregate(Avg('rating'))['rating__avg'] or 0
-        gig.average_rating = round(avg, 2)
-        gig.save(update_fields=['average_rating'])
-        # Update seller profile average rating
-        seller_profile = gig.seller.profile
-        from gigs.models import Gig
-        seller_gigs = Gig.objects.filter(seller=gig.seller)
-        overall_avg = Review.objects.filter(
-            gig__in=seller_gigs
-        ).aggregate(Avg('rating'))['rating__avg'] or 0
-        seller_profile.average_rating = round(overall_avg, 2)
-        seller_profile.save(update_fields=['average_rating'])
+        from .ratings import queue_rating_change
+
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    Review.objects.filter(pk=self.pk).values_list('gig_id', 'gig__seller_id', 'rating').first()
+                )
+            super().save(*args, **kwargs)
+            # Adjust the gig's and seller's running totals instead of
+            # re-averaging every review they have.
+            seller_id = self.gig.seller_id
+            if previous is None:
+                queue_rating_change(self.gig_id, seller_id, self.rating, 1)
+            elif previous[0] != self.gig_id:
+                queue_rating_change(previous[0], previous[1], -previous[2], -1)
+                queue_rating_change(self.gig_id, seller_id, self.rating, 1)
+            else:
+                queue_rating_change(self.gig_id, seller_id, self.rating - previous[2], 0)
@@ -0,0 +1,112 @@
+"""
+Running rating aggregates for gigs and sellers.
+
+``Gig`` and ``Profile`` keep ``rating_sum`` and ``rating_count`` columns next
+to ``average_rating``. Adding, changing or deleting a review adjusts them
+with a single ``UPDATE`` per table whose right-hand side is built from
+``F()`` expressions, so the cost of a review no longer depends on how many
+reviews the gig or seller already has and concurrent reviews can't
+overwrite each other's totals. Review writes queue the adjustment as the
+``reviews.apply_rating_change`` job rather than applying it inline.
+``rebuild_ratings`` recomputes everything from the reviews table.
+"""
+from django.db.models import (
+    Case, Count, DecimalField, ExpressionWrapper, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Cast, Coalesce, Round
+from django.db.models.lookups import GreaterThan
+
+from accounts.models import Profile
+from config.caching import invalidate
+from gigs.models import Gig
+from jobs.queue import enqueue
+
+from .models import Review
+
+
+def rating_average(total, count):
+    """Average rating expression for ``total``/``count`` expressions, 0 when there are none."""
+    average = ExpressionWrapper(Cast(total, FloatField()) / count, output_field=FloatField())
+    return Case(
+        When(GreaterThan(count, 0), then=Round(average, 2)),
+        default=Value(0),
+        output_field=DecimalField(max_digits=3, decimal_places=2),
+    )
+
+
+def adjusted_ratings(rating_delta, count_delta):
+    """``update()`` kwargs adding the deltas and recomputing the average in the same statement."""
+    total = F('rating_sum') + rating_delta
+    count = F('rating_count') + count_delta
+    return {'rating_sum': total, 'rating_count': count, 'average_rating': rating_average(total, count)}
+
+
+def apply_rating_change(gig_id, rating_delta, count_delta, seller_id=None):
+    """
+    Add a review's rating change to its gig and to the gig's seller.
+
+    ``seller_id`` comes with the job rather than from the gig, which may be
+    gone by the time the job runs (deleting a gig deletes its reviews).
+    """
+    if not rating_delta and not count_delta:
+        return
+    if seller_id is None:
+        # Jobs queued before the payload carried the seller.
+        seller_id = Gig.objects.filter(pk=gig_id).values_list('seller_id', flat=True).first()
+    Gig.objects.filter(pk=gig_id).update(**adjusted_ratings(rating_delta, count_delta))
+    Profile.objects.filter(user_id=seller_id).update(**adjusted_ratings(rating_delta, count_delta))
+    # Gig responses show the gig's rating and embed the seller's.
+    seller_gigs = Gig.objects.filter(seller_id=seller_id).values_list('id', flat=True)
+    invalidate('gigs', *[f'gig:{pk}' for pk in seller_gigs])
+
+
+def queue_rating_change(gig_id, seller_id, rating_delta, count_delta):
+    """Queue ``apply_rating_change`` as a background job (skipped when there is nothing to change)."""
+    if rating_delta or count_delta:
+        enqueue(
+            'reviews.apply_rating_change',
+            gig_id=gig_id, seller_id=seller_id, rating_delta=rating_delta, count_delta=count_delta,
+        )
+
+
+def _review_totals(**filters):
+    reviews = Review.objects.filter(**filters).order_by().values(next(iter(filters)))
+    return (
+        Subquery(reviews.annotate(total=Sum('rating')).values('total'), output_field=IntegerField()),
+        Subquery(reviews.annotate(total=Count('id')).values('total'), output_field=IntegerField()),
+    )
+
+
+def rebuild_ratings(gigs=None, profiles=None):
+    """
+    Recompute gigs' and sellers' rating aggregates from the reviews table.
+
+    ``gigs`` and ``profiles`` are querysets limiting what is rebuilt
+    (everything when ``None``).
+    """
+    gigs = Gig.objects.all() if gigs is None else gigs
+    profiles = Profile.objects.all() if profiles is None else profiles
+    gig_sum, gig_count = _review_totals(gig=OuterRef('pk'))
+    gig_rows = gigs.update(
+        rating_sum=Coalesce(gig_sum, 0),
+        rating_count=Coalesce(gig_count, 0),
+    )
+    gigs.update(average_rating=rating_average(F('rating_sum'), F('rating_count')))
+
+    seller_sum, seller_count = _review_totals(gig__seller=OuterRef('user_id'))
+    profile_rows = profiles.update(
+        rating_sum=Coalesce(seller_sum, 0),
+        rating_count=Coalesce(seller_count, 0),
+    )
+    profiles.update(average_rating=rating_average(F('rating_sum'), F('rating_count')))
+    invalidate('gigs')
+    return gig_rows, profile_rows
+
+
+def find_rating_drift():
+    """Return ``[(gig, stored_count, actual_count)]`` for gigs whose running totals are wrong."""
+    gig_sum, gig_count = _review_totals(gig=OuterRef('pk'))
+    gigs = Gig.objects.annotate(
+        actual_sum=Coalesce(gig_sum, 0), actual_count=Coalesce(gig_count, 0),
+    ).exclude(rating_sum=F('actual_sum'), rating_count=F('actual_count'))
+    return [(gig, gig.rating_count, gig.actual_count) for gig in gigs]
@@ -0,0 +1,20 @@
+"""Invalidate cached review listings and retract deleted reviews' ratings."""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.caching import invalidate
+
+from .models import Review
+from .ratings import queue_rating_change
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_responses(sender, instance, **kwargs):
+    invalidate(f'reviews:gig:{instance.gig_id}', 'reviews')
+
+
+@receiver(post_delete, sender=Review)
+def retract_review_rating(sender, instance, **kwargs):
+    # Runs before a cascading gig delete removes the gig itself.
+    queue_rating_change(instance.gig_id, instance.gig.seller_id, -instance.rating, -1)
@@ -0,0 +1,90 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from accounts.models import User, Profile
+from gigs.models import Gig
+from orders.models import Order
+from .models import Review
+from .ratings import find_rating_drift
+
+
+class ReviewListCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        Profile.objects.create(user=self.seller)
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.gig = Gig.objects.create(seller=self.seller, title='Logo', description='desc', price=10)
+        self.other_gig = Gig.objects.create(seller=self.seller, title='Site', description='desc', price=10)
+
+    def review(self, gig, rating=5):
+        order = Order.objects.create(gig=gig, buyer=self.buyer, amount=gig.price, status='completed')
+        return Review.objects.create(order=order, gig=gig, reviewer=self.buyer, rating=rating, comment='Great')
+
+    def test_new_review_invalidates_that_gigs_listing(self):
+        self.client.get('/api/reviews/', {'gig': self.gig.id})
+        self.client.get('/api/reviews/', {'gig': self.other_gig.id})
+        self.review(self.gig)
+        response = self.client.get('/api/reviews/', {'gig': self.gig.id})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(self.client.get('/api/reviews/', {'gig': self.other_gig.id})['X-Cache'], 'HIT')
+
+
+class RatingAggregateTests(APITestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        Profile.objects.create(user=self.seller)
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.gig = Gig.objects.create(seller=self.seller, title='Logo', description='desc', price=10)
+        self.other_gig = Gig.objects.create(seller=self.seller, title='Site', description='desc', price=10)
+
+    def review(self, gig, rating):
+        order = Order.objects.create(gig=gig, buyer=self.buyer, amount=gig.price, status='completed')
+        return Review.objects.create(order=order, gig=gig, reviewer=self.buyer, rating=rating, comment='ok')
+
+    def assert_ratings(self, gig, count, average, seller_count, seller_average):
+        gig.refresh_from_db()
+        profile = Profile.objects.get(user=self.seller)
+        self.assertEqual((gig.rating_count, gig.average_rating), (count, Decimal(average)))
+        self.assertEqual((profile.rating_count, profile.average_rating), (seller_count, Decimal(seller_average)))
+
+    def test_running_totals_follow_reviews(self):
+        self.review(self.gig, 5)
+        second = self.review(self.gig, 4)
+        self.review(self.other_gig, 2)
+        self.assert_ratings(self.gig, 2, '4.50', 3, '3.67')
+
+        second.rating = 1
+        second.save()
+        self.assert_ratings(self.gig, 2, '3.00', 3, '2.67')
+
+        second.delete()
+        self.assert_ratings(self.gig, 1, '5.00', 2, '3.50')
+
+    def test_insert_cost_does_not_grow_with_reviews(self):
+        def insert_queries():
+            order = Order.objects.create(gig=self.gig, buyer=self.buyer, amount=10, status='completed')
+            with CaptureQueriesContext(connection) as ctx:
+                Review.objects.create(order=order, gig=self.gig, reviewer=self.buyer, rating=3, comment='ok')
+            return len(ctx.captured_queries)
+
+        first = insert_queries()
+        for _ in range(10):
+            self.review(self.gig, 4)
+        self.assertEqual(insert_queries(), first)
+
+    def test_rebuild_repairs_bulk_loaded_reviews(self):
+        self.review(self.gig, 5)
+        order = Order.objects.create(gig=self.other_gig, buyer=self.buyer, amount=10, status='completed')
+        Review.objects.bulk_create([Review(order=order, gig=self.other_gig, reviewer=self.buyer, rating=1, comment='x')])
+        self.assertEqual([gig for gig, _, _ in find_rating_drift()], [self.other_gig])
+
+        call_command('rebuild_ratings', stdout=StringIO())
+        self.assertEqual(find_rating_drift(), [])
+        self.assert_ratings(self.other_gig, 1, '1.00', 2, '3.00')
@@ -1,10 +1,16 @@
 from rest_framework import generics, permissions
+from config.caching import CachedResponseMixin
 from .models import Review
 from .serializers import ReviewSerializer, ReviewCreateSerializer
 
 
-class ReviewListCreateView(generics.ListCreateAPIView):
+class ReviewListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_namespace = 'reviews'
+
+    def get_cache_dependencies(self):
+        gig_id = self.request.query_params.get('gig')
+        return [f'reviews:gig:{gig_id}'] if gig_id else ['reviews']
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
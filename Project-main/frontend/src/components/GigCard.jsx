@@ -71,7 +71,7 @@ export default function GigCard({ gig }) {
 
                 <div className="card gig-card">
                     <div className="gig-card-image">
-                        {gig.image ? <img src={gig.image} alt={gig.title} /> : icon}
+                        {gig.image ? <img src={gig.image_variants?.card || gig.image} alt={gig.title} loading="lazy" onError={(e) => { if (e.currentTarget.src !== gig.image) e.currentTarget.src = gig.image; }} /> : icon}
                     </div>
                     <div className="gig-card-body">
                         <div className="gig-card-seller">
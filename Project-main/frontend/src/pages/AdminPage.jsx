@@ -16,6 +16,8 @@ export default function AdminPage() {
     const [stats, setStats] = useState(null);
     const [orders, setOrders] = useState([]);
     const [users, setUsers] = useState([]);
+    const [ordersNext, setOrdersNext] = useState(null);
+    const [usersNext, setUsersNext] = useState(null);
     const [loading, setLoading] = useState(true);
     const [activeTab, setActiveTab] = useState('overview');
     const [statusFilter, setStatusFilter] = useState('');
@@ -38,8 +40,10 @@ export default function AdminPage() {
                 api.get('/auth/admin/users/'),
             ]);
             setStats(statsRes.data);
-            setOrders(ordersRes.data);
-            setUsers(usersRes.data);
+            setOrders(ordersRes.data.results);
+            setOrdersNext(ordersRes.data.next);
+            setUsers(usersRes.data.results);
+            setUsersNext(usersRes.data.next);
         } catch {
             toast.error('Failed to load admin data');
         } finally {
@@ -56,7 +60,8 @@ export default function AdminPage() {
             toast.success(`Order #${orderId} updated to ${newStatus}`);
             // Refresh orders
             const ordersRes = await api.get('/auth/admin/orders/');
-            setOrders(ordersRes.data);
+            setOrders(ordersRes.data.results);
+            setOrdersNext(ordersRes.data.next);
             // Refresh stats too
             const statsRes = await api.get('/auth/admin/dashboard/');
             setStats(statsRes.data);
@@ -65,6 +70,31 @@ export default function AdminPage() {
         }
     };
 
+    // Admin lists are keyset-paginated; follow the `next` link to append a page.
+    const loadMore = async (next, setRows, setNext) => {
+        try {
+            const res = await api.get(next);
+            setRows(rows => [...rows, ...res.data.results]);
+            setNext(res.data.next);
+        } catch {
+            toast.error('Failed to load more');
+        }
+    };
+
+    const handleExport = async (resource) => {
+        try {
+            const res = await api.get(`/auth/admin/${resource}/`, { params: { export: 'csv' }, responseType: 'blob' });
+            const url = URL.createObjectURL(res.data);
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = `${resource}.csv`;
+            link.click();
+            URL.revokeObjectURL(url);
+        } catch {
+            toast.error('Export failed');
+        }
+    };
+
     const statusColors = {
         payment_pending: { bg: 'rgba(255, 193, 7, 0.05)', color: '#e0a800', label: 'Awaiting Payment' },
         pending: { bg: 'rgba(255, 193, 7, 0.1)', color: '#ffc107', label: 'Pending' },
@@ -247,7 +277,10 @@ export default function AdminPage() {
 
                     {/* Orders count */}
                     <p style={{ color: 'var(--text-muted)', fontSize: '0.85rem', marginBottom: '16px' }}>
-                        Showing {filteredOrders.length} of {orders.length} orders
+                        Showing {filteredOrders.length} of {orders.length}{ordersNext ? '+' : ''} orders
+                        <button className="btn btn-secondary" onClick={() => handleExport('orders')} style={{ marginLeft: '12px', padding: '4px 12px', fontSize: '0.75rem' }}>
+                            Export CSV
+                        </button>
                     </p>
 
                     {/* Orders Table */}
@@ -345,6 +378,13 @@ export default function AdminPage() {
                             <h3 style={{ color: 'var(--text-muted)' }}>No orders match your filters</h3>
                         </div>
                     )}
+                    {ordersNext && (
+                        <div style={{ textAlign: 'center', marginTop: '16px' }}>
+                            <button className="btn btn-secondary" onClick={() => loadMore(ordersNext, setOrders, setOrdersNext)}>
+                                Load more orders
+                            </button>
+                        </div>
+                    )}
                 </div>
             )}
 
@@ -368,7 +408,10 @@ export default function AdminPage() {
                     </div>
 
                     <p style={{ color: 'var(--text-muted)', fontSize: '0.85rem', marginBottom: '16px' }}>
-                        Showing {filteredUsers.length} of {users.length} users
+                        Showing {filteredUsers.length} of {users.length}{usersNext ? '+' : ''} users
+                        <button className="btn btn-secondary" onClick={() => handleExport('users')} style={{ marginLeft: '12px', padding: '4px 12px', fontSize: '0.75rem' }}>
+                            Export CSV
+                        </button>
                     </p>
 
                     {/* Users Table */}
@@ -444,6 +487,13 @@ export default function AdminPage() {
                             </table>
                         </div>
                     </div>
+                    {usersNext && (
+                        <div style={{ textAlign: 'center', marginTop: '16px' }}>
+                            <button className="btn btn-secondary" onClick={() => loadMore(usersNext, setUsers, setUsersNext)}>
+                                Load more users
+                            </button>
+                        </div>
+                    )}
                 </div>
             )}
         </div>
@@ -11,6 +11,34 @@ import {
     FaFilePdf, FaGithub, FaTimes, FaCloudUploadAlt, FaStickyNote
 } from 'react-icons/fa';
 
+// Files above this go through the resumable chunked upload endpoints.
+const DIRECT_UPLOAD_LIMIT = 10 * 1024 * 1024;
+const MAX_UPLOAD_SIZE = 200 * 1024 * 1024;
+
+// Send a delivery file in chunks, resuming from the server's offset when a
+// chunk fails. Returns the upload id to submit with the delivery.
+async function uploadInChunks(orderId, file) {
+    const { data: upload } = await api.post(`/orders/${orderId}/uploads/`, {
+        filename: file.name, size: file.size,
+    });
+    const url = `/orders/uploads/${upload.upload_id}/`;
+    let offset = upload.offset;
+    let failures = 0;
+    while (offset < file.size) {
+        try {
+            const { data } = await api.put(`${url}?offset=${offset}`, file.slice(offset, offset + upload.chunk_size), {
+                headers: { 'Content-Type': 'application/octet-stream' },
+            });
+            offset = data.offset;
+            failures = 0;
+        } catch (err) {
+            if (++failures > 3 || (err.response && err.response.status !== 409)) throw err;
+            offset = (await api.get(url)).data.offset;
+        }
+    }
+    return upload.upload_id;
+}
+
 export default function DashboardPage() {
     const { user, updateUser } = useAuth();
     const [stats, setStats] = useState(null);
@@ -91,7 +119,11 @@ export default function DashboardPage() {
         setSubmitting(true);
         try {
             const formData = new FormData();
-            if (submitFile) formData.append('submission_file', submitFile);
+            if (submitFile && submitFile.size > DIRECT_UPLOAD_LIMIT) {
+                formData.append('upload_id', await uploadInChunks(submitOrderId, submitFile));
+            } else if (submitFile) {
+                formData.append('submission_file', submitFile);
+            }
             if (submitGithub.trim()) formData.append('github_link', submitGithub.trim());
             if (submitNote.trim()) formData.append('submission_note', submitNote.trim());
 
@@ -496,8 +528,8 @@ export default function DashboardPage() {
                                                     toast.error('Only PDF files are accepted');
                                                     return;
                                                 }
-                                                if (file.size > 10 * 1024 * 1024) {
-                                                    toast.error('File size must be under 10MB');
+                                                if (file.size > MAX_UPLOAD_SIZE) {
+                                                    toast.error('File size must be under 200MB');
                                                     return;
                                                 }
                                                 setSubmitFile(file);
@@ -521,7 +553,7 @@ export default function DashboardPage() {
                                                 Click to upload PDF
                                             </div>
                                             <div style={{ fontSize: '0.75rem', color: 'var(--text-muted)' }}>
-                                                Max 10MB • PDF files only
+                                                Max 200MB • PDF files only
                                             </div>
                                         </div>
                                     )}
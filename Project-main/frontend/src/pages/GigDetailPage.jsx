@@ -98,7 +98,7 @@ export default function GigDetailPage() {
                     <h1>{gig.title}</h1>
 
                     <div className="gig-detail-image">
-                        {gig.image ? <img src={gig.image} alt={gig.title} /> : icon}
+                        {gig.image ? <img src={gig.image_variants?.large || gig.image} alt={gig.title} onError={(e) => { if (e.currentTarget.src !== gig.image) e.currentTarget.src = gig.image; }} /> : icon}
                     </div>
 
                     <div className="gig-detail-seller">
@@ -54,15 +54,44 @@ export default function MessagesPage() {
         }
     }, [conversationId]);
 
-    // Initial load & Polling setup
+    // Initial load, live updates over server-sent events, and a slow polling fallback
     useEffect(() => {
         fetchConversations();
-        const interval = setInterval(() => {
+
+        let source = null;
+        let reconnect = null;
+        let closed = false;
+        const refresh = () => {
             fetchConversations();
             fetchMessages();
-        }, 5000);
+        };
+        // Stream tickets are short-lived, so every (re)connect fetches a new one.
+        const connect = async () => {
+            try {
+                const res = await api.post('/chat/events/ticket/');
+                if (closed) return;
+                source = new EventSource(`${api.defaults.baseURL}/chat/events/?ticket=${encodeURIComponent(res.data.ticket)}`);
+            } catch (error) {
+                return;
+            }
+            source.addEventListener('message.created', refresh);
+            source.addEventListener('messages.read', refresh);
+            source.addEventListener('conversation.created', fetchConversations);
+            source.onerror = () => {
+                source.close();
+                reconnect = setTimeout(connect, 3000);
+            };
+        };
+        if (window.EventSource) connect();
+
+        const interval = setInterval(refresh, window.EventSource ? 30000 : 5000);
 
-        return () => clearInterval(interval);
+        return () => {
+            closed = true;
+            clearInterval(interval);
+            clearTimeout(reconnect);
+            source?.close();
+        };
     }, [fetchConversations, fetchMessages]);
 
     // Notification Logic
@@ -382,7 +411,7 @@ export default function MessagesPage() {
                                                     }}>
                                                         {msg.attachment && (
                                                             <div style={{ marginBottom: '10px', borderRadius: '12px', overflow: 'hidden', border: '1px solid rgba(255,255,255,0.1)' }}>
-                                                                <img src={msg.attachment} alt="attachment" style={{ maxWidth: '100%', maxHeight: '400px', display: 'block', cursor: 'pointer' }} onClick={() => window.open(msg.attachment, '_blank')} />
+                                                                <img src={msg.attachment_variants?.large || msg.attachment} onError={(e) => { if (e.currentTarget.src !== msg.attachment) e.currentTarget.src = msg.attachment; }} alt="attachment" style={{ maxWidth: '100%', maxHeight: '400px', display: 'block', cursor: 'pointer' }} onClick={() => window.open(msg.attachment, '_blank')} />
                                                             </div>
                                                         )}
                                                         {msg.text && <div style={{ fontSize: '0.95rem', lineHeight: '1.5', whiteSpace: 'pre-wrap' }}>{msg.text}</div>}
@@ -578,7 +607,7 @@ export default function MessagesPage() {
                                 <div style={{ display: 'grid', gridTemplateColumns: 'repeat(3, 1fr)', gap: '8px' }}>
                                     {messages.filter(m => m.attachment).map((m, idx) => (
                                         <div key={idx} style={{ aspectRatio: '1', borderRadius: '8px', overflow: 'hidden', border: '1px solid var(--border-color)', cursor: 'pointer' }} onClick={() => window.open(m.attachment, '_blank')}>
-                                            <img src={m.attachment} alt="shared" style={{ width: '100%', height: '100%', objectFit: 'cover' }} />
+                                            <img src={m.attachment_variants?.thumb || m.attachment} loading="lazy" onError={(e) => { if (e.currentTarget.src !== m.attachment) e.currentTarget.src = m.attachment; }} alt="shared" style={{ width: '100%', height: '100%', objectFit: 'cover' }} />
                                         </div>
                                     ))}
                                     {messages.filter(m => m.attachment).length === 0 && (